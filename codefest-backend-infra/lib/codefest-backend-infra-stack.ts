@@ -4,6 +4,8 @@ import * as lambda from 'aws-cdk-lib/aws-lambda'
 import * as iam from 'aws-cdk-lib/aws-iam';
 import * as dotenv from 'dotenv';
 import * as dynamodb from 'aws-cdk-lib/aws-dynamodb';
+import * as sqs from 'aws-cdk-lib/aws-sqs';
+import { SqsEventSource } from 'aws-cdk-lib/aws-lambda-event-sources';
 
 // Load environment variables from .env file
 dotenv.config();
@@ -64,6 +66,15 @@ export class CodefestBackendInfraStack extends cdk.Stack {
     if (!DYNAMODB_TABLE_NAME_RAG_INTERACTIONS) {
       throw new Error("DYNAMODB_TABLE_NAME_RAG_INTERACTIONS environment variable is not set");
     }
+    const DYNAMODB_TABLE_NAME_OCCUPANCY = process.env.DYNAMODB_TABLE_NAME_OCCUPANCY ?? 'chariott-occupancy';
+    const DYNAMODB_TABLE_NAME_REQUEST_STATS = process.env.DYNAMODB_TABLE_NAME_REQUEST_STATS ?? 'chariott-request-stats';
+    const DYNAMODB_TABLE_NAME_ROOM_LOCKS = process.env.DYNAMODB_TABLE_NAME_ROOM_LOCKS ?? 'chariott-room-locks';
+    // Optional Redis that carries request events to consoles streaming from a
+    // long-running host; Lambda cannot serve the event stream itself
+    const REDIS_URL = process.env.REDIS_URL;
+    // Set to "false" once every client sends Cognito bearer tokens, to turn
+    // off the shared API-Key + User-ID login
+    const API_KEY_AUTH_ENABLED = process.env.API_KEY_AUTH_ENABLED;
     const PINECONE_API_KEY = process.env.PINECONE_API_KEY;
     if (!PINECONE_API_KEY) {
       throw new Error("PINECONE_API_KEY environment variable is not set");
@@ -75,6 +86,44 @@ export class CodefestBackendInfraStack extends cdk.Stack {
     
 
 
+    // Document ingestion outlives an API request, so jobs go through SQS to a
+    // worker function with a longer timeout. Messages stay invisible for six
+    // worker timeouts, as Lambda recommends, and move to a dead-letter queue
+    // after repeated unexpected failures.
+    const ingestionWorkerTimeout = cdk.Duration.minutes(15);
+    const ingestionDeadLetterQueue = new sqs.Queue(this, 'IngestionDeadLetterQueue', {
+      retentionPeriod: cdk.Duration.days(14),
+    });
+    const ingestionQueue = new sqs.Queue(this, 'IngestionQueue', {
+      visibilityTimeout: cdk.Duration.minutes(ingestionWorkerTimeout.toMinutes() * 6),
+      deadLetterQueue: { queue: ingestionDeadLetterQueue, maxReceiveCount: 3 },
+    });
+    const INGESTION_QUEUE_URL = ingestionQueue.queueUrl;
+
+    const environment = {
+      PRIVATE_AWS_ACCESS_KEY_ID,
+      PRIVATE_AWS_SECRET_ACCESS_KEY,
+      PRIVATE_AWS_REGION,
+      S3_BUCKET_NAME,
+      API_KEY,
+      COGNITO_USER_POOL_ID,
+      COGNITO_APP_CLIENT_ID,
+      DYNAMODB_TABLE_NAME_USERS,
+      DYNAMODB_TABLE_NAME_PROCESSED_FILES,
+      PINECONE_API_KEY,
+      PINECONE_INDEX_NAME,
+      DYNAMODB_TABLE_NAME_REQUESTS,
+      DYNAMODB_TABLE_NAME_BOOKINGS,
+      DYNAMODB_TABLE_NAME_HOTELS,
+      DYNAMODB_TABLE_NAME_RAG_INTERACTIONS,
+      DYNAMODB_TABLE_NAME_OCCUPANCY,
+      DYNAMODB_TABLE_NAME_REQUEST_STATS,
+      DYNAMODB_TABLE_NAME_ROOM_LOCKS,
+      INGESTION_QUEUE_URL,
+      ...(REDIS_URL ? { REDIS_URL } : {}),
+      ...(API_KEY_AUTH_ENABLED ? { API_KEY_AUTH_ENABLED } : {}),
+    };
+
     // Create a Lambda function from a Docker image
     const apiFunction = new lambda.DockerImageFunction(this, 'ApiFunction', {
       code: lambda.DockerImageCode.fromImageAsset('../image', {
@@ -83,24 +132,24 @@ export class CodefestBackendInfraStack extends cdk.Stack {
       memorySize: 512,
       timeout: cdk.Duration.seconds(60),
       architecture: lambda.Architecture.ARM_64,
-      environment: {
-        PRIVATE_AWS_ACCESS_KEY_ID,
-        PRIVATE_AWS_SECRET_ACCESS_KEY,
-        PRIVATE_AWS_REGION,
-        S3_BUCKET_NAME,
-        API_KEY,
-        COGNITO_USER_POOL_ID,
-        COGNITO_APP_CLIENT_ID,
-        DYNAMODB_TABLE_NAME_USERS,
-        DYNAMODB_TABLE_NAME_PROCESSED_FILES,
-        PINECONE_API_KEY,
-        PINECONE_INDEX_NAME,
-        DYNAMODB_TABLE_NAME_REQUESTS,
-        DYNAMODB_TABLE_NAME_BOOKINGS,
-        DYNAMODB_TABLE_NAME_HOTELS,
-        DYNAMODB_TABLE_NAME_RAG_INTERACTIONS
-      },
+      environment,
     });
+    ingestionQueue.grantSendMessages(apiFunction);
+
+    // Same image; main.handler routes SQS deliveries to the ingestion pipeline
+    const ingestionWorker = new lambda.DockerImageFunction(this, 'IngestionWorkerFunction', {
+      code: lambda.DockerImageCode.fromImageAsset('../image', {
+        cmd: ["main.handler"]
+      }),
+      memorySize: 2048,
+      timeout: ingestionWorkerTimeout,
+      architecture: lambda.Architecture.ARM_64,
+      environment,
+    });
+    ingestionWorker.addEventSource(new SqsEventSource(ingestionQueue, {
+      batchSize: 1,
+      reportBatchItemFailures: true,
+    }));
 
     apiFunction.role?.addManagedPolicy(
       iam.ManagedPolicy.fromAwsManagedPolicyName('AmazonCognitoPowerUser')
@@ -112,6 +161,7 @@ export class CodefestBackendInfraStack extends cdk.Stack {
     
         const table_processed_files = dynamodb.Table.fromTableName(this, 'ProcessedFilesTable', DYNAMODB_TABLE_NAME_PROCESSED_FILES);
         table_processed_files.grantReadWriteData(apiFunction);
+        table_processed_files.grantReadWriteData(ingestionWorker);
 
         const table_requests = dynamodb.Table.fromTableName(this, 'RequestsTable', DYNAMODB_TABLE_NAME_REQUESTS);
         table_requests.grantReadWriteData(apiFunction);
@@ -125,6 +175,15 @@ export class CodefestBackendInfraStack extends cdk.Stack {
         const table_rag_interactions = dynamodb.Table.fromTableName(this, 'RagTable', DYNAMODB_TABLE_NAME_RAG_INTERACTIONS);
         table_rag_interactions.grantReadWriteData(apiFunction)
 
+        const table_occupancy = dynamodb.Table.fromTableName(this, 'OccupancyTable', DYNAMODB_TABLE_NAME_OCCUPANCY);
+        table_occupancy.grantReadWriteData(apiFunction)
+
+        const table_request_stats = dynamodb.Table.fromTableName(this, 'RequestStatsTable', DYNAMODB_TABLE_NAME_REQUEST_STATS);
+        table_request_stats.grantReadWriteData(apiFunction)
+
+        const table_room_locks = dynamodb.Table.fromTableName(this, 'RoomLocksTable', DYNAMODB_TABLE_NAME_ROOM_LOCKS);
+        table_room_locks.grantReadWriteData(apiFunction)
+
 
             // Grant additional permissions for GSI querying
             apiFunction.addToRolePolicy(new iam.PolicyStatement({
@@ -140,6 +199,8 @@ export class CodefestBackendInfraStack extends cdk.Stack {
                 table_bookings.tableArn,
                 table_hotels.tableArn,
                 table_rag_interactions.tableArn,
+                table_occupancy.tableArn,
+                table_request_stats.tableArn,
                 `${table_requests.tableArn}/index/*`,
                 `${table_users.tableArn}/index/*`,
                 `${table_processed_files.tableArn}/index/*`,
@@ -155,11 +216,13 @@ export class CodefestBackendInfraStack extends cdk.Stack {
     });
 
     // Add Bedrock permissions
-    apiFunction.addToRolePolicy(new iam.PolicyStatement({
+    const invokeEmbeddingModel = new iam.PolicyStatement({
       effect: iam.Effect.ALLOW,
       actions: ['bedrock:InvokeModel'],
       resources: ['arn:aws:bedrock:us-east-1::foundation-model/amazon.titan-embed-text-v1'],
-    }));
+    });
+    apiFunction.addToRolePolicy(invokeEmbeddingModel);
+    ingestionWorker.addToRolePolicy(invokeEmbeddingModel);
 
     // Output the Function URL
     new cdk.CfnOutput(this, 'FunctionUrl', {
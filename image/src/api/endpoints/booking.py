@@ -1,7 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
-from schemas.booking import BookingCreate, Booking, BookingUpdate
+import asyncio
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Body
+from fastapi.responses import RedirectResponse, StreamingResponse
+from typing import List, Optional
+from datetime import date, datetime
+from schemas.booking import (
+    BookingCreate,
+    Booking,
+    BookingUpdate,
+    BookingPage,
+    AvailableRoom,
+    BookingImportReport,
+    DailyManifest,
+    HotelManifest,
+    RoomSize,
+)
 from services.booking_service import BookingService
+from services.availability_service import AvailabilityService
+from services.s3_service import upload_export
+from utils.utils import streaming_supported
 
 router = APIRouter()
 
@@ -11,29 +28,98 @@ async def create_booking(booking: BookingCreate):
     return await BookingService.create_booking(booking)
 
 
-@router.get("/bookings/{booking_id}", response_model=Booking)
-async def get_booking(booking_id: str):
-    return await BookingService.get_booking(booking_id)
-
-
-@router.get("/bookings", response_model=List[Booking])
-async def get_all_bookings():
-    return await BookingService.get_all_bookings()
+# Rows are taken as raw dicts so one bad row is reported instead of failing the
+# whole request with a 422. Each request imports at most BULK_IMPORT_MAX_ROWS
+# rows, which fits Lambda's timeout; clients split larger files into chunks
+@router.post("/bookings/import", response_model=BookingImportReport)
+async def import_bookings(rows: List[dict] = Body(...)):
+    return await BookingService.import_bookings(rows)
 
 
-@router.get("/bookings/current/{user_id}", response_model=List[Booking])
-async def get_current_bookings(user_id: str):
-    return await BookingService.get_current_bookings(user_id)
+@router.post("/bookings/import/file", response_model=BookingImportReport)
+async def import_bookings_file(file: UploadFile = File(...)):
+    content = (await file.read()).decode("utf-8").strip()
+    try:
+        if content.startswith("["):
+            rows = json.loads(content)
+        else:
+            # Newline-delimited JSON, one booking per line
+            rows = [json.loads(line) for line in content.splitlines() if line.strip()]
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON file: {e}")
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=400, detail="Expected a list of bookings")
+    return await BookingService.import_bookings(rows)
 
 
-@router.get("/bookings/past/{user_id}", response_model=List[Booking])
-async def get_past_bookings(user_id: str):
-    return await BookingService.get_past_bookings(user_id)
+@router.get("/bookings/{booking_id}", response_model=Booking)
+async def get_booking(booking_id: str):
+    return await BookingService.get_booking(booking_id)
 
 
-@router.get("/bookings/future/{user_id}", response_model=List[Booking])
-async def get_future_bookings(user_id: str):
-    return await BookingService.get_future_bookings(user_id)
+@router.get("/bookings", response_model=List[Booking])
+async def get_all_bookings(format: str = Query("json", pattern="^(json|ndjson)$")):
+    ndjson = format == "ndjson"
+    chunks = BookingService.stream_all_bookings(ndjson)
+    media_type = "application/x-ndjson" if ndjson else "application/json"
+    if streaming_supported():
+        return StreamingResponse(chunks, media_type=media_type)
+    # Behind Lambda the export is written to S3 and the client is redirected
+    url = await asyncio.to_thread(
+        upload_export, chunks, f"bookings.{format}", media_type
+    )
+    return RedirectResponse(url, status_code=303)
+
+
+@router.get("/bookings/current/{user_id}", response_model=BookingPage)
+async def get_current_bookings(
+    user_id: str,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+):
+    return await BookingService.get_current_bookings(user_id, limit, cursor)
+
+
+@router.get("/bookings/past/{user_id}", response_model=BookingPage)
+async def get_past_bookings(
+    user_id: str,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+):
+    return await BookingService.get_past_bookings(user_id, limit, cursor)
+
+
+@router.get("/bookings/future/{user_id}", response_model=BookingPage)
+async def get_future_bookings(
+    user_id: str,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+):
+    return await BookingService.get_future_bookings(user_id, limit, cursor)
+
+
+@router.get("/availability/{hotel_id}", response_model=List[AvailableRoom])
+async def get_available_rooms(
+    hotel_id: str,
+    start_date: datetime,
+    end_date: datetime,
+    beds: Optional[int] = Query(None, ge=1),
+    bathrooms: Optional[int] = Query(None, ge=1),
+    size: Optional[RoomSize] = None,
+):
+    return await AvailabilityService.get_available_rooms(
+        hotel_id, start_date, end_date, beds, bathrooms, size
+    )
+
+
+@router.get("/manifest/{hotel_id}", response_model=HotelManifest)
+async def get_hotel_manifest(hotel_id: str):
+    return await BookingService.get_hotel_manifest(hotel_id)
+
+
+@router.get("/manifest/{hotel_id}/{day}", response_model=DailyManifest)
+async def get_daily_manifest(hotel_id: str, day: date):
+    return await BookingService.get_daily_manifest(hotel_id, day)
 
 
 @router.put("/bookings/{booking_id}", response_model=Booking)
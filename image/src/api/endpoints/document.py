@@ -12,7 +12,7 @@ from fastapi import (
 )
 from typing import List
 from services.s3_service import upload_file_to_s3
-from services.document_processor import process_document
+from services.ingestion_service import is_stale, submit_ingestion_job
 from services.dynamodb_service import (
     get_all_documents,
     get_documents_by_user_id,
@@ -24,6 +24,7 @@ from schemas.document import (
     DocumentUploadError,
     DocumentListResponse,
     DocumentResponse,
+    DocumentJobStatus,
 )
 from core.config import settings
 from schemas.user import User
@@ -74,8 +75,8 @@ async def upload_document(
         else f"{chain_id}_{file.filename}"
     )
 
-    # Process document synchronously
-    await process_document(document_id, result["url"], current_user.user_id)
+    # Parsing and embedding run as a background job; poll /status for progress
+    await submit_ingestion_job(document_id, result["url"], current_user.user_id)
 
     return DocumentUploadResponse(
         chain_id=chain_id,
@@ -83,10 +84,59 @@ async def upload_document(
         document_name=file.filename,
         url=result["url"],
         user_id=current_user.user_id,
-        processing_status="completed",
+        processing_status="queued",
+        job_id=document_id,
     )
 
 
+def _job_status(document: dict) -> DocumentJobStatus:
+    return DocumentJobStatus(
+        job_id=document["file_name"],
+        status=document["status"],
+        stage=document.get("stage"),
+        attempt=int(document.get("attempt", 1)),
+        stage_attempt=document.get("stage_attempt"),
+        error=document.get("error"),
+        chunks_indexed=document.get("chunks_indexed"),
+        chunk_count=document.get("chunk_count"),
+        updated_at=document.get("updated_at"),
+    )
+
+
+@router.get("/documents/{document_id}/status", response_model=DocumentJobStatus)
+async def get_document_status(
+    document_id: str, current_user: User = Depends(get_current_user)
+):
+    document = await get_document_by_id(document_id)
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return _job_status(document)
+
+
+@router.post("/documents/{document_id}/retry", response_model=DocumentJobStatus)
+async def retry_document(
+    document_id: str, current_user: User = Depends(get_current_user)
+):
+    document = await get_document_by_id(document_id)
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    # A job whose worker was lost stays "processing" with a stale heartbeat
+    if document["status"] != "failed" and not is_stale(document):
+        raise HTTPException(
+            status_code=409,
+            detail="Only failed or stalled ingestion jobs can be retried",
+        )
+    await submit_ingestion_job(
+        document_id,
+        document["s3_url"],
+        document["user_id"],
+        attempt=int(document.get("attempt", 1)) + 1,
+        # Chunks indexed before the failure are not embedded again
+        start_chunk=int(document.get("chunks_indexed", 0)),
+    )
+    return _job_status(await get_document_by_id(document_id))
+
+
 @router.get("/documents", response_model=List[DocumentListResponse])
 async def list_documents(
     current_user: User = Depends(get_current_user),
@@ -1,7 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
-from schemas.hotel import HotelCreate, Hotel, HotelUpdate
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from typing import List, Optional
+from schemas.hotel import (
+    HotelCreate,
+    Hotel,
+    HotelUpdate,
+    OccupancyCalendar,
+    HotelSearchResult,
+    HotelBatchRequest,
+    HotelBatchResult,
+)
 from services.hotel_service import HotelService
+from services.hotel_search_service import AMENITY_BITS
+from services.occupancy_service import OccupancyService
 
 router = APIRouter()
 
@@ -11,14 +21,56 @@ async def create_hotel(hotel: HotelCreate):
     return await HotelService.create_hotel(hotel)
 
 
+def _cached_response(request: Request, body: bytes, etag: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("If-None-Match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/search", response_model=HotelSearchResult)
+async def search_hotels(
+    city: Optional[str] = None,
+    state: Optional[str] = None,
+    country: Optional[str] = None,
+    amenities: List[str] = Query([]),
+    min_eco_rating: int = Query(0, ge=0, le=10),
+    max_eco_rating: int = Query(10, ge=0, le=10),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+):
+    unknown = [name for name in amenities if name not in AMENITY_BITS]
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown amenities: {', '.join(unknown)}"
+        )
+    return await HotelService.search_hotels(
+        city=city,
+        state=state,
+        country=country,
+        amenities=amenities,
+        min_eco_rating=min_eco_rating,
+        max_eco_rating=max_eco_rating,
+        offset=offset,
+        limit=limit,
+    )
+
+
+@router.post("/hotels/batch", response_model=HotelBatchResult)
+async def get_hotels_batch(batch: HotelBatchRequest):
+    return await HotelService.get_hotels(batch.hotel_ids)
+
+
 @router.get("/hotels/{hotel_id}", response_model=Hotel)
-async def get_hotel(hotel_id: str):
-    return await HotelService.get_hotel(hotel_id)
+async def get_hotel(hotel_id: str, request: Request):
+    body, etag = await HotelService.get_hotel_body(hotel_id)
+    return _cached_response(request, body, etag)
 
 
 @router.get("/hotels", response_model=List[Hotel])
-async def get_all_hotels():
-    return await HotelService.get_all_hotels()
+async def get_all_hotels(request: Request):
+    body, etag = await HotelService.get_all_hotels_body()
+    return _cached_response(request, body, etag)
 
 
 @router.put("/hotels/{hotel_id}", response_model=Hotel)
@@ -29,3 +81,13 @@ async def update_hotel(hotel_id: str, hotel_update: HotelUpdate):
 @router.delete("/hotels/{hotel_id}")
 async def delete_hotel(hotel_id: str):
     return await HotelService.delete_hotel(hotel_id)
+
+
+@router.get("/hotels/{hotel_id}/occupancy", response_model=OccupancyCalendar)
+async def get_occupancy(hotel_id: str, days: int = Query(90, ge=1, le=365)):
+    return await OccupancyService.get_calendar(hotel_id, days)
+
+
+@router.post("/hotels/{hotel_id}/occupancy/rebuild", response_model=OccupancyCalendar)
+async def rebuild_occupancy(hotel_id: str, days: int = Query(90, ge=1, le=365)):
+    return await OccupancyService.rebuild_calendar(hotel_id, days)
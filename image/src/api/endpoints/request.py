@@ -1,14 +1,23 @@
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import RedirectResponse, StreamingResponse
 from schemas.request import (
     RequestCreate,
     RequestUpdate,
     RequestResponse,
     RequestStatus,
+    RequestPage,
+    RequestSummary,
+    SLASummary,
+    Department,
 )
 from services.request_service import RequestService
+from services.request_event_service import stream_request_events
+from services.s3_service import upload_export
 from middleware.auth import get_current_user
 from schemas.user import User
-from typing import List, Optional
+from typing import Optional
+from utils.utils import streaming_supported
 
 router = APIRouter()
 
@@ -47,42 +56,121 @@ async def update_request(
     return request
 
 
-@router.get("/requests/hotel/{hotel_id}", response_model=List[RequestResponse])
+@router.get("/requests/hotel/{hotel_id}", response_model=RequestPage)
 async def get_requests_by_hotel(
     hotel_id: str,
     status: RequestStatus = None,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     request_service: RequestService = Depends(),
 ):
-    return await request_service.get_requests_by_hotel(hotel_id, status)
+    return await request_service.get_requests_by_hotel(
+        hotel_id, status, limit, cursor
+    )
 
 
-@router.get("/requests/user/{user_id}", response_model=List[RequestResponse])
+@router.get("/requests/hotel/{hotel_id}/summary", response_model=RequestSummary)
+async def get_request_summary(
+    hotel_id: str,
+    current_user: User = Depends(get_current_user),
+    request_service: RequestService = Depends(),
+):
+    return await request_service.get_request_summary(hotel_id)
+
+
+@router.get("/requests/hotel/{hotel_id}/sla", response_model=SLASummary)
+async def get_sla_percentiles(
+    hotel_id: str,
+    department: Optional[Department] = None,
+    current_user: User = Depends(get_current_user),
+    request_service: RequestService = Depends(),
+):
+    return await request_service.get_sla_percentiles(hotel_id, department)
+
+
+@router.post("/requests/hotel/{hotel_id}/claim", response_model=RequestResponse)
+async def claim_next_request(
+    hotel_id: str,
+    department: Department,
+    current_user: User = Depends(get_current_user),
+    request_service: RequestService = Depends(),
+):
+    request = await request_service.claim_next_request(
+        hotel_id, department, current_user.user_id
+    )
+    if not request:
+        raise HTTPException(status_code=404, detail="No pending requests")
+    return request
+
+
+@router.get("/requests/hotel/{hotel_id}/events")
+async def stream_hotel_requests(
+    hotel_id: str,
+    department: Optional[Department] = None,
+    current_user: User = Depends(get_current_user),
+):
+    # Server-Sent Events: consoles get created/updated requests pushed instead
+    # of polling get_requests_by_hotel. Served from a long-running host; the
+    # Lambda deployment publishes to it through REDIS_URL
+    if not streaming_supported():
+        raise HTTPException(
+            status_code=501,
+            detail="Live request events are not served from this deployment; "
+            "poll the hotel's requests instead",
+        )
+    return StreamingResponse(
+        stream_request_events(hotel_id, department.value if department else None),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/requests/user/{user_id}", response_model=RequestPage)
 async def get_requests_by_user(
     user_id: str,
     status: RequestStatus = None,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     request_service: RequestService = Depends(),
 ):
-    return await request_service.get_requests_by_user(user_id, status)
+    return await request_service.get_requests_by_user(user_id, status, limit, cursor)
 
 
-@router.get("/all", response_model=dict)
+@router.get("/all", response_model=RequestPage)
 async def get_all_requests(
     status: Optional[RequestStatus] = None,
     limit: int = Query(50, ge=1, le=100),
-    last_evaluated_key: Optional[str] = None,
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    request_service: RequestService = Depends(),
+):
+    return await request_service.get_all_requests(status, limit, cursor)
+
+
+@router.get("/all/export")
+async def export_requests(
+    status: Optional[RequestStatus] = None,
+    segments: int = Query(4, ge=1, le=16),
     current_user: User = Depends(get_current_user),
     request_service: RequestService = Depends(),
 ):
-    return await request_service.get_all_requests(status, limit, last_evaluated_key)
+    chunks = request_service.export_requests(status, segments)
+    if streaming_supported():
+        return StreamingResponse(chunks, media_type="application/x-ndjson")
+    # Behind Lambda the export is written to S3 and the client is redirected
+    url = await asyncio.to_thread(
+        upload_export, chunks, "requests.ndjson", "application/x-ndjson"
+    )
+    return RedirectResponse(url, status_code=303)
 
 
-@router.get("/all_status", response_model=dict)
+@router.get("/all_status", response_model=RequestPage)
 async def get_all_requests_all_status(
     limit: int = Query(50, ge=1, le=100),
-    last_evaluated_key: Optional[str] = None,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     request_service: RequestService = Depends(),
 ):
-    return await request_service.get_all_requests(None, limit, last_evaluated_key)
+    return await request_service.get_all_requests(None, limit, cursor)
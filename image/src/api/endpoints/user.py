@@ -1,7 +1,15 @@
-from fastapi import APIRouter, HTTPException, Depends
-from schemas.user import UserCreate, UserLogin, UserInDB, Preferences
+from fastapi import APIRouter, HTTPException, Depends, Query
+from schemas.user import (
+    UserCreate,
+    UserLogin,
+    UserInDB,
+    UserPage,
+    Preferences,
+    StaffType,
+)
 from services.user_service import UserService
-from typing import List
+from services.recommendation_service import RecommendationService
+from typing import List, Optional
 
 router = APIRouter()
 
@@ -19,8 +27,7 @@ async def login_user(user: UserLogin):
 @router.get("/users", response_model=List[UserInDB])
 async def get_all_users():
     users = await UserService.get_all_users()
-    for user in users:
-        await UserService.increment_interaction_counter(user.user_id)
+    await UserService.increment_interaction_counters(user.user_id for user in users)
     return users
 
 
@@ -36,14 +43,21 @@ async def delete_user(user_id: str):
     return await UserService.delete_user(user_id)
 
 
-@router.get("/allstaff", response_model=List[UserInDB])
-async def get_all_staff():
-    return await UserService.get_all_staff()
+@router.get("/allstaff", response_model=UserPage)
+async def get_all_staff(
+    staff_type: Optional[StaffType] = None,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+):
+    return await UserService.get_all_staff(staff_type, limit, cursor)
 
 
-@router.get("/allnormal", response_model=List[UserInDB])
-async def get_all_normal():
-    return await UserService.get_all_normal()
+@router.get("/allnormal", response_model=UserPage)
+async def get_all_normal(
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+):
+    return await UserService.get_all_normal(limit, cursor)
 
 
 @router.put("/users/{user_id}/preferences")
@@ -69,3 +83,8 @@ async def get_recommendations(user_id: str):
 @router.put("/users/{user_id}/recommendations", response_model=List[str])
 async def update_recommendations(user_id: str, recommendations: List[str]):
     return await UserService.update_recommendations(user_id, recommendations)
+
+
+@router.post("/users/{user_id}/recommendations/refresh", response_model=List[str])
+async def refresh_recommendations(user_id: str, k: int = Query(10, ge=1, le=50)):
+    return await RecommendationService.refresh_user(user_id, k)
@@ -0,0 +1,130 @@
+import asyncio
+import random
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from core.config import settings
+
+# Shared by every client so warm Lambda containers reuse pooled, kept-alive
+# connections instead of paying client setup and a TLS handshake per request
+CLIENT_CONFIG = Config(
+    max_pool_connections=50,
+    tcp_keepalive=True,
+    connect_timeout=5,
+    read_timeout=30,
+    retries={"max_attempts": 5, "mode": "adaptive"},
+)
+
+# Error codes worth retrying after a back-off: throttling, transient service
+# errors, and conflicts with an in-flight transaction on the same item
+RETRYABLE_ERROR_CODES = {
+    "ProvisionedThroughputExceededException",
+    "RequestLimitExceeded",
+    "ThrottlingException",
+    "TransactionConflictException",
+    "InternalServerError",
+    "ServiceUnavailable",
+}
+
+# batch_get_item accepts at most 100 keys per call
+BATCH_GET_SIZE = 100
+# Rounds of unprocessed-key retries before batch_get_items gives up
+BATCH_GET_MAX_ATTEMPTS = 5
+# Base delay in seconds for jittered exponential backoff between rounds
+BATCH_GET_BASE_DELAY = 0.05
+
+_session: Optional[boto3.session.Session] = None
+_clients: Dict[Tuple, object] = {}
+_resources: Dict[Tuple, object] = {}
+# boto3 sessions are not thread-safe to create clients from concurrently
+_lock = threading.Lock()
+
+
+def _get_session() -> boto3.session.Session:
+    global _session
+    if _session is None:
+        _session = boto3.session.Session()
+    return _session
+
+
+def get_client(service_name: str, region_name: Optional[str] = None, **kwargs):
+    """Process-wide low-level client, created on first use."""
+    region_name = region_name or settings.PRIVATE_AWS_REGION
+    key = (service_name, region_name, tuple(sorted(kwargs.items())))
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _get_session().client(
+                    service_name,
+                    region_name=region_name,
+                    config=CLIENT_CONFIG,
+                    **kwargs,
+                )
+                _clients[key] = client
+    return client
+
+
+def get_resource(service_name: str, region_name: Optional[str] = None):
+    """Process-wide service resource, created on first use."""
+    region_name = region_name or settings.PRIVATE_AWS_REGION
+    key = (service_name, region_name)
+    resource = _resources.get(key)
+    if resource is None:
+        with _lock:
+            resource = _resources.get(key)
+            if resource is None:
+                resource = _get_session().resource(
+                    service_name, region_name=region_name, config=CLIENT_CONFIG
+                )
+                _resources[key] = resource
+    return resource
+
+
+def get_dynamodb():
+    return get_resource("dynamodb")
+
+
+def get_table(table_name: str):
+    # Table objects are cheap wrappers; the pooled client underneath is shared
+    return get_dynamodb().Table(table_name)
+
+
+def is_retryable(error: ClientError) -> bool:
+    return error.response["Error"]["Code"] in RETRYABLE_ERROR_CODES
+
+
+class BatchGetThrottled(Exception):
+    """Raised when keys are still unprocessed after every retry round."""
+
+
+async def batch_get_items(
+    dynamodb, table_name: str, keys: List[dict], projection: Optional[str] = None
+) -> List[dict]:
+    """Fetches every key, retrying the ones DynamoDB leaves unprocessed.
+
+    The blocking calls run in a worker thread and the backoff sleeps on the
+    event loop, so a throttled lookup never stalls other requests.
+    """
+    items = []
+    for start in range(0, len(keys), BATCH_GET_SIZE):
+        request = {"Keys": keys[start : start + BATCH_GET_SIZE]}
+        if projection:
+            request["ProjectionExpression"] = projection
+        request_items = {table_name: request}
+        for attempt in range(BATCH_GET_MAX_ATTEMPTS):
+            response = await asyncio.to_thread(
+                dynamodb.batch_get_item, RequestItems=request_items
+            )
+            items.extend(response.get("Responses", {}).get(table_name, []))
+            request_items = response.get("UnprocessedKeys") or {}
+            if not request_items:
+                break
+            await asyncio.sleep(random.uniform(0, BATCH_GET_BASE_DELAY * 2**attempt))
+        else:
+            raise BatchGetThrottled(table_name)
+    return items
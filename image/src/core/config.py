@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings
+from typing import Optional
 
 
 class Settings(BaseSettings):
@@ -15,7 +16,26 @@ class Settings(BaseSettings):
     DYNAMODB_TABLE_NAME_BOOKINGS: str
     DYNAMODB_TABLE_NAME_HOTELS: str
     DYNAMODB_TABLE_NAME_RAG_INTERACTIONS: str
+    DYNAMODB_TABLE_NAME_OCCUPANCY: str = "chariott-occupancy"
+    DYNAMODB_TABLE_NAME_REQUEST_STATS: str = "chariott-request-stats"
+    DYNAMODB_TABLE_NAME_ROOM_LOCKS: str = "chariott-room-locks"
+    # Optional GSI on the requests table with partition key status, used by
+    # the admin export when filtering by status
+    REQUESTS_STATUS_INDEX: Optional[str] = None
+    # SQS queue that receives document ingestion jobs; without it, jobs run
+    # in process on the API's event loop, which only suits local development
+    # because Lambda freezes the container once the response is sent
+    INGESTION_QUEUE_URL: Optional[str] = None
+    # Redis used to fan request events out to consoles on every instance;
+    # without it, events only reach consoles on the instance that made them
+    REDIS_URL: Optional[str] = None
+    # Processes used to extract text from large PDFs; defaults to the CPU count
+    PDF_EXTRACT_WORKERS: Optional[int] = None
     API_KEY: str
+    # Accept the shared API-Key with a caller-chosen User-ID header. Anyone
+    # holding the key can act as any user, so turn this off once every client
+    # sends Cognito bearer tokens
+    API_KEY_AUTH_ENABLED: bool = True
     PINECONE_API_KEY: str
     PINECONE_INDEX_NAME: str
 
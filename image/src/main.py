@@ -11,6 +11,7 @@ from api.endpoints import hotel, rag_interaction
 from api.endpoints import vector
 from services.agent_manager import AgentManager
 from api.endpoints import top_user_recommendations
+from services.ingestion_service import handle_ingestion_event, is_ingestion_event
 
 
 logging.basicConfig(level=logging.INFO)
@@ -34,9 +35,10 @@ def custom_openapi():
         routes=app.routes,
     )
     openapi_schema["components"]["securitySchemes"] = {
-        "ApiKeyAuth": {"type": "apiKey", "in": "header", "name": "API-Key"}
+        "ApiKeyAuth": {"type": "apiKey", "in": "header", "name": "API-Key"},
+        "BearerAuth": {"type": "http", "scheme": "bearer", "bearerFormat": "JWT"},
     }
-    openapi_schema["security"] = [{"ApiKeyAuth": []}]
+    openapi_schema["security"] = [{"ApiKeyAuth": []}, {"BearerAuth": []}]
     app.openapi_schema = openapi_schema
     return app.openapi_schema
 
@@ -59,7 +61,14 @@ app.include_router(
 )
 
 
-handler = Mangum(app)
+mangum_handler = Mangum(app)
+
+
+def handler(event, context):
+    # SQS deliveries carry document ingestion jobs; everything else is HTTP
+    if is_ingestion_event(event):
+        return handle_ingestion_event(event)
+    return mangum_handler(event, context)
 
 
 @app.get("/")
@@ -1,18 +1,29 @@
-import boto3
+import logging
 from fastapi import Request, Depends, HTTPException
 from fastapi.security import APIKeyHeader
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
+from core.aws import get_dynamodb
 from core.config import settings
 from schemas.user import User, UserType, StaffType, LoyaltyProgram
+from middleware.jwt_verifier import (
+    InvalidTokenError,
+    JWKSUnavailableError,
+    get_jwt_verifier,
+    token_user_id,
+    token_user_type,
+)
+from services.user_cache_service import MISSING, user_profile_cache
 from botocore.exceptions import ClientError
 
+logger = logging.getLogger(__name__)
+
 API_KEY = settings.API_KEY
 API_KEY_HEADER = APIKeyHeader(name="API-Key")
 USER_ID_HEADER = APIKeyHeader(name="User-ID", auto_error=False)
 
 # Initialize DynamoDB client
-dynamodb = boto3.resource("dynamodb", region_name=settings.PRIVATE_AWS_REGION)
+dynamodb = get_dynamodb()
 users_table = dynamodb.Table(settings.DYNAMODB_TABLE_NAME_USERS)
 
 
@@ -24,6 +35,17 @@ class AuthMiddleware(BaseHTTPMiddleware):
         ]:  # Skip authentication for Swagger docs
             return await call_next(request)
 
+        authorization = request.headers.get("Authorization", "")
+        if authorization.lower().startswith("bearer "):
+            return await self._dispatch_bearer(request, call_next, authorization[7:])
+
+        if not settings.API_KEY_AUTH_ENABLED:
+            return JSONResponse(
+                status_code=401,
+                content={"detail": "Bearer token required"},
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
         api_key = request.headers.get("API-Key")
         if api_key != API_KEY:
             return JSONResponse(
@@ -34,30 +56,50 @@ class AuthMiddleware(BaseHTTPMiddleware):
             "User-ID", "dhruv@email.com"
         )  # Use default if not provided
         request.state.user_id = user_id  # Store user_id in request state
+        request.state.user_type = None
 
         return await call_next(request)
 
+    async def _dispatch_bearer(self, request: Request, call_next, token: str):
+        # Cognito tokens are verified locally against the cached JWKS
+        try:
+            claims = await get_jwt_verifier().verify_async(token.strip())
+        except InvalidTokenError as e:
+            return JSONResponse(
+                status_code=401,
+                content={"detail": f"Invalid token: {e}"},
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        except JWKSUnavailableError as e:
+            logger.error(f"Error loading Cognito signing keys: {e}")
+            return JSONResponse(
+                status_code=503, content={"detail": "Token verification unavailable"}
+            )
 
-async def get_current_user(request: Request) -> User:
-    user_id = request.state.user_id
-    try:
-        response = users_table.get_item(Key={"user_id": user_id})
-    except ClientError as e:
-        print(f"Error fetching user from DynamoDB: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
+        user_id = token_user_id(claims)
+        if not user_id:
+            return JSONResponse(
+                status_code=401, content={"detail": "Token has no user identity"}
+            )
+        request.state.user_id = user_id
+        request.state.user_type = token_user_type(claims)
+        request.state.token_claims = claims
 
-    user_data = response.get("Item")
-    if not user_data:
-        # If user not found, return default user
-        return User(
-            user_id=user_id,
-            email=user_id,
-            first_name="Default",
-            last_name="User",
-            user_type=UserType.NORMAL,
-            loyalty_program=LoyaltyProgram.BRONZE,  # Add this line
-        )
+        return await call_next(request)
 
+
+def _default_user(user_id: str) -> User:
+    return User(
+        user_id=user_id,
+        email=user_id,
+        first_name="Default",
+        last_name="User",
+        user_type=UserType.NORMAL,
+        loyalty_program=LoyaltyProgram.BRONZE,  # Add this line
+    )
+
+
+def _build_user(user_data: dict) -> User:
     # Convert DynamoDB data to User object
     user_type = UserType(user_data.get("user_type", UserType.NORMAL))
     staff_type = (
@@ -78,10 +120,48 @@ async def get_current_user(request: Request) -> User:
     )
 
 
+async def get_current_user(request: Request) -> User:
+    user_id = request.state.user_id
+    cached = user_profile_cache.get(user_id)
+    if cached is MISSING:
+        return _default_user(user_id)
+    if cached is not None:
+        return cached
+
+    version = user_profile_cache.version
+    try:
+        response = users_table.get_item(
+            Key={"user_id": user_id},
+            ProjectionExpression=(
+                "user_id, email, first_name, last_name, user_type, staff_type, "
+                "loyalty_program"
+            ),
+        )
+    except ClientError as e:
+        print(f"Error fetching user from DynamoDB: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+    user_data = response.get("Item")
+    if not user_data:
+        # If user not found, return default user
+        user_profile_cache.put(user_id, None, version)
+        return _default_user(user_id)
+
+    user = _build_user(user_data)
+    user_profile_cache.put(user_id, user, version)
+    return user
+
+
 # This function can be used as a dependency in your routes
 async def get_user_id(
     api_key: str = Depends(API_KEY_HEADER), user_id: str = Depends(USER_ID_HEADER)
 ):
+    if not settings.API_KEY_AUTH_ENABLED:
+        raise HTTPException(
+            status_code=401,
+            detail="Bearer token required",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     if api_key != API_KEY:
         raise HTTPException(status_code=403, detail="Could not validate credentials")
     return user_id or "dhruv@email.com"
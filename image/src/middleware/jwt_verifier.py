@@ -0,0 +1,181 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+import urllib.request
+from typing import Callable, Dict, Optional
+
+import jwt
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Cognito rotates signing keys rarely; refresh well ahead of that
+JWKS_REFRESH_SECONDS = 3600
+# A token signed with an unknown kid triggers at most one refetch per window
+JWKS_MIN_REFETCH_SECONDS = 60
+JWKS_FETCH_TIMEOUT_SECONDS = 5
+CLOCK_SKEW_SECONDS = 30
+
+
+class InvalidTokenError(Exception):
+    pass
+
+
+class JWKSUnavailableError(Exception):
+    """The signing keys could not be fetched and none are cached."""
+
+
+def cognito_issuer() -> str:
+    return (
+        f"https://cognito-idp.{settings.PRIVATE_AWS_REGION}.amazonaws.com/"
+        f"{settings.COGNITO_USER_POOL_ID}"
+    )
+
+
+def fetch_cognito_jwks() -> dict:
+    url = f"{cognito_issuer()}/.well-known/jwks.json"
+    with urllib.request.urlopen(url, timeout=JWKS_FETCH_TIMEOUT_SECONDS) as response:
+        return json.load(response)
+
+
+class CognitoJWTVerifier:
+    """Verifies Cognito access and ID tokens locally.
+
+    Signing keys come from the pool's JWKS, cached in memory and refreshed by
+    a background thread. A frozen Lambda container cannot run that thread, so
+    a stale cache is also refreshed inline on the next verification. Apart
+    from those refreshes, verification is a signature check and claim
+    comparison with no network calls.
+    """
+
+    def __init__(
+        self,
+        issuer: str,
+        client_id: str,
+        fetch_jwks: Callable[[], dict] = fetch_cognito_jwks,
+    ):
+        self.issuer = issuer
+        self.client_id = client_id
+        self.fetch_jwks = fetch_jwks
+        self.keys: Dict[str, jwt.PyJWK] = {}
+        self.loaded_at: Optional[float] = None
+        self._last_fetch: Optional[float] = None
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+
+    def refresh(self):
+        with self._lock:
+            self._last_fetch = time.monotonic()
+            try:
+                jwk_set = jwt.PyJWKSet.from_dict(self.fetch_jwks())
+            except (OSError, ValueError, jwt.PyJWTError) as e:
+                raise JWKSUnavailableError(f"Failed to load JWKS: {e}") from e
+            self.keys = {key.key_id: key for key in jwk_set.keys}
+            self.loaded_at = time.monotonic()
+
+    def _should_refresh(self, kid: str) -> bool:
+        if self.loaded_at is None:
+            return True
+        now = time.monotonic()
+        if self._last_fetch is not None and (
+            now - self._last_fetch < JWKS_MIN_REFETCH_SECONDS
+        ):
+            return False
+        # Stale cache, or the pool may have rotated keys since the last refresh
+        return now - self.loaded_at > JWKS_REFRESH_SECONDS or kid not in self.keys
+
+    def _get_key(self, kid: str) -> jwt.PyJWK:
+        if self._should_refresh(kid):
+            try:
+                self.refresh()
+            except JWKSUnavailableError as e:
+                if not self.keys:
+                    raise
+                logger.error(f"{e}; using cached keys")
+        key = self.keys.get(kid)
+        if key is None:
+            raise InvalidTokenError("Unknown signing key")
+        return key
+
+    def start_background_refresh(self):
+        if self._worker is not None:
+            return
+        self._worker = threading.Thread(
+            target=self._run, name="jwks-refresh", daemon=True
+        )
+        self._worker.start()
+
+    def _run(self):
+        while True:
+            time.sleep(JWKS_REFRESH_SECONDS / 2)
+            try:
+                self.refresh()
+            except JWKSUnavailableError as e:
+                # Keep serving the cached keys; the next attempt may succeed
+                logger.error(str(e))
+
+    @staticmethod
+    def _kid(token: str) -> str:
+        try:
+            return jwt.get_unverified_header(token).get("kid", "")
+        except jwt.PyJWTError as e:
+            raise InvalidTokenError(str(e))
+
+    async def verify_async(self, token: str) -> dict:
+        # Only a JWKS fetch blocks; when one is due it runs on a worker thread
+        # and the signature check that follows finds the keys cached
+        kid = self._kid(token)
+        if self._should_refresh(kid):
+            await asyncio.to_thread(self._get_key, kid)
+        return self.verify(token)
+
+    def verify(self, token: str) -> dict:
+        key = self._get_key(self._kid(token))
+        try:
+            claims = jwt.decode(
+                token,
+                key.key,
+                algorithms=["RS256"],
+                issuer=self.issuer,
+                leeway=CLOCK_SKEW_SECONDS,
+                # Access tokens carry client_id instead of aud; checked below
+                options={"require": ["exp", "iss"], "verify_aud": False},
+            )
+        except jwt.PyJWTError as e:
+            raise InvalidTokenError(str(e))
+
+        token_use = claims.get("token_use")
+        if token_use == "access":
+            audience = claims.get("client_id")
+        elif token_use == "id":
+            audience = claims.get("aud")
+        else:
+            raise InvalidTokenError("Unsupported token_use")
+        if audience != self.client_id:
+            raise InvalidTokenError("Token was issued for another client")
+        return claims
+
+
+def token_user_id(claims: dict) -> Optional[str]:
+    # Users are keyed by email, which is also their Cognito username
+    return claims.get("email") or claims.get("username") or claims.get(
+        "cognito:username"
+    )
+
+
+def token_user_type(claims: dict) -> Optional[str]:
+    # Only ID tokens carry custom attributes
+    return claims.get("custom:user_type")
+
+
+_verifier: Optional[CognitoJWTVerifier] = None
+
+
+def get_jwt_verifier() -> CognitoJWTVerifier:
+    global _verifier
+    if _verifier is None:
+        _verifier = CognitoJWTVerifier(cognito_issuer(), settings.COGNITO_APP_CLIENT_ID)
+        _verifier.start_background_refresh()
+    return _verifier
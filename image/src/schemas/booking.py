@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, validator
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional, List
 from enum import Enum
 from utils.utils import parse_est_datetime, format_est_datetime
@@ -48,6 +48,42 @@ class Booking(BookingBase):
         from_attributes = True
 
 
+class AvailableRoom(BaseModel):
+    room_number: str
+    room_info: RoomInfo
+
+
+class BookingPage(BaseModel):
+    bookings: List[Booking]
+    next_cursor: Optional[str] = None
+
+
+class DailyManifest(BaseModel):
+    day: date
+    arrivals: List[Booking]
+    departures: List[Booking]
+
+
+class HotelManifest(BaseModel):
+    hotel_id: str
+    today: DailyManifest
+    tomorrow: DailyManifest
+
+
+class BookingImportResult(BaseModel):
+    row: int
+    status: str
+    booking_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BookingImportReport(BaseModel):
+    total: int
+    created: int
+    failed: int
+    results: List[BookingImportResult]
+
+
 class BookingUpdate(BaseModel):
     room_number: Optional[str] = None
     start_date: Optional[datetime] = None
@@ -9,6 +9,7 @@ class DocumentUploadResponse(BaseModel):
     url: HttpUrl
     user_id: str
     processing_status: str = "completed"
+    job_id: Optional[str] = None
 
 
 class DocumentUploadError(BaseModel):
@@ -25,3 +26,15 @@ class DocumentListResponse(BaseModel):
 class DocumentResponse(DocumentListResponse):
     chain_id: Optional[str] = None
     hotel_id: Optional[str] = None
+
+
+class DocumentJobStatus(BaseModel):
+    job_id: str
+    status: str
+    stage: Optional[str] = None
+    attempt: int = 1
+    stage_attempt: Optional[int] = None
+    error: Optional[str] = None
+    chunks_indexed: Optional[int] = None
+    chunk_count: Optional[int] = None
+    updated_at: Optional[str] = None
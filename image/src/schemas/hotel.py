@@ -1,4 +1,5 @@
 from pydantic import BaseModel, Field, HttpUrl, validator
+from datetime import date
 from typing import List, Optional, Union
 
 
@@ -60,3 +61,25 @@ class HotelUpdate(BaseModel):
 
 class HotelInDB(Hotel):
     pass
+
+
+class OccupancyCalendar(BaseModel):
+    hotel_id: str
+    start_date: date
+    occupancy: List[int]
+
+
+class HotelSearchResult(BaseModel):
+    hotels: List[Hotel]
+    total: int
+    offset: int
+    limit: int
+
+
+class HotelBatchRequest(BaseModel):
+    hotel_ids: List[str] = Field(..., min_length=1, max_length=100)
+
+
+class HotelBatchResult(BaseModel):
+    hotels: List[Hotel]
+    missing: List[str] = []
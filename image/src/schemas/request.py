@@ -1,7 +1,7 @@
 from pydantic import BaseModel, Field
 from enum import Enum
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
 from uuid import uuid4
 
 
@@ -37,6 +37,12 @@ class Request(BaseModel):
     status: RequestStatus = Field(
         default=RequestStatus.PENDING, description="Current status of the request"
     )
+    assigned_to: Optional[str] = Field(
+        None, description="ID of the staff member who claimed the request"
+    )
+    time_claimed: Optional[datetime] = Field(
+        None, description="Time when the request was claimed"
+    )
 
 
 class RequestCreate(BaseModel):
@@ -53,3 +59,28 @@ class RequestUpdate(BaseModel):
 
 class RequestResponse(Request):
     pass
+
+
+class RequestPage(BaseModel):
+    requests: List[RequestResponse]
+    next_cursor: Optional[str] = None
+
+
+class RequestSummary(BaseModel):
+    hotel_id: str
+    # department -> status -> number of requests
+    departments: Dict[str, Dict[str, int]]
+
+
+class SLAPercentiles(BaseModel):
+    count: int
+    mean_seconds: Optional[float] = None
+    p50_seconds: Optional[float] = None
+    p90_seconds: Optional[float] = None
+    p99_seconds: Optional[float] = None
+
+
+class SLASummary(BaseModel):
+    hotel_id: str
+    # department -> completion latency (time_completed - time_issued)
+    departments: Dict[str, SLAPercentiles]
@@ -113,6 +113,11 @@ class UserInDB(User):
     hashed_password: Optional[str] = None
 
 
+class UserPage(BaseModel):
+    users: List[UserInDB]
+    next_cursor: Optional[str] = None
+
+
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
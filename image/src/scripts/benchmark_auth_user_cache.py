@@ -0,0 +1,69 @@
+# scripts/benchmark_auth_user_cache.py
+#
+# Times get_current_user for known and unknown ids with the user profile
+# cache cleared before every call (a DynamoDB get_item each time, as before
+# the cache) and warm. Runs on an in-memory users table (moto), so cold
+# numbers exclude the network round trip a real table adds. Needs moto from
+# requirements-dev.txt.
+#
+# Run from image/src:  python -m scripts.benchmark_auth_user_cache [--requests 2000]
+
+import argparse
+import asyncio
+import statistics
+import time
+from types import SimpleNamespace
+from typing import Callable
+
+from moto import mock_aws
+
+
+def main(requests: int):
+    from middleware.auth import get_current_user
+    from scripts.benchmark_aws_clients import USERS, create_users_table
+    from services.user_cache_service import user_profile_cache
+
+    create_users_table()
+    loop = asyncio.new_event_loop()
+
+    def resolve(user_id: str):
+        request = SimpleNamespace(state=SimpleNamespace(user_id=user_id))
+        return loop.run_until_complete(get_current_user(request))
+
+    def p50_microseconds(user_id: Callable[[int], str], cold: bool) -> float:
+        samples = []
+        if not cold:
+            for number in range(USERS):
+                resolve(user_id(number))
+        for number in range(requests):
+            if cold:
+                user_profile_cache.clear()
+            started = time.perf_counter()
+            resolve(user_id(number))
+            samples.append((time.perf_counter() - started) * 1e6)
+        return statistics.median(samples)
+
+    def known(number: int) -> str:
+        return f"guest-{number % USERS}@example.com"
+
+    def unknown(number: int) -> str:
+        return f"nobody-{number % USERS}@example.com"
+
+    print(f"get_current_user, median of {requests} calls")
+    for name, user_id in (("known id", known), ("unknown id", unknown)):
+        cold = p50_microseconds(user_id, cold=True)
+        warm = p50_microseconds(user_id, cold=False)
+        print(
+            f"{name:<11} uncached {cold:8.1f} us  cached {warm:6.1f} us  "
+            f"x{cold / warm:.0f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark user resolution in the auth path"
+    )
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    with mock_aws():
+        main(args.requests)
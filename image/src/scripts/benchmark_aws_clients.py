@@ -0,0 +1,94 @@
+# scripts/benchmark_aws_clients.py
+#
+# Times UserService.get_user through the shared, pooled client registry
+# against building a fresh DynamoDB resource per call, as services used to, on
+# an in-memory users table (moto). moto has no network, so this measures
+# client setup only; TLS handshakes saved on a real endpoint come on top.
+# Needs moto from requirements-dev.txt.
+#
+# Run from image/src:  python -m scripts.benchmark_aws_clients [--requests 500]
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Callable, List
+
+import boto3
+from moto import mock_aws
+
+USERS = 100
+
+
+def create_users_table():
+    from core.aws import get_dynamodb
+    from services.user_service import users_table
+
+    get_dynamodb().create_table(
+        TableName=users_table.name,
+        KeySchema=[{"AttributeName": "user_id", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "user_id", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    with users_table.batch_writer() as batch:
+        for number in range(USERS):
+            user_id = f"guest-{number}@example.com"
+            batch.put_item(
+                Item={
+                    "user_id": user_id,
+                    "email": user_id,
+                    "first_name": "Guest",
+                    "last_name": str(number),
+                    "user_type": "normal",
+                    "loyalty_program": "gold",
+                }
+            )
+
+
+def latencies(get_user: Callable[[str], object], requests: int) -> List[float]:
+    samples = []
+    for number in range(requests):
+        started = time.perf_counter()
+        get_user(f"guest-{number % USERS}@example.com")
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main(requests: int):
+    from core.config import settings
+    from schemas.user import UserInDB
+    from services.user_service import UserService
+
+    create_users_table()
+
+    def per_call_resource(user_id: str) -> UserInDB:
+        dynamodb = boto3.resource("dynamodb", region_name=settings.PRIVATE_AWS_REGION)
+        table = dynamodb.Table(settings.DYNAMODB_TABLE_NAME_USERS)
+        return UserInDB(**table.get_item(Key={"user_id": user_id})["Item"])
+
+    loop = asyncio.new_event_loop()
+
+    def shared_client(user_id: str) -> UserInDB:
+        return loop.run_until_complete(UserService.get_user(user_id))
+
+    print(f"get_user, {requests} calls")
+    for name, get_user in (
+        ("per-call resource", per_call_resource),
+        ("shared registry", shared_client),
+    ):
+        samples = latencies(get_user, requests)
+        p99 = statistics.quantiles(samples, n=100)[98]
+        print(
+            f"{name:<18} p50 {statistics.median(samples):7.2f} ms  "
+            f"p99 {p99:7.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark get_user with shared and per-call AWS clients"
+    )
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+    with mock_aws():
+        main(args.requests)
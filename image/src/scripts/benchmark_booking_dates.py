@@ -0,0 +1,78 @@
+# scripts/benchmark_booking_dates.py
+#
+# Times turning stored booking dates back into EST datetimes, per item, for
+# the ISO strings bookings used to rely on and the epoch-second mirrors they
+# are read from now, each with and without memoization. Caches are cleared
+# before every run, so misses for distinct dates are included.
+#
+# Run from image/src:  python -m scripts.benchmark_booking_dates [--items 100000]
+
+import argparse
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+from typing import Callable, List
+
+from utils.utils import (
+    format_est_datetime,
+    from_epoch,
+    get_current_est_time,
+    parse_est_datetime,
+    to_epoch,
+)
+
+
+def per_item_microseconds(
+    convert: Callable, values: List, clear: Callable[[], None], repeat: int
+) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        clear()
+        started = time.perf_counter()
+        for value in values:
+            convert(value)
+        best = min(best, time.perf_counter() - started)
+    return best / len(values) * 1e6
+
+
+def main(items: int, repeat: int):
+    # Check-ins and check-outs fall on a few fixed times over two years, as
+    # they do in the bookings table
+    random.seed(0)
+    now = get_current_est_time()
+    today = now.replace(hour=15, minute=0, second=0, microsecond=0)
+    dates = [
+        today
+        + timedelta(days=random.randint(-365, 365), hours=random.choice([0, 20]))
+        for _ in range(items)
+    ]
+    iso = [format_est_datetime(date) for date in dates]
+    # DynamoDB returns numbers as Decimal
+    epochs = [Decimal(to_epoch(date)) for date in dates]
+
+    def no_cache():
+        pass
+
+    runs = (
+        ("iso, pytz per item", parse_est_datetime.__wrapped__, iso, no_cache),
+        ("iso, memoized", parse_est_datetime, iso, parse_est_datetime.cache_clear),
+        ("epoch, per item", from_epoch.__wrapped__, epochs, no_cache),
+        ("epoch, memoized", from_epoch, epochs, from_epoch.cache_clear),
+    )
+    print(f"{items} dates, {len(set(iso))} distinct")
+    baseline = None
+    for name, convert, values, clear in runs:
+        elapsed = per_item_microseconds(convert, values, clear, repeat)
+        baseline = baseline or elapsed
+        print(f"{name:<20} {elapsed:6.2f} us/date  x{baseline / elapsed:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark ISO and epoch booking date decoding"
+    )
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args.items, args.repeat)
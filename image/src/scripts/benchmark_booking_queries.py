@@ -0,0 +1,221 @@
+# scripts/benchmark_booking_queries.py
+#
+# Compares a guest's trip list read through the user/date GSIs against the
+# filtered full-table scan it replaced, on an in-memory bookings table (moto).
+# Read units are estimated from item sizes with DynamoDB's rules (4 KB per
+# unit per request, at least one, halved for eventually consistent reads),
+# since moto does not meter them. Latencies are moto's, whose index queries
+# also walk the whole table, so they understate the gap. Needs moto from
+# requirements-dev.txt.
+#
+# Run from image/src:
+#   python -m scripts.benchmark_booking_queries [--bookings 100000] [--samples 5]
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import statistics
+import time
+from datetime import timedelta
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from boto3.dynamodb.conditions import Attr, Key
+from moto import mock_aws
+
+HOTELS = 50
+READ_UNIT_BYTES = 4096
+
+
+def create_bookings_table():
+    from core.aws import get_dynamodb
+    from services.availability_service import HOTEL_END_DATE_INDEX
+    from services.booking_service import (
+        HOTEL_START_DATE_INDEX,
+        USER_END_DATE_INDEX,
+        USER_START_DATE_INDEX,
+        table,
+    )
+
+    indexes = {
+        USER_START_DATE_INDEX: ("user_id", "start_ts"),
+        USER_END_DATE_INDEX: ("user_id", "end_ts"),
+        HOTEL_START_DATE_INDEX: ("hotel_id", "start_ts"),
+        HOTEL_END_DATE_INDEX: ("hotel_id", "end_ts"),
+    }
+    get_dynamodb().create_table(
+        TableName=table.name,
+        KeySchema=[{"AttributeName": "booking_id", "KeyType": "HASH"}],
+        AttributeDefinitions=[
+            {"AttributeName": name, "AttributeType": kind}
+            for name, kind in (
+                ("booking_id", "S"),
+                ("user_id", "S"),
+                ("hotel_id", "S"),
+                ("start_ts", "N"),
+                ("end_ts", "N"),
+            )
+        ],
+        GlobalSecondaryIndexes=[
+            {
+                "IndexName": index_name,
+                "KeySchema": [
+                    {"AttributeName": partition_key, "KeyType": "HASH"},
+                    {"AttributeName": sort_key, "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            }
+            for index_name, (partition_key, sort_key) in indexes.items()
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    return table
+
+
+def generated_bookings(count: int, users: int) -> Iterable[Dict]:
+    # Stays spread over a year either side of today, so every guest has past,
+    # current and future trips
+    from schemas.booking import BookingCreate
+    from services.booking_service import BookingService
+    from utils.utils import get_current_est_time
+
+    random.seed(0)
+    now = get_current_est_time()
+    today = now.replace(hour=15, minute=0, second=0, microsecond=0)
+    for number in range(count):
+        start = today + timedelta(days=random.randint(-365, 365))
+        hotel = number % HOTELS
+        yield BookingService._build_item(
+            BookingCreate(
+                user_id=f"guest-{number % users}@example.com",
+                hotel_id=f"hotel-{hotel}",
+                room_number=str(100 + number % 400),
+                start_date=start,
+                end_date=start + timedelta(days=random.randint(1, 7), hours=-4),
+                hotel_name=f"Chariott {hotel}",
+                room_info={"beds": 1, "bathrooms": 1, "size": "king"},
+            )
+        )
+
+
+def load(table, items: Iterable[Dict]):
+    with table.batch_writer() as batch:
+        for item in items:
+            batch.put_item(Item=item)
+
+
+def item_size(item: Dict) -> int:
+    return len(json.dumps(item, default=str))
+
+
+def read_units(pages: Iterable[List[Dict]]) -> float:
+    # Every request costs at least one unit, even when it returns nothing
+    return sum(
+        max(math.ceil(sum(item_size(item) for item in page) / READ_UNIT_BYTES), 1)
+        / 2
+        for page in pages
+    )
+
+
+def pages(read: Callable[..., Dict], **kwargs) -> Iterable[List[Dict]]:
+    while True:
+        response = read(**kwargs)
+        yield response.get("Items", [])
+        if "LastEvaluatedKey" not in response:
+            break
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def timed(run: Callable[[], object]) -> Tuple[float, object]:
+    started = time.perf_counter()
+    result = run()
+    return time.perf_counter() - started, result
+
+
+def main(count: int, users: int, samples: int):
+    from services.booking_service import (
+        USER_END_DATE_INDEX,
+        USER_START_DATE_INDEX,
+        BookingService,
+    )
+    from utils.utils import get_current_est_time, to_epoch
+
+    table = create_bookings_table()
+    elapsed, _ = timed(lambda: load(table, generated_bookings(count, users)))
+    print(f"loaded {count} bookings for {users} guests in {elapsed:.1f} s")
+
+    # Every scan reads the whole table whatever the filter keeps
+    scan_units = read_units(pages(table.scan))
+
+    def scan_trips(user_id: str) -> int:
+        matches = pages(table.scan, FilterExpression=Attr("user_id").eq(user_id))
+        return sum(len(page) for page in matches)
+
+    def query_units(user_id: str) -> float:
+        # Past and current trips read the guest's whole end-date partition,
+        # including the future trips the current filter drops; future trips
+        # read the start-date range after now
+        now = to_epoch(get_current_est_time())
+        return read_units(
+            pages(
+                table.query,
+                IndexName=USER_END_DATE_INDEX,
+                KeyConditionExpression=Key("user_id").eq(user_id),
+            )
+        ) + read_units(
+            pages(
+                table.query,
+                IndexName=USER_START_DATE_INDEX,
+                KeyConditionExpression=Key("user_id").eq(user_id)
+                & Key("start_ts").gt(now),
+            )
+        )
+
+    def query_trips(user_id: str) -> int:
+        trips = 0
+        for read in (
+            BookingService.get_past_bookings,
+            BookingService.get_current_bookings,
+            BookingService.get_future_bookings,
+        ):
+            cursor = None
+            while True:
+                page = asyncio.run(read(user_id, limit=100, cursor=cursor))
+                trips += len(page["bookings"])
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    break
+        return trips
+
+    scan_times, query_times, units = [], [], []
+    for user in random.sample(range(users), samples):
+        user_id = f"guest-{user}@example.com"
+        elapsed, scanned = timed(lambda: scan_trips(user_id))
+        scan_times.append(elapsed)
+        elapsed, queried = timed(lambda: query_trips(user_id))
+        query_times.append(elapsed)
+        units.append(query_units(user_id))
+        assert scanned == queried, (scanned, queried)
+
+    print(f"guest trip list, median of {samples} guests:")
+    print(
+        f"scan   {statistics.median(scan_times) * 1000:9.1f} ms  "
+        f"{scan_units:8.1f} read units"
+    )
+    print(
+        f"query  {statistics.median(query_times) * 1000:9.1f} ms  "
+        f"{statistics.median(units):8.1f} read units"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark GSI-backed guest trip lists against a table scan"
+    )
+    parser.add_argument("--bookings", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--samples", type=int, default=5)
+    args = parser.parse_args()
+    with mock_aws():
+        main(args.bookings, args.users, args.samples)
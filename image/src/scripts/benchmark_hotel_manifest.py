@@ -0,0 +1,120 @@
+# scripts/benchmark_hotel_manifest.py
+#
+# Compares a hotel's arrivals/departures manifest for today and tomorrow read
+# through the hotel/date GSIs against filtered full-table scans, on an
+# in-memory bookings table (moto), and times the cached manifest. Read units
+# and latencies are estimated as in scripts/benchmark_booking_queries.py.
+# Needs moto from requirements-dev.txt.
+#
+# Run from image/src:
+#   python -m scripts.benchmark_hotel_manifest [--bookings 100000] [--samples 5]
+
+import argparse
+import asyncio
+import random
+import statistics
+from datetime import timedelta
+
+from boto3.dynamodb.conditions import Attr, Key
+from moto import mock_aws
+from scripts.benchmark_booking_queries import (
+    HOTELS,
+    create_bookings_table,
+    generated_bookings,
+    load,
+    pages,
+    read_units,
+    timed,
+)
+
+
+def main(count: int, users: int, samples: int):
+    from services import booking_service
+    from services.availability_service import HOTEL_END_DATE_INDEX
+    from services.booking_service import HOTEL_START_DATE_INDEX, BookingService
+    from utils.utils import est_day_bounds, get_current_est_time
+
+    table = create_bookings_table()
+    elapsed, _ = timed(lambda: load(table, generated_bookings(count, users)))
+    print(f"loaded {count} bookings for {HOTELS} hotels in {elapsed:.1f} s")
+
+    today = get_current_est_time().date()
+    first_day, _ = est_day_bounds(today)
+    _, last_day = est_day_bounds(today + timedelta(days=1))
+    scan_units = read_units(pages(table.scan))
+
+    def in_window(name: str):
+        return Attr(name).between(first_day, last_day - 1)
+
+    def scan_manifest(hotel_id: str) -> int:
+        matches = pages(
+            table.scan,
+            FilterExpression=Attr("hotel_id").eq(hotel_id)
+            & (in_window("start_ts") | in_window("end_ts")),
+        )
+        return sum(len(page) for page in matches)
+
+    def query_units(hotel_id: str) -> float:
+        return sum(
+            read_units(
+                pages(
+                    table.query,
+                    IndexName=index_name,
+                    KeyConditionExpression=Key("hotel_id").eq(hotel_id)
+                    & Key(sort_key).between(first_day, last_day - 1),
+                )
+            )
+            for index_name, sort_key in (
+                (HOTEL_START_DATE_INDEX, "start_ts"),
+                (HOTEL_END_DATE_INDEX, "end_ts"),
+            )
+        )
+
+    def query_manifest(hotel_id: str) -> int:
+        booking_service._manifest_cache.pop(hotel_id, None)
+        manifest = asyncio.run(BookingService.get_hotel_manifest(hotel_id))
+        return len(
+            {
+                booking["booking_id"]
+                for day in ("today", "tomorrow")
+                for kind in ("arrivals", "departures")
+                for booking in manifest[day][kind]
+            }
+        )
+
+    def cached_manifest(hotel_id: str):
+        asyncio.run(BookingService.get_hotel_manifest(hotel_id))
+
+    scan_times, query_times, cached_times, units = [], [], [], []
+    for hotel in random.sample(range(HOTELS), samples):
+        hotel_id = f"hotel-{hotel}"
+        elapsed, scanned = timed(lambda: scan_manifest(hotel_id))
+        scan_times.append(elapsed)
+        elapsed, queried = timed(lambda: query_manifest(hotel_id))
+        query_times.append(elapsed)
+        units.append(query_units(hotel_id))
+        cached_times.append(timed(lambda: cached_manifest(hotel_id))[0])
+        assert scanned == queried, (scanned, queried)
+
+    print(f"today/tomorrow manifest, median of {samples} hotels:")
+    for name, times, read in (
+        ("scan", scan_times, scan_units),
+        ("query", query_times, statistics.median(units)),
+        ("cached", cached_times, 0.0),
+    ):
+        print(
+            f"{name:<7}{statistics.median(times) * 1000:9.1f} ms  "
+            f"{read:8.1f} read units"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark GSI-backed hotel manifests against a table scan"
+    )
+    parser.add_argument("--bookings", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--samples", type=int, default=5)
+    args = parser.parse_args()
+    with mock_aws():
+        main(args.bookings, args.users, args.samples)
@@ -0,0 +1,116 @@
+# scripts/benchmark_hotel_search.py
+#
+# Times the in-memory hotel search index on synthetic catalogs: rebuild,
+# single-hotel upsert, and combined filters against filtering the full hotel
+# list in Python, which is what clients did before the index existed.
+#
+# Run from image/src:
+#   python -m scripts.benchmark_hotel_search [--hotels 10000 100000]
+
+import argparse
+import random
+import time
+from typing import Callable, Dict, List
+
+from schemas.hotel import Amenities, Hotel, Location
+from services.hotel_search_service import HotelSearchIndex
+
+STATES = {
+    f"S{state:02d}": [f"City {state}-{city}" for city in range(10)]
+    for state in range(50)
+}
+QUERIES: Dict[str, Dict] = {
+    "city": {"city": "City 7-3"},
+    "state + amenities": {"state": "S07", "amenities": ["parking", "bar"]},
+    "amenities + eco 7..10": {
+        "amenities": ["pet_friendly", "front_desk_24_7"],
+        "min_eco_rating": 7,
+    },
+    "city + amenities + eco": {
+        "city": "City 7-3",
+        "amenities": ["breakfast"],
+        "min_eco_rating": 5,
+    },
+}
+
+
+def generated_hotels(count: int) -> List[Hotel]:
+    random.seed(0)
+    hotels = []
+    for number in range(count):
+        state = random.choice(list(STATES))
+        hotels.append(
+            Hotel(
+                hotel_id=f"hotel-{number:06d}",
+                name=f"Hotel {number}",
+                eco_rating=random.randint(0, 10),
+                location=Location(
+                    city=random.choice(STATES[state]), state=state, country="US"
+                ),
+                amenities=Amenities(
+                    **{name: random.random() < 0.5 for name in Amenities.model_fields}
+                ),
+            )
+        )
+    return hotels
+
+
+def list_filter(hotels: List[Hotel], **query) -> int:
+    # Eco order and pagination are left out, which favours this baseline
+    location = {
+        field: query[field].lower()
+        for field in ("city", "state", "country")
+        if field in query
+    }
+    low, high = query.get("min_eco_rating", 0), query.get("max_eco_rating", 10)
+    return sum(
+        1
+        for hotel in hotels
+        if all(
+            getattr(hotel.location, field).lower() == value
+            for field, value in location.items()
+        )
+        and all(getattr(hotel.amenities, name) for name in query.get("amenities", []))
+        and low <= hotel.eco_rating <= high
+    )
+
+
+def microseconds(run: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+    return best * 1e6
+
+
+def main(sizes: List[int], repeat: int):
+    for count in sizes:
+        hotels = generated_hotels(count)
+        index = HotelSearchIndex()
+        rebuild = microseconds(lambda: index.rebuild(hotels), 1)
+        updated = hotels[count // 2].model_copy(update={"eco_rating": 3})
+        upsert = microseconds(lambda: index.upsert(updated), repeat)
+        print(
+            f"{count} hotels: rebuild {rebuild / 1000:.1f} ms, "
+            f"upsert {upsert:.1f} us"
+        )
+        for name, query in QUERIES.items():
+            _, total = index.search(**query)
+            assert total == list_filter(hotels, **query), name
+            indexed = microseconds(lambda: index.search(**query), repeat)
+            scanned = microseconds(lambda: list_filter(hotels, **query), repeat)
+            print(
+                f"  {name:<24} {total:6d} hits  index {indexed:9.1f} us  "
+                f"list {scanned:10.1f} us  x{scanned / indexed:.0f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the in-memory hotel search index"
+    )
+    parser.add_argument("--hotels", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.hotels, args.repeat)
@@ -0,0 +1,68 @@
+# scripts/benchmark_ingest_memory.py
+#
+# Compares peak Python heap of the streaming chunker against the old
+# whole-document path (copy the file, extract every page, join the text, then
+# split), on a given PDF or a generated one. Generating a document needs fpdf2
+# from requirements-dev.txt. Embedding is left out; both paths only count chunks.
+#
+# Run from image/src:
+#   python -m scripts.benchmark_ingest_memory [--pages 500]
+
+import argparse
+import io
+import time
+import tracemalloc
+from typing import Callable, Optional
+
+from pypdf import PdfReader
+from scripts.benchmark_pdf_extraction import generated_pdf
+from services.document_processor import iter_chunks, text_splitter
+from services.pdf_extractor import iter_page_texts
+
+
+def whole_document(data: bytes) -> int:
+    pdf_file = io.BytesIO(data)
+    copy = io.BytesIO(pdf_file.getvalue())
+    reader = PdfReader(copy)
+    text = "\n".join(page.extract_text() or "" for page in reader.pages)
+    return len(text_splitter.split_text(text))
+
+
+def streaming(data: bytes) -> int:
+    # One worker so the extraction is measured in this process
+    pages = iter_page_texts(io.BytesIO(data), workers=1)
+    return sum(1 for _ in iter_chunks(pages))
+
+
+def measure(name: str, run: Callable[[bytes], int], data: bytes):
+    tracemalloc.start()
+    started = time.perf_counter()
+    chunks = run(data)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{name:<15} {chunks:6d} chunks  peak {peak / 2**20:7.1f} MiB  "
+        f"{elapsed:6.2f} s"
+    )
+
+
+def main(pdf_path: Optional[str], pages: int):
+    if pdf_path:
+        with open(pdf_path, "rb") as f:
+            data = f.read()
+    else:
+        data = generated_pdf(pages)
+    print(f"document: {len(data) / 2**20:.1f} MiB")
+    measure("whole-document", whole_document, data)
+    measure("streaming", streaming, data)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark peak memory of streaming and whole-document chunking"
+    )
+    parser.add_argument("--pdf", help="PDF to chunk; generated when omitted")
+    parser.add_argument("--pages", type=int, default=500)
+    args = parser.parse_args()
+    main(args.pdf, args.pages)
@@ -0,0 +1,70 @@
+# scripts/benchmark_interaction_counters.py
+#
+# Times recording one interaction for each user in a listing: a synchronous
+# update_item per user, as reads used to do, against the coalescing buffer,
+# whose flush sends the per-user ADD updates in parallel. Runs on an
+# in-memory users table (moto), with a fixed delay per update standing in for
+# the DynamoDB round trip. Needs moto from requirements-dev.txt.
+#
+# Run from image/src:
+#   python -m scripts.benchmark_interaction_counters \
+#       [--users 1000] [--latency-ms 10]
+
+import argparse
+import time
+from unittest import mock
+
+from moto import mock_aws
+
+
+def main(users: int, latency_ms: float):
+    from scripts.benchmark_aws_clients import create_users_table
+    from services import interaction_counter_service
+    from services.interaction_counter_service import (
+        InteractionCounterBuffer,
+        users_table,
+    )
+
+    create_users_table()
+    user_ids = [f"guest-{number}" for number in range(users)]
+    client = interaction_counter_service.dynamodb.meta.client
+    update_item = client.update_item
+
+    def slow_update_item(**kwargs):
+        time.sleep(latency_ms / 1000)
+        return update_item(**kwargs)
+
+    with mock.patch.object(client, "update_item", slow_update_item):
+        started = time.perf_counter()
+        for user_id in user_ids:
+            interaction_counter_service._write_increment(user_id, 1)
+        sequential = time.perf_counter() - started
+
+        buffer = InteractionCounterBuffer()
+        # Flushed explicitly below instead of on the worker thread, to time
+        # the writes that now happen off the request
+        buffer._ensure_worker = lambda: None
+        started = time.perf_counter()
+        buffer.add_many(user_ids)
+        recorded = time.perf_counter() - started
+        buffer.flush()
+        flushed = time.perf_counter() - started
+
+    item = users_table.get_item(Key={"user_id": user_ids[-1]})["Item"]
+    assert item["interaction_counter"] == 2, item
+
+    print(f"{users} users, {latency_ms:g} ms per update")
+    print(f"sequential updates       {sequential * 1000:9.1f} ms on the request")
+    print(f"buffer, request path     {recorded * 1000:9.1f} ms")
+    print(f"buffer, background flush {(flushed - recorded) * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark buffered and per-read interaction counter writes"
+    )
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=10)
+    args = parser.parse_args()
+    with mock_aws():
+        main(args.users, args.latency_ms)
@@ -0,0 +1,59 @@
+# scripts/benchmark_jwt_verification.py
+#
+# Times local Cognito token verification against a throwaway RSA key pair:
+# the first call, which loads the JWKS, and steady-state calls served from the
+# cached keys. No network access is needed.
+#
+# Run from image/src:  python -m scripts.benchmark_jwt_verification [-n 5000]
+
+import argparse
+import json
+import time
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from middleware.jwt_verifier import CognitoJWTVerifier
+
+ISSUER = "https://cognito-idp.us-east-1.amazonaws.com/us-east-1_Benchmark"
+CLIENT_ID = "benchmark-client"
+
+
+def main(iterations: int):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update({"kid": "benchmark", "alg": "RS256", "use": "sig"})
+    token = jwt.encode(
+        {
+            "sub": "benchmark",
+            "iss": ISSUER,
+            "exp": int(time.time()) + 3600,
+            "token_use": "access",
+            "client_id": CLIENT_ID,
+        },
+        private_key,
+        algorithm="RS256",
+        headers={"kid": "benchmark"},
+    )
+    verifier = CognitoJWTVerifier(ISSUER, CLIENT_ID, lambda: {"keys": [jwk]})
+
+    started = time.perf_counter()
+    verifier.verify(token)
+    first = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        verifier.verify(token)
+    elapsed = time.perf_counter() - started
+
+    print(f"first verify (loads JWKS): {first * 1e6:8.1f} us")
+    print(f"cached verify:             {elapsed / iterations * 1e6:8.1f} us")
+    print(f"throughput:                {iterations / elapsed:8.0f} tokens/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark local Cognito JWT verification"
+    )
+    parser.add_argument("-n", "--iterations", type=int, default=5000)
+    args = parser.parse_args()
+    main(args.iterations)
@@ -0,0 +1,60 @@
+# scripts/benchmark_pdf_extraction.py
+#
+# Measures page-text extraction throughput (pages/sec) serially and with
+# spawned worker processes, on a given PDF or a generated one. Generating a
+# document needs fpdf2 from requirements-dev.txt.
+#
+# Run from image/src:
+#   python -m scripts.benchmark_pdf_extraction [--pages 400] [--workers 1 2 4]
+
+import argparse
+import io
+import time
+from typing import List, Optional
+from services.pdf_extractor import iter_page_texts
+
+
+def generated_pdf(pages: int) -> bytes:
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.set_font("Helvetica", size=9)
+    text = "Checkout, towels, room service, late arrival, parking validation. "
+    for number in range(pages):
+        pdf.add_page()
+        pdf.multi_cell(0, 5, f"Page {number}. " + text * 40)
+    return bytes(pdf.output())
+
+
+def pages_per_second(data: bytes, workers: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        pages = sum(1 for _ in iter_page_texts(io.BytesIO(data), workers=workers))
+        best = min(best, time.perf_counter() - started)
+    return pages / best
+
+
+def main(pdf_path: Optional[str], pages: int, workers: List[int], repeat: int):
+    if pdf_path:
+        with open(pdf_path, "rb") as f:
+            data = f.read()
+    else:
+        data = generated_pdf(pages)
+    baseline = None
+    for count in workers:
+        rate = pages_per_second(data, count, repeat)
+        baseline = baseline or rate
+        print(f"workers={count:<3} {rate:9.1f} pages/s  x{rate / baseline:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark serial and parallel PDF page-text extraction"
+    )
+    parser.add_argument("--pdf", help="PDF to extract; generated when omitted")
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args.pdf, args.pages, args.workers, args.repeat)
@@ -0,0 +1,87 @@
+# scripts/benchmark_recommendation_scoring.py
+#
+# Times recommendation scoring for generated users and hotels: the batch job's
+# block-at-a-time matrix multiply against scoring one user per call, as
+# refresh_user does. The per-user path runs on a sample and is extrapolated.
+# DynamoDB reads and writes are not included.
+#
+# Run from image/src:
+#   python -m scripts.benchmark_recommendation_scoring \
+#       [--users 100000] [--hotels 10000]
+
+import argparse
+import random
+import time
+from typing import List
+
+from schemas.hotel import Amenities, Hotel, Location
+from schemas.user import DietaryRestriction, Preferences
+from services.recommendation_service import (
+    AMENITY_NAMES,
+    DEFAULT_TOP_K,
+    USER_BATCH_SIZE,
+    encode_hotels,
+    encode_preferences,
+    score,
+    top_k,
+)
+
+
+def generated_hotels(count: int) -> List[Hotel]:
+    location = Location(city="Austin", state="TX", country="US")
+    return [
+        Hotel(
+            hotel_id=f"hotel-{number}",
+            name=f"Hotel {number}",
+            eco_rating=random.randint(0, 10),
+            location=location,
+            amenities=Amenities(
+                **{name: random.random() < 0.5 for name in AMENITY_NAMES}
+            ),
+        )
+        for number in range(count)
+    ]
+
+
+def generated_preferences(count: int) -> List[Preferences]:
+    return [
+        Preferences(
+            dietary_restrictions=random.choice(list(DietaryRestriction)),
+            quiet_room=random.random() < 0.3,
+            econ_rating=random.randint(0, 10),
+        )
+        for _ in range(count)
+    ]
+
+
+def main(users: int, hotels: int, sample: int, batch_size: int):
+    random.seed(0)
+    _, hotel_matrix = encode_hotels(generated_hotels(hotels))
+    preferences = generated_preferences(users)
+
+    started = time.perf_counter()
+    for start in range(0, users, batch_size):
+        block = encode_preferences(preferences[start : start + batch_size])
+        top_k(score(block, hotel_matrix), DEFAULT_TOP_K)
+    batched = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for prefs in preferences[:sample]:
+        top_k(score(encode_preferences([prefs]), hotel_matrix), DEFAULT_TOP_K)
+    per_user = (time.perf_counter() - started) / sample * users
+
+    print(f"{users} users x {hotels} hotels, top {DEFAULT_TOP_K}")
+    for name, elapsed in (("batched", batched), ("per-user", per_user)):
+        print(f"{name:<9} {elapsed:8.1f} s  {users / elapsed:9.0f} users/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark batched and per-user recommendation scoring"
+    )
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--hotels", type=int, default=10_000)
+    parser.add_argument("--sample", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=USER_BATCH_SIZE)
+    args = parser.parse_args()
+    main(args.users, args.hotels, args.sample, args.batch_size)
@@ -0,0 +1,76 @@
+# scripts/benchmark_request_export.py
+#
+# Times the admin request export for several parallel scan segment counts.
+# The requests table is stood in for by an in-memory segmented scan that
+# returns capped pages after a fixed delay, modelling DynamoDB round trips,
+# which are what parallel segments overlap. No AWS calls are made.
+#
+# Run from image/src:
+#   python -m scripts.benchmark_request_export \
+#       [--requests 20000] [--segments 1 2 4 8]
+
+import argparse
+import time
+from datetime import datetime, timezone
+from typing import List
+from unittest import mock
+
+from services.request_service import RequestService
+
+
+def generated_requests(count: int) -> List[dict]:
+    issued = datetime.now(timezone.utc).isoformat()
+    return [
+        {
+            "request_id": f"request-{number:06d}",
+            "user_id": f"guest-{number % 500}@example.com",
+            "hotel_id": f"hotel-{number % 20}",
+            "department": ("reception", "housekeeping", "maintenance")[number % 3],
+            "task": "Extra towels for room 101",
+            "time_issued": issued,
+            "status": ("pending", "in_progress", "completed")[number % 3],
+        }
+        for number in range(count)
+    ]
+
+
+def table_scan(items: List[dict], page_size: int, latency_ms: float):
+    def scan(Segment=0, TotalSegments=1, ExclusiveStartKey=None, **kwargs):
+        time.sleep(latency_ms / 1000)
+        start = ExclusiveStartKey["position"] if ExclusiveStartKey else Segment
+        stop = min(start + page_size * TotalSegments, len(items))
+        response = {"Items": items[start:stop:TotalSegments]}
+        if stop < len(items):
+            response["LastEvaluatedKey"] = {"position": stop}
+        return response
+
+    return scan
+
+
+def main(count: int, segments: List[int], page_size: int, latency_ms: float):
+    service = RequestService()
+    scan = table_scan(generated_requests(count), page_size, latency_ms)
+    with mock.patch.object(service.dynamodb.meta.client, "scan", scan):
+        print(f"{count} requests, {page_size}/page, {latency_ms:g} ms/page")
+        baseline = None
+        for segment_count in segments:
+            started = time.perf_counter()
+            exported = sum(1 for _ in service.export_requests(None, segment_count))
+            elapsed = time.perf_counter() - started
+            baseline = baseline or elapsed
+            print(
+                f"segments={segment_count:<3} {exported:7d} rows  {elapsed:7.2f} s  "
+                f"x{baseline / elapsed:.2f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the admin request export by scan segment count"
+    )
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--segments", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    args = parser.parse_args()
+    main(args.requests, args.segments, args.page_size, args.latency_ms)
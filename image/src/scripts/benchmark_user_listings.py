@@ -0,0 +1,150 @@
+# scripts/benchmark_user_listings.py
+#
+# Compares staff listings served from the user_type / staff_type GSIs with
+# the filtered scans they replaced, on an in-memory users table (moto): the
+# first page of 50 and the full listing. Read units and latencies are
+# estimated as in scripts/benchmark_booking_queries.py. Needs moto from
+# requirements-dev.txt.
+#
+# Run from image/src:
+#   python -m scripts.benchmark_user_listings \
+#       [--users 100000] [--staff-share 0.05]
+
+import argparse
+import asyncio
+import random
+from typing import Dict, Iterable, List
+
+from boto3.dynamodb.conditions import Attr, Key
+from moto import mock_aws
+from scripts.benchmark_booking_queries import load, pages, read_units, timed
+
+PAGE_SIZE = 50
+
+
+def create_users_table():
+    from core.aws import get_dynamodb
+    from services.user_service import STAFF_TYPE_INDEX, USER_TYPE_INDEX, users_table
+
+    get_dynamodb().create_table(
+        TableName=users_table.name,
+        KeySchema=[{"AttributeName": "user_id", "KeyType": "HASH"}],
+        AttributeDefinitions=[
+            {"AttributeName": name, "AttributeType": "S"}
+            for name in ("user_id", "user_type", "staff_type")
+        ],
+        GlobalSecondaryIndexes=[
+            {
+                "IndexName": index_name,
+                "KeySchema": [
+                    {"AttributeName": partition_key, "KeyType": "HASH"},
+                    {"AttributeName": "user_id", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            }
+            for index_name, partition_key in (
+                (USER_TYPE_INDEX, "user_type"),
+                (STAFF_TYPE_INDEX, "staff_type"),
+            )
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    return users_table
+
+
+def generated_users(count: int, staff_share: float) -> Iterable[Dict]:
+    from schemas.user import StaffType
+
+    random.seed(0)
+    for number in range(count):
+        user_id = f"user-{number:06d}@example.com"
+        user = {
+            "user_id": user_id,
+            "email": user_id,
+            "first_name": "User",
+            "last_name": str(number),
+            "user_type": "normal",
+            "loyalty_program": "bronze",
+            "preferences": {"quiet_room": False, "econ_rating": 5},
+            "interaction_counter": random.randint(0, 500),
+        }
+        if random.random() < staff_share:
+            user["user_type"] = "staff"
+            user["staff_type"] = random.choice(list(StaffType)).value
+        yield user
+
+
+def main(count: int, staff_share: float):
+    from services.user_service import USER_TYPE_INDEX, UserService
+
+    table = create_users_table()
+    elapsed, _ = timed(lambda: load(table, generated_users(count, staff_share)))
+    print(f"loaded {count} users in {elapsed:.1f} s")
+    staff = Attr("user_type").eq("staff")
+
+    def scan_first_page() -> int:
+        # Filtered scan pages until a full page of staff has been collected;
+        # returns how many pages that took
+        read = found = 0
+        for page in pages(table.scan, FilterExpression=staff):
+            read += 1
+            found += len(page)
+            if found >= PAGE_SIZE:
+                break
+        return read
+
+    def scan_all() -> int:
+        return sum(len(page) for page in pages(table.scan, FilterExpression=staff))
+
+    def query_first_page() -> int:
+        page = asyncio.run(UserService.get_all_staff(limit=PAGE_SIZE))
+        return len(page["users"])
+
+    def query_all() -> int:
+        listed, cursor = 0, None
+        while True:
+            page = asyncio.run(UserService.get_all_staff(cursor=cursor))
+            listed += len(page["users"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return listed
+
+    def query_pages() -> List[List[Dict]]:
+        return list(
+            pages(
+                table.query,
+                IndexName=USER_TYPE_INDEX,
+                KeyConditionExpression=Key("user_type").eq("staff"),
+                Limit=PAGE_SIZE,
+            )
+        )
+
+    first_scan, scan_pages_read = timed(scan_first_page)
+    first_query, _ = timed(query_first_page)
+    all_scan, scanned = timed(scan_all)
+    all_query, listed = timed(query_all)
+    assert scanned == listed, (scanned, listed)
+
+    # A scan is billed for every item it reads, not for what the filter keeps;
+    # filters apply after the 1 MB page limit, so the page boundaries match
+    table_pages = list(pages(table.scan))
+    staff_pages = query_pages()
+    print(f"{listed} staff among {count} users")
+    for name, elapsed, units in (
+        ("first page, scan", first_scan, read_units(table_pages[:scan_pages_read])),
+        ("first page, GSI", first_query, read_units(staff_pages[:1])),
+        ("all staff, scan", all_scan, read_units(table_pages)),
+        ("all staff, GSI", all_query, read_units(staff_pages)),
+    ):
+        print(f"{name:<17} {elapsed * 1000:9.1f} ms  {units:8.1f} read units")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark GSI-backed staff listings against table scans"
+    )
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--staff-share", type=float, default=0.05)
+    args = parser.parse_args()
+    with mock_aws():
+        main(args.users, args.staff_share)
@@ -0,0 +1,65 @@
+# scripts/migrate_booking_epochs.py
+#
+# Backfills start_ts / end_ts (epoch seconds) on bookings written before the
+# numeric date mirrors existed, so they show up in the *_ts GSIs.
+#
+# Run from image/src:  python -m scripts.migrate_booking_epochs [--dry-run]
+
+import argparse
+import logging
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+from services.booking_service import table
+from utils.utils import parse_est_datetime, to_epoch
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def migrate(dry_run: bool = False) -> int:
+    scan_kwargs = {
+        "FilterExpression": Attr("start_ts").not_exists()
+        | Attr("end_ts").not_exists(),
+        "ProjectionExpression": "booking_id, start_date, end_date",
+    }
+    migrated = 0
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response.get("Items", []):
+            if "start_date" not in item or "end_date" not in item:
+                logger.warning(f"Skipping booking {item['booking_id']}: missing dates")
+                continue
+            start_ts = to_epoch(parse_est_datetime(item["start_date"]))
+            end_ts = to_epoch(parse_est_datetime(item["end_date"]))
+            if not dry_run:
+                try:
+                    table.update_item(
+                        Key={"booking_id": item["booking_id"]},
+                        UpdateExpression="SET start_ts = :start_ts, end_ts = :end_ts",
+                        ExpressionAttributeValues={
+                            ":start_ts": start_ts,
+                            ":end_ts": end_ts,
+                        },
+                    )
+                except ClientError as e:
+                    logger.error(f"Failed to migrate {item['booking_id']}: {e}")
+                    continue
+            migrated += 1
+
+        last_key = response.get("LastEvaluatedKey")
+        if not last_key:
+            break
+        scan_kwargs["ExclusiveStartKey"] = last_key
+    return migrated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Backfill start_ts / end_ts on existing bookings"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Report without writing changes"
+    )
+    args = parser.parse_args()
+    count = migrate(dry_run=args.dry_run)
+    logger.info(f"{'Would migrate' if args.dry_run else 'Migrated'} {count} bookings")
@@ -0,0 +1,55 @@
+# scripts/migrate_user_staff_type.py
+#
+# Removes the NULL staff_type stored on guests created before the staff_type
+# GSI existed. DynamoDB rejects writes to items whose index key attribute has
+# the wrong type, so these users could not be updated once the index is live.
+#
+# Run from image/src:  python -m scripts.migrate_user_staff_type [--dry-run]
+
+import argparse
+import logging
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+from services.user_service import users_table
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def migrate(dry_run: bool = False) -> int:
+    scan_kwargs = {
+        "FilterExpression": Attr("staff_type").attribute_type("NULL"),
+        "ProjectionExpression": "user_id",
+    }
+    migrated = 0
+    while True:
+        response = users_table.scan(**scan_kwargs)
+        for item in response.get("Items", []):
+            if not dry_run:
+                try:
+                    users_table.update_item(
+                        Key={"user_id": item["user_id"]},
+                        UpdateExpression="REMOVE staff_type",
+                    )
+                except ClientError as e:
+                    logger.error(f"Failed to migrate {item['user_id']}: {e}")
+                    continue
+            migrated += 1
+
+        last_key = response.get("LastEvaluatedKey")
+        if not last_key:
+            break
+        scan_kwargs["ExclusiveStartKey"] = last_key
+    return migrated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Remove NULL staff_type attributes from existing users"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Report without writing changes"
+    )
+    args = parser.parse_args()
+    count = migrate(dry_run=args.dry_run)
+    logger.info(f"{'Would migrate' if args.dry_run else 'Migrated'} {count} users")
@@ -0,0 +1,18 @@
+# scripts/rebuild_request_counters.py
+#
+# Reconciles the per-hotel request counters with the requests table by
+# recounting every request and overwriting the aggregate items.
+#
+# Run from image/src:  python -m scripts.rebuild_request_counters
+
+import logging
+from services.request_service import RequestService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+if __name__ == "__main__":
+    counts = RequestService().rebuild_counters()
+    total = sum(sum(hotel_counts.values()) for hotel_counts in counts.values())
+    logger.info(f"Rebuilt counters for {len(counts)} hotels ({total} requests)")
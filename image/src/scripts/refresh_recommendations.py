@@ -0,0 +1,34 @@
+# scripts/refresh_recommendations.py
+#
+# Scores every user's preferences against the whole hotel catalog and stores
+# each user's top hotels as their recommendations.
+#
+# Run from image/src:  python -m scripts.refresh_recommendations [--top-k 10]
+
+import argparse
+import asyncio
+import logging
+from services.recommendation_service import (
+    DEFAULT_TOP_K,
+    USER_BATCH_SIZE,
+    RecommendationService,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Recompute hotel recommendations for all users"
+    )
+    parser.add_argument("--top-k", type=int, default=DEFAULT_TOP_K)
+    parser.add_argument("--batch-size", type=int, default=USER_BATCH_SIZE)
+    args = parser.parse_args()
+    result = asyncio.run(
+        RecommendationService.refresh_all(k=args.top_k, batch_size=args.batch_size)
+    )
+    logger.info(
+        f"Stored recommendations for {result['users']} users over "
+        f"{result['hotels']} hotels ({result['failed']} failed)"
+    )
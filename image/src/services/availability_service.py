@@ -0,0 +1,259 @@
+import time
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+from fastapi import HTTPException
+from core.aws import get_dynamodb
+from core.config import settings
+from schemas.booking import RoomInfo, RoomSize
+from utils.utils import get_current_est_time, parse_est_datetime, to_epoch
+
+dynamodb = get_dynamodb()
+table = dynamodb.Table(settings.DYNAMODB_TABLE_NAME_BOOKINGS)
+
+# GSI on the bookings table: partition key hotel_id, sort key end_ts
+HOTEL_END_DATE_INDEX = "hotel_id-end_ts-index"
+
+# Indexes are rebuilt from the table after this many seconds so that bookings
+# written by other Lambda containers are picked up
+INDEX_REFRESH_SECONDS = 60
+
+
+def _to_epoch(value) -> float:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return parse_est_datetime(value).timestamp()
+
+
+def _item_epochs(item: dict) -> Tuple[float, float]:
+    if "start_ts" in item and "end_ts" in item:
+        return float(item["start_ts"]), float(item["end_ts"])
+    return _to_epoch(item["start_date"]), _to_epoch(item["end_date"])
+
+
+class RoomIntervals:
+    """Bookings of one room as parallel arrays sorted by start time."""
+
+    def __init__(self):
+        self.starts: List[float] = []
+        self.ends: List[float] = []
+        self.booking_ids: List[str] = []
+        # max_ends[i] is the latest end among the first i + 1 intervals, which
+        # keeps overlap checks logarithmic even if legacy data overlaps
+        self.max_ends: List[float] = []
+
+    def _rebuild_max_ends(self, start_at: int):
+        running = self.max_ends[start_at - 1] if start_at > 0 else float("-inf")
+        del self.max_ends[start_at:]
+        for end in self.ends[start_at:]:
+            running = max(running, end)
+            self.max_ends.append(running)
+
+    def add(self, booking_id: str, start: float, end: float):
+        position = bisect_left(self.starts, start)
+        self.starts.insert(position, start)
+        self.ends.insert(position, end)
+        self.booking_ids.insert(position, booking_id)
+        self._rebuild_max_ends(position)
+
+    def remove(self, booking_id: str, start: float):
+        position = bisect_left(self.starts, start)
+        while position < len(self.starts) and self.starts[position] == start:
+            if self.booking_ids[position] == booking_id:
+                del self.starts[position]
+                del self.ends[position]
+                del self.booking_ids[position]
+                self._rebuild_max_ends(position)
+                return
+            position += 1
+
+    def conflicts(
+        self, start: float, end: float, exclude_booking_id: Optional[str] = None
+    ) -> List[str]:
+        # Only intervals starting before `end` can overlap [start, end)
+        position = bisect_left(self.starts, end)
+        conflicting = []
+        index = position - 1
+        while index >= 0 and self.max_ends[index] > start:
+            if (
+                self.ends[index] > start
+                and self.booking_ids[index] != exclude_booking_id
+            ):
+                conflicting.append(self.booking_ids[index])
+            index -= 1
+        return conflicting
+
+    def is_free(
+        self, start: float, end: float, exclude_booking_id: Optional[str] = None
+    ) -> bool:
+        return not self.conflicts(start, end, exclude_booking_id)
+
+
+class HotelIntervalIndex:
+    def __init__(self, hotel_id: str):
+        self.hotel_id = hotel_id
+        self.rooms: Dict[str, RoomIntervals] = {}
+        self.room_info: Dict[str, RoomInfo] = {}
+        # booking_id -> (room_number, start) so updates/deletes can find the entry
+        self.bookings: Dict[str, Tuple[str, float]] = {}
+        self.loaded_at = 0.0
+
+    def add_room(self, room_number: str, room_info):
+        if room_info:
+            self.room_info[room_number] = (
+                room_info if isinstance(room_info, RoomInfo) else RoomInfo(**room_info)
+            )
+
+    def add(self, item: dict):
+        room_number = item["room_number"]
+        start, end = _item_epochs(item)
+        self.discard(item["booking_id"])
+        self.rooms.setdefault(room_number, RoomIntervals()).add(
+            item["booking_id"], start, end
+        )
+        self.bookings[item["booking_id"]] = (room_number, start)
+        self.add_room(room_number, item.get("room_info"))
+
+    def discard(self, booking_id: str):
+        entry = self.bookings.pop(booking_id, None)
+        if entry:
+            room_number, start = entry
+            self.rooms[room_number].remove(booking_id, start)
+
+    def conflicts(
+        self,
+        room_number: str,
+        start: float,
+        end: float,
+        exclude_booking_id: Optional[str] = None,
+    ) -> List[str]:
+        room = self.rooms.get(room_number)
+        if room is None:
+            return []
+        return room.conflicts(start, end, exclude_booking_id)
+
+    def free_rooms(
+        self,
+        start: float,
+        end: float,
+        beds: Optional[int] = None,
+        bathrooms: Optional[int] = None,
+        size: Optional[RoomSize] = None,
+    ) -> List[dict]:
+        free = []
+        for room_number, room_info in self.room_info.items():
+            if beds is not None and room_info.beds < beds:
+                continue
+            if bathrooms is not None and room_info.bathrooms < bathrooms:
+                continue
+            if size is not None and room_info.size != size:
+                continue
+            intervals = self.rooms.get(room_number)
+            if intervals is None or intervals.is_free(start, end):
+                free.append({"room_number": room_number, "room_info": room_info})
+        return free
+
+
+_hotel_indexes: Dict[str, HotelIntervalIndex] = {}
+
+
+class AvailabilityService:
+    @staticmethod
+    def _load_hotel(
+        hotel_id: str, previous: Optional[HotelIntervalIndex] = None
+    ) -> HotelIntervalIndex:
+        index = HotelIntervalIndex(hotel_id)
+        now = get_current_est_time()
+        key_condition = Key("hotel_id").eq(hotel_id)
+        if previous is not None:
+            # The room catalog is already known; bookings that already ended
+            # can never conflict, so a refresh only reads the rest
+            index.room_info = dict(previous.room_info)
+            key_condition &= Key("end_ts").gte(to_epoch(now))
+
+        query_kwargs = {
+            "IndexName": HOTEL_END_DATE_INDEX,
+            "KeyConditionExpression": key_condition,
+            "ProjectionExpression": "booking_id, room_number, start_date, end_date, "
+            "start_ts, end_ts, room_info",
+        }
+        now_epoch = now.timestamp()
+        try:
+            while True:
+                response = table.query(**query_kwargs)
+                for item in response.get("Items", []):
+                    if _item_epochs(item)[1] > now_epoch:
+                        index.add(item)
+                    else:
+                        index.add_room(item["room_number"], item.get("room_info"))
+                if "LastEvaluatedKey" not in response:
+                    break
+                query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        except ClientError as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        index.loaded_at = time.monotonic()
+        return index
+
+    @staticmethod
+    def get_hotel_index(hotel_id: str) -> HotelIntervalIndex:
+        index = _hotel_indexes.get(hotel_id)
+        if index is None or time.monotonic() - index.loaded_at > INDEX_REFRESH_SECONDS:
+            index = AvailabilityService._load_hotel(hotel_id, index)
+            _hotel_indexes[hotel_id] = index
+        return index
+
+    @staticmethod
+    def ensure_available(
+        hotel_id: str,
+        room_number: str,
+        start_date,
+        end_date,
+        exclude_booking_id: Optional[str] = None,
+    ):
+        start = _to_epoch(start_date)
+        end = _to_epoch(end_date)
+        if end <= start:
+            raise HTTPException(
+                status_code=400, detail="end_date must be after start_date"
+            )
+        index = AvailabilityService.get_hotel_index(hotel_id)
+        conflicting = index.conflicts(room_number, start, end, exclude_booking_id)
+        if conflicting:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Room {room_number} is already booked for this period "
+                f"(conflicting bookings: {', '.join(conflicting)})",
+            )
+
+    @staticmethod
+    def record_booking(item: dict):
+        index = _hotel_indexes.get(item.get("hotel_id"))
+        if index is not None:
+            index.add(item)
+
+    @staticmethod
+    def forget_booking(hotel_id: str, booking_id: str):
+        index = _hotel_indexes.get(hotel_id)
+        if index is not None:
+            index.discard(booking_id)
+
+    @staticmethod
+    async def get_available_rooms(
+        hotel_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        beds: Optional[int] = None,
+        bathrooms: Optional[int] = None,
+        size: Optional[RoomSize] = None,
+    ) -> List[dict]:
+        start = _to_epoch(start_date)
+        end = _to_epoch(end_date)
+        if end <= start:
+            raise HTTPException(
+                status_code=400, detail="end_date must be after start_date"
+            )
+        index = AvailabilityService.get_hotel_index(hotel_id)
+        return index.free_rooms(start, end, beds, bathrooms, size)
@@ -1,30 +1,101 @@
-import boto3
+from concurrent.futures import ThreadPoolExecutor
+from boto3.dynamodb.conditions import Key, Attr
 from botocore.exceptions import ClientError
 from fastapi import HTTPException
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from core.aws import get_dynamodb
 from core.config import settings
-from schemas.booking import BookingCreate, BookingUpdate, RoomInfo
-from utils.utils import get_current_est_time, format_est_datetime, parse_est_datetime
+from schemas.booking import Booking, BookingCreate, BookingUpdate, RoomInfo
+from services.availability_service import AvailabilityService, HOTEL_END_DATE_INDEX
+from services.occupancy_service import OccupancyService
+from services.room_lock_service import (
+    conflict_error,
+    ensure_lockable,
+    is_lock_conflict,
+    lock_actions,
+    room_night_locks,
+)
+from utils.utils import (
+    get_current_est_time,
+    format_est_datetime,
+    parse_est_datetime,
+    to_epoch,
+    from_epoch,
+    est_day_bounds,
+    encode_cursor,
+    decode_cursor,
+)
 from uuid import uuid4
-from datetime import datetime
-from typing import List
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 
-dynamodb = boto3.resource("dynamodb", region_name=settings.PRIVATE_AWS_REGION)
+dynamodb = get_dynamodb()
 table = dynamodb.Table(settings.DYNAMODB_TABLE_NAME_BOOKINGS)
 
+BULK_IMPORT_CONCURRENCY = 8
+# Imports run within one API request, bounded by Lambda's 60 s timeout and
+# 6 MB response; larger files must be sent in chunks of at most this many rows
+BULK_IMPORT_MAX_ROWS = 5000
+
+# GSIs on the bookings table: partition key user_id, sort key start_ts / end_ts
+# (epoch seconds mirrors of start_date / end_date)
+USER_START_DATE_INDEX = "user_id-start_ts-index"
+USER_END_DATE_INDEX = "user_id-end_ts-index"
+# Partition key hotel_id, sort key start_ts (hotel_id-end_ts-index is shared
+# with the availability service)
+HOTEL_START_DATE_INDEX = "hotel_id-start_ts-index"
+
+# Writes only invalidate the manifest cached by the container that made them,
+# so other containers may serve a stale manifest for at most this long
+MANIFEST_CACHE_TTL_SECONDS = 30
+
+# hotel_id -> (expires_at epoch, manifest); entries expire after
+# MANIFEST_CACHE_TTL_SECONDS, or at midnight EST if that comes first
+_manifest_cache: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+
 
 class BookingService:
     @staticmethod
-    async def create_booking(booking: BookingCreate):
-        booking_id = str(uuid4())
-        item = {
-            "booking_id": booking_id,
+    def _build_item(booking: BookingCreate) -> Dict[str, Any]:
+        return {
+            "booking_id": str(uuid4()),
             **booking.dict(),
             "start_date": format_est_datetime(booking.start_date),
             "end_date": format_est_datetime(booking.end_date),
+            "start_ts": to_epoch(booking.start_date),
+            "end_ts": to_epoch(booking.end_date),
             "room_info": booking.room_info.dict(),
         }
+
+    @staticmethod
+    def _put_booking(item: Dict[str, Any]):
+        # The in-memory index is only a fast pre-check; the room-night locks
+        # written with the booking are what rule out double bookings
+        dynamodb.meta.client.transact_write_items(
+            TransactItems=[
+                {"Put": {"TableName": table.name, "Item": item}},
+                *lock_actions(item, room_night_locks(item)),
+            ]
+        )
+
+    @staticmethod
+    async def create_booking(booking: BookingCreate):
+        AvailabilityService.ensure_available(
+            booking.hotel_id, booking.room_number, booking.start_date, booking.end_date
+        )
+        item = BookingService._build_item(booking)
+        booking_id = item["booking_id"]
         try:
-            table.put_item(Item=item)
+            BookingService._put_booking(item)
+        except ClientError as e:
+            if is_lock_conflict(e):
+                raise conflict_error(booking.room_number)
+            raise HTTPException(status_code=500, detail=str(e))
+        try:
+            AvailabilityService.record_booking(item)
+            await run_in_threadpool(OccupancyService.record_booking, item)
+            _manifest_cache.pop(item["hotel_id"], None)
             return {"booking_id": booking_id, **item}
         except ClientError as e:
             raise HTTPException(status_code=500, detail=str(e))
@@ -36,66 +107,155 @@ class BookingService:
             item = response.get("Item")
             if not item:
                 raise HTTPException(status_code=404, detail="Booking not found")
-            item["start_date"] = parse_est_datetime(item["start_date"])
-            item["end_date"] = parse_est_datetime(item["end_date"])
-            if "room_info" in item:
-                item["room_info"] = RoomInfo(**item["room_info"])
-            return item
+            return BookingService._deserialize_booking(item)
         except ClientError as e:
             raise HTTPException(status_code=500, detail=str(e))
 
     @staticmethod
-    async def get_all_bookings():
-        try:
-            response = table.scan()
-            return response.get("Items", [])
-        except ClientError as e:
-            raise HTTPException(status_code=500, detail=str(e))
+    def _deserialize_booking(item: Dict[str, Any]) -> Dict[str, Any]:
+        # Prefer the numeric mirrors, which skip ISO parsing and pytz conversion
+        if "start_ts" in item:
+            item["start_date"] = from_epoch(item["start_ts"])
+        elif "start_date" in item:
+            item["start_date"] = parse_est_datetime(item["start_date"])
+        if "end_ts" in item:
+            item["end_date"] = from_epoch(item["end_ts"])
+        elif "end_date" in item:
+            item["end_date"] = parse_est_datetime(item["end_date"])
+        if "room_info" in item:
+            item["room_info"] = RoomInfo(**item["room_info"])
+        return item
 
     @staticmethod
-    async def get_current_bookings(user_id: str):
-        current_time = get_current_est_time()
+    def _query_user_bookings(
+        index_name: str,
+        key_condition,
+        filter_expression=None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        newest_first: bool = False,
+    ) -> Dict[str, Any]:
+        query_kwargs = {
+            "IndexName": index_name,
+            "KeyConditionExpression": key_condition,
+            "Limit": limit,
+            "ScanIndexForward": not newest_first,
+        }
+        if filter_expression is not None:
+            query_kwargs["FilterExpression"] = filter_expression
+
+        exclusive_start_key = decode_cursor(cursor)
+        if exclusive_start_key:
+            query_kwargs["ExclusiveStartKey"] = exclusive_start_key
+
         try:
-            response = table.scan(
-                FilterExpression="user_id = :user_id AND :current_time BETWEEN start_date AND end_date",
-                ExpressionAttributeValues={
-                    ":user_id": user_id,
-                    ":current_time": format_est_datetime(current_time),
-                },
-            )
-            return response.get("Items", [])
+            response = table.query(**query_kwargs)
         except ClientError as e:
             raise HTTPException(status_code=500, detail=str(e))
 
+        return {
+            "bookings": [
+                BookingService._deserialize_booking(item)
+                for item in response.get("Items", [])
+            ],
+            "next_cursor": encode_cursor(response.get("LastEvaluatedKey")),
+        }
+
     @staticmethod
-    async def get_past_bookings(user_id: str):
-        current_time = get_current_est_time()
-        try:
-            response = table.scan(
-                FilterExpression="user_id = :user_id AND end_date < :current_time",
-                ExpressionAttributeValues={
-                    ":user_id": user_id,
-                    ":current_time": format_est_datetime(current_time),
-                },
-            )
-            return response.get("Items", [])
-        except ClientError as e:
-            raise HTTPException(status_code=500, detail=str(e))
+    async def get_current_bookings(
+        user_id: str, limit: int = 50, cursor: Optional[str] = None
+    ):
+        now = to_epoch(get_current_est_time())
+        # Bookings that haven't ended yet, narrowed to those that already started
+        return BookingService._query_user_bookings(
+            USER_END_DATE_INDEX,
+            Key("user_id").eq(user_id) & Key("end_ts").gte(now),
+            filter_expression=Attr("start_ts").lte(now),
+            limit=limit,
+            cursor=cursor,
+        )
 
     @staticmethod
-    async def get_future_bookings(user_id: str):
-        current_time = get_current_est_time()
+    async def get_past_bookings(
+        user_id: str, limit: int = 50, cursor: Optional[str] = None
+    ):
+        now = to_epoch(get_current_est_time())
+        return BookingService._query_user_bookings(
+            USER_END_DATE_INDEX,
+            Key("user_id").eq(user_id) & Key("end_ts").lt(now),
+            limit=limit,
+            cursor=cursor,
+            newest_first=True,
+        )
+
+    @staticmethod
+    async def get_future_bookings(
+        user_id: str, limit: int = 50, cursor: Optional[str] = None
+    ):
+        now = to_epoch(get_current_est_time())
+        return BookingService._query_user_bookings(
+            USER_START_DATE_INDEX,
+            Key("user_id").eq(user_id) & Key("start_ts").gt(now),
+            limit=limit,
+            cursor=cursor,
+        )
+
+    @staticmethod
+    def _query_hotel_day(index_name: str, sort_key: str, hotel_id: str, day: date):
+        day_start, day_end = est_day_bounds(day)
+        query_kwargs = {
+            "IndexName": index_name,
+            # BETWEEN is inclusive, so stop one second before next midnight
+            "KeyConditionExpression": Key("hotel_id").eq(hotel_id)
+            & Key(sort_key).between(day_start, day_end - 1),
+        }
+        bookings = []
         try:
-            response = table.scan(
-                FilterExpression="user_id = :user_id AND start_date > :current_time",
-                ExpressionAttributeValues={
-                    ":user_id": user_id,
-                    ":current_time": format_est_datetime(current_time),
-                },
-            )
-            return response.get("Items", [])
+            while True:
+                response = table.query(**query_kwargs)
+                bookings.extend(
+                    BookingService._deserialize_booking(item)
+                    for item in response.get("Items", [])
+                )
+                if "LastEvaluatedKey" not in response:
+                    break
+                query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
         except ClientError as e:
             raise HTTPException(status_code=500, detail=str(e))
+        return bookings
+
+    @staticmethod
+    async def get_daily_manifest(hotel_id: str, day: date) -> Dict[str, Any]:
+        return {
+            "day": day,
+            "arrivals": BookingService._query_hotel_day(
+                HOTEL_START_DATE_INDEX, "start_ts", hotel_id, day
+            ),
+            "departures": BookingService._query_hotel_day(
+                HOTEL_END_DATE_INDEX, "end_ts", hotel_id, day
+            ),
+        }
+
+    @staticmethod
+    async def get_hotel_manifest(hotel_id: str) -> Dict[str, Any]:
+        now = get_current_est_time()
+        cached = _manifest_cache.get(hotel_id)
+        if cached and cached[0] > to_epoch(now):
+            return cached[1]
+
+        today = now.date()
+        tomorrow = today + timedelta(days=1)
+        manifest = {
+            "hotel_id": hotel_id,
+            "today": await BookingService.get_daily_manifest(hotel_id, today),
+            "tomorrow": await BookingService.get_daily_manifest(hotel_id, tomorrow),
+        }
+        # "today" rolls over at midnight EST, so the entry never outlives it
+        expires_at = min(
+            to_epoch(now) + MANIFEST_CACHE_TTL_SECONDS, est_day_bounds(today)[1]
+        )
+        _manifest_cache[hotel_id] = (expires_at, manifest)
+        return manifest
 
     @staticmethod
     async def update_booking(booking_id: str, booking_update: BookingUpdate):
@@ -118,55 +278,232 @@ class BookingService:
                     expression_attribute_values[f":{field}"] = format_est_datetime(
                         value
                     )
+                    # Keep the numeric mirror (start_ts / end_ts) in sync
+                    epoch_field = field.replace("_date", "_ts")
+                    update_expression += f"#{epoch_field} = :{epoch_field}, "
+                    expression_attribute_values[f":{epoch_field}"] = to_epoch(value)
+                    expression_attribute_names[f"#{epoch_field}"] = epoch_field
                 else:
                     expression_attribute_values[f":{field}"] = value
                 expression_attribute_names[f"#{field}"] = field
 
         update_expression = update_expression.rstrip(", ")
 
-        try:
-            response = table.update_item(
-                Key={"booking_id": booking_id},
-                UpdateExpression=update_expression,
-                ExpressionAttributeValues=expression_attribute_values,
-                ExpressionAttributeNames=expression_attribute_names,
-                ReturnValues="ALL_NEW",
+        changes = booking_update.dict(exclude_unset=True)
+        existing = None
+        if {"room_number", "start_date", "end_date"} & changes.keys():
+            existing = await BookingService.get_booking(booking_id)
+            moved = {
+                "booking_id": booking_id,
+                "hotel_id": existing["hotel_id"],
+                "room_number": changes.get("room_number") or existing["room_number"],
+                "start_date": changes.get("start_date") or existing["start_date"],
+                "end_date": changes.get("end_date") or existing["end_date"],
+            }
+            AvailabilityService.ensure_available(
+                moved["hotel_id"],
+                moved["room_number"],
+                moved["start_date"],
+                moved["end_date"],
+                exclude_booking_id=booking_id,
             )
-            updated_item = response.get("Attributes", {})
-            if "start_date" in updated_item:
-                updated_item["start_date"] = parse_est_datetime(
-                    updated_item["start_date"]
+            held = room_night_locks(existing)
+            wanted = room_night_locks(moved)
+
+        update = {
+            "Key": {"booking_id": booking_id},
+            "UpdateExpression": update_expression,
+            "ExpressionAttributeValues": expression_attribute_values,
+            "ExpressionAttributeNames": expression_attribute_names,
+        }
+        try:
+            if existing is None:
+                response = table.update_item(**update, ReturnValues="ALL_NEW")
+                attributes = response.get("Attributes", {})
+            else:
+                # Moving the booking takes the new room-nights and frees the
+                # old ones atomically with the update itself
+                dynamodb.meta.client.transact_write_items(
+                    TransactItems=[
+                        {"Update": {"TableName": table.name, **update}},
+                        *lock_actions(moved, wanted - held, held - wanted),
+                    ]
+                )
+                attributes = table.get_item(Key={"booking_id": booking_id})["Item"]
+            updated_item = BookingService._deserialize_booking(attributes)
+            AvailabilityService.record_booking(updated_item)
+            if existing is not None and "hotel_id" in updated_item:
+                await run_in_threadpool(
+                    OccupancyService.move_booking, existing, updated_item
                 )
-            if "end_date" in updated_item:
-                updated_item["end_date"] = parse_est_datetime(updated_item["end_date"])
-            if "room_info" in updated_item:
-                updated_item["room_info"] = RoomInfo(**updated_item["room_info"])
+                _manifest_cache.pop(updated_item["hotel_id"], None)
             return updated_item
         except ClientError as e:
+            if existing is not None and is_lock_conflict(e):
+                raise conflict_error(moved["room_number"])
             raise HTTPException(status_code=500, detail=str(e))
 
     @staticmethod
     async def delete_booking(booking_id: str):
         try:
-            table.delete_item(Key={"booking_id": booking_id})
+            deleted_item = table.get_item(Key={"booking_id": booking_id}).get("Item")
+            if deleted_item:
+                dynamodb.meta.client.transact_write_items(
+                    TransactItems=[
+                        {
+                            "Delete": {
+                                "TableName": table.name,
+                                "Key": {"booking_id": booking_id},
+                            }
+                        },
+                        *lock_actions(
+                            deleted_item, (), room_night_locks(deleted_item)
+                        ),
+                    ]
+                )
+                AvailabilityService.forget_booking(
+                    deleted_item["hotel_id"], booking_id
+                )
+                await run_in_threadpool(OccupancyService.forget_booking, deleted_item)
+                _manifest_cache.pop(deleted_item["hotel_id"], None)
             return {"message": "Booking deleted successfully"}
         except ClientError as e:
             raise HTTPException(status_code=500, detail=str(e))
 
     @staticmethod
-    async def get_all_bookings() -> List[dict]:
-        try:
-            response = table.scan()
-            items = response.get("Items", [])
+    def _scan_pages(first_page: dict, scan_kwargs: dict) -> Iterator[dict]:
+        response = first_page
+        while True:
+            yield from response.get("Items", [])
+            last_key = response.get("LastEvaluatedKey")
+            if not last_key:
+                break
+            scan_kwargs["ExclusiveStartKey"] = last_key
+            response = table.scan(**scan_kwargs)
 
-            for item in items:
-                if "start_date" in item:
-                    item["start_date"] = parse_est_datetime(item["start_date"])
-                if "end_date" in item:
-                    item["end_date"] = parse_est_datetime(item["end_date"])
-                if "room_info" in item:
-                    item["room_info"] = RoomInfo(**item["room_info"])
-
-            return items
+    @staticmethod
+    def iter_all_bookings(page_size: int = 500) -> Iterator[Booking]:
+        # Pages through the scan lazily so only one page is held in memory. The
+        # first page is read eagerly so errors surface before streaming starts.
+        scan_kwargs = {"Limit": page_size}
+        try:
+            first_page = table.scan(**scan_kwargs)
         except ClientError as e:
             raise HTTPException(status_code=500, detail=str(e))
+        return (
+            Booking(**BookingService._deserialize_booking(item))
+            for item in BookingService._scan_pages(first_page, scan_kwargs)
+        )
+
+    @staticmethod
+    def stream_all_bookings(ndjson: bool = False) -> Iterator[str]:
+        bookings = BookingService.iter_all_bookings()
+        if ndjson:
+            return (booking.model_dump_json() + "\n" for booking in bookings)
+        return BookingService._json_array(bookings)
+
+    @staticmethod
+    def _json_array(bookings: Iterator[Booking]) -> Iterator[str]:
+        yield "["
+        for position, booking in enumerate(bookings):
+            yield ("," if position else "") + booking.model_dump_json()
+        yield "]"
+
+    @staticmethod
+    def _write_booking(item: Dict[str, Any]) -> Optional[str]:
+        try:
+            BookingService._put_booking(item)
+        except ClientError as e:
+            if is_lock_conflict(e):
+                return conflict_error(item["room_number"]).detail
+            return str(e)
+        except HTTPException as e:
+            return e.detail
+        return None
+
+    @staticmethod
+    def _write_items(items: List[Dict[str, Any]]) -> Dict[str, str]:
+        # Each booking is its own transaction with its room-night locks, so
+        # imports honour the same write-time guard as single bookings
+        failures = {}
+        with ThreadPoolExecutor(max_workers=BULK_IMPORT_CONCURRENCY) as executor:
+            for item, error in zip(
+                items, executor.map(BookingService._write_booking, items)
+            ):
+                if error:
+                    failures[item["booking_id"]] = error
+        return failures
+
+    @staticmethod
+    async def import_bookings(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        if len(rows) > BULK_IMPORT_MAX_ROWS:
+            raise HTTPException(
+                status_code=413,
+                detail=(
+                    f"Imports are limited to {BULK_IMPORT_MAX_ROWS} rows per "
+                    "request; send larger files in chunks"
+                ),
+            )
+        results = []
+        items = []
+        for row_number, row in enumerate(rows):
+            try:
+                booking = BookingCreate(**row)
+                ensure_lockable(booking.dict())
+                AvailabilityService.ensure_available(
+                    booking.hotel_id,
+                    booking.room_number,
+                    booking.start_date,
+                    booking.end_date,
+                )
+            except (ValidationError, TypeError) as e:
+                results.append(
+                    {"row": row_number, "status": "invalid", "error": str(e)}
+                )
+                continue
+            except HTTPException as e:
+                results.append(
+                    {"row": row_number, "status": "rejected", "error": e.detail}
+                )
+                continue
+
+            item = BookingService._build_item(booking)
+            # Reserve the slot so later rows in the same import can't overlap it
+            AvailabilityService.record_booking(item)
+            items.append(item)
+            results.append(
+                {
+                    "row": row_number,
+                    "status": "created",
+                    "booking_id": item["booking_id"],
+                }
+            )
+
+        failures = await run_in_threadpool(BookingService._write_items, items)
+        if failures:
+            for item in items:
+                if item["booking_id"] in failures:
+                    AvailabilityService.forget_booking(
+                        item["hotel_id"], item["booking_id"]
+                    )
+            for result in results:
+                error = failures.get(result.get("booking_id"))
+                if error:
+                    result["status"] = "failed"
+                    result["error"] = error
+
+        # One aggregated calendar update for the whole import
+        deltas = OccupancyService.booking_deltas(
+            (item for item in items if item["booking_id"] not in failures), 1
+        )
+        await run_in_threadpool(OccupancyService.apply_deltas, deltas)
+        for item in items:
+            _manifest_cache.pop(item["hotel_id"], None)
+
+        created = sum(1 for result in results if result["status"] == "created")
+        return {
+            "total": len(rows),
+            "created": created,
+            "failed": len(rows) - created,
+            "results": results,
+        }
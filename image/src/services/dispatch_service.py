@@ -0,0 +1,153 @@
+import heapq
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from botocore.exceptions import ClientError
+from fastapi import HTTPException
+from core.aws import BatchGetThrottled, batch_get_items, get_dynamodb
+from core.config import settings
+from schemas.request import Department
+from schemas.user import LoyaltyProgram
+from utils.utils import parse_est_datetime
+
+dynamodb = get_dynamodb()
+users_table = dynamodb.Table(settings.DYNAMODB_TABLE_NAME_USERS)
+
+# Minutes each department has to pick up a request
+SLA_MINUTES = {
+    Department.RECEPTION: 15,
+    Department.HOUSEKEEPING: 60,
+    Department.MAINTENANCE: 120,
+}
+
+# Minutes a guest's loyalty tier pulls their deadline forward
+LOYALTY_PRIORITY_MINUTES = {
+    LoyaltyProgram.PLATINUM: 30,
+    LoyaltyProgram.GOLD: 20,
+    LoyaltyProgram.SILVER: 10,
+    LoyaltyProgram.BRONZE: 0,
+}
+
+# Queues are rebuilt after this many seconds to pick up claims and requests
+# made through other Lambda containers
+QUEUE_REFRESH_SECONDS = 60
+
+
+def _priority(item: dict, loyalty: LoyaltyProgram) -> Tuple[float, float]:
+    # Earliest effective deadline first; ties go to the oldest request. Age,
+    # SLA and loyalty tier all fold into the single deadline value.
+    issued = parse_est_datetime(item["time_issued"]).timestamp()
+    department = Department(item["department"])
+    deadline = issued + 60 * (
+        SLA_MINUTES[department] - LOYALTY_PRIORITY_MINUTES[loyalty]
+    )
+    return deadline, issued
+
+
+class DispatchQueue:
+    """Pending requests of one hotel department as a lazy-deletion min-heap."""
+
+    def __init__(self):
+        self.heap: List[Tuple[float, float, str]] = []
+        self.pending: Set[str] = set()
+        # Tiers looked up so far, so new requests from known guests skip DynamoDB
+        self.loyalty: Dict[str, LoyaltyProgram] = {}
+        self.loaded_at = 0.0
+
+    def push(self, request_id: str, priority: Tuple[float, float]):
+        self.pending.add(request_id)
+        heapq.heappush(self.heap, (*priority, request_id))
+
+    def discard(self, request_id: str):
+        # The heap entry is skipped when it surfaces
+        self.pending.discard(request_id)
+
+    def pop(self) -> Optional[str]:
+        while self.heap:
+            _, _, request_id = heapq.heappop(self.heap)
+            if request_id in self.pending:
+                self.pending.discard(request_id)
+                return request_id
+        return None
+
+    def __len__(self):
+        return len(self.pending)
+
+
+_queues: Dict[Tuple[str, str], DispatchQueue] = {}
+
+
+class DispatchService:
+    @staticmethod
+    async def _get_loyalty(user_ids: Iterable[str]) -> Dict[str, LoyaltyProgram]:
+        keys = [{"user_id": user_id} for user_id in dict.fromkeys(user_ids)]
+        try:
+            users = await batch_get_items(
+                dynamodb, users_table.name, keys, "user_id, loyalty_program"
+            )
+        except BatchGetThrottled:
+            raise HTTPException(
+                status_code=503, detail="Loyalty lookup throttled, retry later"
+            )
+        return {
+            user["user_id"]: LoyaltyProgram(
+                user.get("loyalty_program", LoyaltyProgram.BRONZE)
+            )
+            for user in users
+        }
+
+    @staticmethod
+    async def _load_queue(items: List[dict]) -> DispatchQueue:
+        try:
+            loyalty = await DispatchService._get_loyalty(
+                item["user_id"] for item in items
+            )
+        except ClientError as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+        queue = DispatchQueue()
+        for item in items:
+            tier = loyalty.get(item["user_id"], LoyaltyProgram.BRONZE)
+            queue.loyalty[item["user_id"]] = tier
+            queue.push(item["request_id"], _priority(item, tier))
+        queue.loaded_at = time.monotonic()
+        return queue
+
+    @staticmethod
+    async def get_queue(
+        hotel_id: str,
+        department: Department,
+        load_pending: Callable[[str, Department], List[dict]],
+    ) -> DispatchQueue:
+        key = (hotel_id, department.value)
+        queue = _queues.get(key)
+        if queue is None or time.monotonic() - queue.loaded_at > QUEUE_REFRESH_SECONDS:
+            items = load_pending(hotel_id, department)
+            queue = await DispatchService._load_queue(items)
+            _queues[key] = queue
+        return queue
+
+    @staticmethod
+    async def enqueue(item: dict):
+        queue = _queues.get((item["hotel_id"], item["department"]))
+        if queue is None:
+            return
+        user_id = item["user_id"]
+        tier = queue.loyalty.get(user_id)
+        if tier is None:
+            try:
+                loyalty = await DispatchService._get_loyalty([user_id])
+                tier = queue.loyalty[user_id] = loyalty.get(
+                    user_id, LoyaltyProgram.BRONZE
+                )
+            except (ClientError, HTTPException):
+                # The request is already stored; it queues at the base tier
+                # until the next refresh rather than failing the create
+                tier = LoyaltyProgram.BRONZE
+        queue.push(item["request_id"], _priority(item, tier))
+
+    @staticmethod
+    def dequeue(hotel_id: str, department: str, request_id: str):
+        queue = _queues.get((hotel_id, department))
+        if queue is not None:
+            queue.discard(request_id)
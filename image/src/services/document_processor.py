@@ -1,46 +1,82 @@
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import PyPDFLoader
-from services.s3_service import get_file_from_s3
+import asyncio
+from itertools import islice
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from services.pdf_extractor import iter_page_texts
+from services.s3_service import open_s3_file
 from services.embedding_service import generate_embeddings
 from services.pinecone_service import store_embeddings
-from services.dynamodb_service import update_document_status
-import tempfile
-import os
+from typing import Awaitable, BinaryIO, Callable, Iterable, Iterator, List, Optional
 
+CHUNK_SIZE = 600
+CHUNK_OVERLAP = 120
+# Chunks embedded and upserted together; bounds what is held in memory
+EMBED_BATCH_SIZE = 50
 
-async def process_document(document_id: str, s3_url: str, user_id: str):
-    # 1. Retrieve document from S3
-    file_content = await get_file_from_s3(s3_url)
+text_splitter = RecursiveCharacterTextSplitter(
+    chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP
+)
 
-    # 2. Save the content to a temporary file
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-        temp_file.write(file_content.getvalue())
-        temp_file_path = temp_file.name
 
-    # 3. Use PyPDFLoader to load and parse the PDF
-    loader = PyPDFLoader(temp_file_path)
-    pages = loader.load_and_split()
+async def open_document(s3_url: str) -> BinaryIO:
+    return await open_s3_file(s3_url)
 
-    # 4. Extract text content from pages
-    text_content = "\n".join([page.page_content for page in pages])
 
-    # 5. Chunk document
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=600, chunk_overlap=120)
-    chunks = text_splitter.split_text(text_content)
+def iter_chunks(page_texts: Iterable[str]) -> Iterator[str]:
+    # The last chunk of a page may continue on the next one, so it is carried
+    # over and split again together with the following page's text
+    carry = ""
+    for text in page_texts:
+        if not text.strip():
+            continue
+        chunks = text_splitter.split_text(f"{carry}\n{text}" if carry else text)
+        if not chunks:
+            continue
+        yield from chunks[:-1]
+        carry = chunks[-1]
+    if carry:
+        yield carry
 
-    # 6. Generate embeddings
-    embeddings = await generate_embeddings(chunks)
 
-    # 7. Store embeddings in Pinecone
+async def _index_batch(
+    document_id: str, s3_url: str, user_id: str, texts: List[str], start_index: int
+):
+    embeddings = await generate_embeddings(texts)
     await store_embeddings(
         document_id,
         embeddings,
         metadata={"s3_url": s3_url, "document_id": document_id, "user_id": user_id},
-        texts=chunks,  # Pass the text chunks here
+        texts=texts,  # Pass the text chunks here
+        start_index=start_index,
     )
 
-    # 8. Update document status in DynamoDB
-    await update_document_status(document_id, "completed", s3_url, user_id)
 
-    # 9. Clean up the temporary file
-    os.unlink(temp_file_path)
+async def ingest_document(
+    pdf_file: BinaryIO,
+    document_id: str,
+    s3_url: str,
+    user_id: str,
+    start_chunk: int = 0,
+    on_progress: Optional[Callable[[int], Awaitable[None]]] = None,
+) -> int:
+    """Streams pages -> chunks -> embeddings -> vectors, a batch at a time.
+
+    Chunking is deterministic, so a retry passes the number of chunks already
+    indexed as start_chunk and only re-extracts text for them. Returns the
+    total chunk count.
+    """
+    chunks = iter_chunks(iter_page_texts(pdf_file))
+    # Extraction is CPU-bound and range reads block on S3, so chunks are
+    # pulled on a worker thread and the event loop stays free between batches
+    batch_start = await asyncio.to_thread(
+        lambda: sum(1 for _ in islice(chunks, start_chunk))
+    )
+    while True:
+        batch = await asyncio.to_thread(list, islice(chunks, EMBED_BATCH_SIZE))
+        if not batch:
+            break
+        await _index_batch(document_id, s3_url, user_id, batch, batch_start)
+        batch_start += len(batch)
+        if on_progress:
+            await on_progress(batch_start)
+    return batch_start
+
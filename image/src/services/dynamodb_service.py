@@ -1,20 +1,22 @@
-import boto3
+from core.aws import get_dynamodb
 from core.config import settings
 from boto3.dynamodb.conditions import Key
 
-dynamodb = boto3.resource("dynamodb", region_name=settings.PRIVATE_AWS_REGION)
+dynamodb = get_dynamodb()
 table = dynamodb.Table(settings.DYNAMODB_TABLE_NAME_PROCESSED_FILES)
 
 
 async def update_document_status(
-    document_id: str, status: str, s3_url: str, user_id: str
+    document_id: str, status: str, s3_url: str, user_id: str, **job_fields
 ):
+    # job_fields carries ingestion progress (stage, attempts, error, ...)
     table.put_item(
         Item={
             "file_name": document_id,
             "status": status,
             "s3_url": s3_url,
             "user_id": user_id,
+            **{key: value for key, value in job_fields.items() if value is not None},
         }
     )
 
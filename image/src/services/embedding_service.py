@@ -1,9 +1,9 @@
 import json
-import boto3
 from typing import List
+from core.aws import get_client
 
-bedrock_runtime = boto3.client(
-    service_name="bedrock-runtime",
+bedrock_runtime = get_client(
+    "bedrock-runtime",
     region_name="us-east-1",  # replace with your preferred region
 )
 
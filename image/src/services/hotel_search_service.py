@@ -0,0 +1,127 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from schemas.hotel import Amenities, Hotel
+
+# One bit per amenity flag, in schema order
+AMENITY_BITS = {name: 1 << bit for bit, name in enumerate(Amenities.model_fields)}
+LOCATION_FIELDS = ("city", "state", "country")
+
+
+def amenity_mask(amenities: Iterable[str]) -> int:
+    mask = 0
+    for name in amenities:
+        mask |= AMENITY_BITS[name]
+    return mask
+
+
+class HotelSearchIndex:
+    """In-memory facets over the hotel catalog.
+
+    Location fields map to sets of hotel ids, amenities are folded into one
+    bitmask per hotel and eco ratings are kept in a sorted array, so combined
+    filters never touch DynamoDB.
+    """
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self.hotels: Dict[str, Hotel] = {}
+        self.locations: Dict[str, Dict[str, Set[str]]] = {
+            field: {} for field in LOCATION_FIELDS
+        }
+        self.amenities: Dict[str, int] = {}
+        # (eco_rating, hotel_id), sorted ascending
+        self.eco_entries: List[Tuple[int, str]] = []
+
+    def rebuild(self, hotels: Iterable[Hotel]):
+        self._reset()
+        for hotel in hotels:
+            self._add(hotel)
+        self.eco_entries.sort()
+
+    def _add(self, hotel: Hotel, keep_sorted: bool = False):
+        self.hotels[hotel.hotel_id] = hotel
+        for field in LOCATION_FIELDS:
+            value = getattr(hotel.location, field).lower()
+            self.locations[field].setdefault(value, set()).add(hotel.hotel_id)
+        self.amenities[hotel.hotel_id] = amenity_mask(
+            name for name, enabled in hotel.amenities if enabled
+        )
+        entry = (hotel.eco_rating, hotel.hotel_id)
+        if keep_sorted:
+            insort(self.eco_entries, entry)
+        else:
+            self.eco_entries.append(entry)
+
+    def upsert(self, hotel: Hotel):
+        self.remove(hotel.hotel_id)
+        self._add(hotel, keep_sorted=True)
+
+    def remove(self, hotel_id: str):
+        hotel = self.hotels.pop(hotel_id, None)
+        if hotel is None:
+            return
+        for field in LOCATION_FIELDS:
+            value = getattr(hotel.location, field).lower()
+            ids = self.locations[field].get(value)
+            if ids is not None:
+                ids.discard(hotel_id)
+                if not ids:
+                    del self.locations[field][value]
+        del self.amenities[hotel_id]
+        entry = (hotel.eco_rating, hotel_id)
+        position = bisect_left(self.eco_entries, entry)
+        if position < len(self.eco_entries) and self.eco_entries[position] == entry:
+            del self.eco_entries[position]
+
+    def search(
+        self,
+        city: Optional[str] = None,
+        state: Optional[str] = None,
+        country: Optional[str] = None,
+        amenities: Iterable[str] = (),
+        min_eco_rating: int = 0,
+        max_eco_rating: int = 10,
+        offset: int = 0,
+        limit: int = 20,
+    ) -> Tuple[List[Hotel], int]:
+        candidates: Optional[Set[str]] = None
+        for field, value in (("city", city), ("state", state), ("country", country)):
+            if value is None:
+                continue
+            ids = self.locations[field].get(value.lower(), set())
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                return [], 0
+
+        required = amenity_mask(amenities)
+        low = bisect_left(self.eco_entries, (min_eco_rating, ""))
+        high = bisect_right(self.eco_entries, (max_eco_rating, "\uffff"))
+
+        # Results are ordered by eco rating, best first
+        if candidates is not None and len(candidates) < high - low:
+            matches = sorted(
+                (
+                    (self.hotels[hotel_id].eco_rating, hotel_id)
+                    for hotel_id in candidates
+                    if min_eco_rating
+                    <= self.hotels[hotel_id].eco_rating
+                    <= max_eco_rating
+                ),
+                reverse=True,
+            )
+        else:
+            matches = reversed(self.eco_entries[low:high])
+
+        matched_ids = [
+            hotel_id
+            for _, hotel_id in matches
+            if (candidates is None or hotel_id in candidates)
+            and self.amenities[hotel_id] & required == required
+        ]
+        page = matched_ids[offset : offset + limit]
+        return [self.hotels[hotel_id] for hotel_id in page], len(matched_ids)
+
+
+hotel_search_index = HotelSearchIndex()
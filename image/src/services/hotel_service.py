@@ -1,14 +1,89 @@
-import boto3
+import hashlib
+import time
 from botocore.exceptions import ClientError
 from fastapi import HTTPException
+from core.aws import BatchGetThrottled, batch_get_items, get_dynamodb
 from core.config import settings
 from schemas.hotel import HotelCreate, HotelUpdate, Hotel, CommunityProject
+from services.hotel_search_service import hotel_search_index
 from uuid import uuid4
-from typing import List, Dict, Any
+from pydantic import TypeAdapter
+from typing import List, Dict, Any, Optional, Tuple
 
-dynamodb = boto3.resource("dynamodb", region_name=settings.PRIVATE_AWS_REGION)
+dynamodb = get_dynamodb()
 table = dynamodb.Table(settings.DYNAMODB_TABLE_NAME_HOTELS)
 
+# The catalog rarely changes, so warm containers serve it from memory
+CATALOG_TTL_SECONDS = 300
+
+_hotel_list_adapter = TypeAdapter(List[Hotel])
+
+
+def _etag(body: bytes) -> str:
+    # Content-derived, so every container hands out the same tag for the same data
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+class HotelCatalogCache:
+    def __init__(self):
+        self.version = 0
+        self.loaded_at: Optional[float] = None
+        self.hotels: Dict[str, Hotel] = {}
+        self._list_body: Optional[Tuple[bytes, str]] = None
+        self.hotel_bodies: Dict[str, Tuple[bytes, str]] = {}
+
+    def is_fresh(self) -> bool:
+        return (
+            self.loaded_at is not None
+            and time.monotonic() - self.loaded_at < CATALOG_TTL_SECONDS
+        )
+
+    def load(self, hotels: List[Hotel], version: int):
+        # A write that landed while the scan was running makes this data stale
+        if version != self.version:
+            return
+        self.hotels = {hotel.hotel_id: hotel for hotel in hotels}
+        self._list_body = None
+        self.hotel_bodies = {}
+        self.loaded_at = time.monotonic()
+        hotel_search_index.rebuild(hotels)
+
+    def list_body(self) -> Tuple[bytes, str]:
+        if self._list_body is None:
+            body = _hotel_list_adapter.dump_json(list(self.hotels.values()))
+            self._list_body = (body, _etag(body))
+        return self._list_body
+
+    def hotel_body(self, hotel: Hotel) -> Tuple[bytes, str]:
+        cached = self.hotel_bodies.get(hotel.hotel_id)
+        if cached is None:
+            body = hotel.model_dump_json().encode()
+            cached = (body, _etag(body))
+            self.hotel_bodies[hotel.hotel_id] = cached
+        return cached
+
+    def upsert(self, hotel: Hotel):
+        # Writes patch the warm catalog in place instead of forcing a rescan
+        self.version += 1
+        if self.loaded_at is None:
+            return
+        self.hotels[hotel.hotel_id] = hotel
+        self.hotel_bodies.pop(hotel.hotel_id, None)
+        self._list_body = None
+        hotel_search_index.upsert(hotel)
+
+    def remove(self, hotel_id: str):
+        self.version += 1
+        if self.loaded_at is None:
+            return
+        self.hotels.pop(hotel_id, None)
+        self.hotel_bodies.pop(hotel_id, None)
+        self._list_body = None
+        hotel_search_index.remove(hotel_id)
+
+
+catalog_cache = HotelCatalogCache()
+
 
 class HotelService:
     @staticmethod
@@ -35,12 +110,16 @@ class HotelService:
         item = HotelService._serialize_hotel({"hotel_id": hotel_id, **hotel.dict()})
         try:
             table.put_item(Item=item)
-            return Hotel(**HotelService._deserialize_hotel(item))
+            hotel = Hotel(**HotelService._deserialize_hotel(item))
+            catalog_cache.upsert(hotel)
+            return hotel
         except ClientError as e:
             raise HTTPException(status_code=500, detail=str(e))
 
     @staticmethod
     async def get_hotel(hotel_id: str):
+        if catalog_cache.is_fresh() and hotel_id in catalog_cache.hotels:
+            return catalog_cache.hotels[hotel_id]
         try:
             response = table.get_item(Key={"hotel_id": hotel_id})
             item = response.get("Item")
@@ -50,6 +129,37 @@ class HotelService:
         except ClientError as e:
             raise HTTPException(status_code=500, detail=str(e))
 
+    @staticmethod
+    async def get_hotels(hotel_ids: List[str]) -> Dict[str, Any]:
+        # Order-preserving de-duplication of the requested ids
+        hotel_ids = list(dict.fromkeys(hotel_ids))
+        found: Dict[str, Hotel] = {}
+        if catalog_cache.is_fresh():
+            found = {
+                hotel_id: catalog_cache.hotels[hotel_id]
+                for hotel_id in hotel_ids
+                if hotel_id in catalog_cache.hotels
+            }
+
+        pending = [hotel_id for hotel_id in hotel_ids if hotel_id not in found]
+        try:
+            items = await batch_get_items(
+                dynamodb, table.name, [{"hotel_id": hotel_id} for hotel_id in pending]
+            )
+        except ClientError as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        except BatchGetThrottled:
+            raise HTTPException(
+                status_code=503, detail="Hotel lookup throttled, retry later"
+            )
+        for item in items:
+            found[item["hotel_id"]] = Hotel(**HotelService._deserialize_hotel(item))
+
+        return {
+            "hotels": [found[hotel_id] for hotel_id in hotel_ids if hotel_id in found],
+            "missing": [hotel_id for hotel_id in hotel_ids if hotel_id not in found],
+        }
+
     @staticmethod
     async def update_hotel(hotel_id: str, hotel_update: HotelUpdate):
         update_expression = "SET "
@@ -76,23 +186,72 @@ class HotelService:
                 ReturnValues="ALL_NEW",
             )
             updated_item = response.get("Attributes", {})
-            return Hotel(**HotelService._deserialize_hotel(updated_item))
+            hotel = Hotel(**HotelService._deserialize_hotel(updated_item))
+            catalog_cache.upsert(hotel)
+            return hotel
         except ClientError as e:
             raise HTTPException(status_code=500, detail=str(e))
 
     @staticmethod
-    async def get_all_hotels() -> List[Hotel]:
+    def _load_catalog():
+        version = catalog_cache.version
+        scan_kwargs = {}
+        hotels = []
         try:
-            response = table.scan()
-            items = response.get("Items", [])
-            return [Hotel(**HotelService._deserialize_hotel(item)) for item in items]
+            while True:
+                response = table.scan(**scan_kwargs)
+                hotels.extend(
+                    Hotel(**HotelService._deserialize_hotel(item))
+                    for item in response.get("Items", [])
+                )
+                if "LastEvaluatedKey" not in response:
+                    break
+                scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
         except ClientError as e:
             raise HTTPException(status_code=500, detail=str(e))
+        catalog_cache.load(hotels, version)
+        return hotels
+
+    @staticmethod
+    async def get_all_hotels() -> List[Hotel]:
+        if catalog_cache.is_fresh():
+            return list(catalog_cache.hotels.values())
+        return HotelService._load_catalog()
+
+    @staticmethod
+    async def get_all_hotels_body() -> Tuple[bytes, str]:
+        if not catalog_cache.is_fresh():
+            hotels = HotelService._load_catalog()
+            if not catalog_cache.is_fresh():
+                body = _hotel_list_adapter.dump_json(hotels)
+                return body, _etag(body)
+        return catalog_cache.list_body()
+
+    @staticmethod
+    async def search_hotels(**filters) -> Dict[str, Any]:
+        if not catalog_cache.is_fresh():
+            HotelService._load_catalog()
+        hotels, total = hotel_search_index.search(**filters)
+        return {
+            "hotels": hotels,
+            "total": total,
+            "offset": filters.get("offset", 0),
+            "limit": filters.get("limit", 20),
+        }
+
+    @staticmethod
+    async def get_hotel_body(hotel_id: str) -> Tuple[bytes, str]:
+        hotel = await HotelService.get_hotel(hotel_id)
+        if catalog_cache.is_fresh() and hotel_id in catalog_cache.hotels:
+            return catalog_cache.hotel_body(hotel)
+        body = hotel.model_dump_json().encode()
+        return body, _etag(body)
 
     @staticmethod
     async def delete_hotel(hotel_id: str):
         try:
             table.delete_item(Key={"hotel_id": hotel_id})
+            catalog_cache.remove(hotel_id)
             return {"message": "Hotel deleted successfully"}
         except ClientError as e:
             raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,210 @@
+import asyncio
+import json
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Optional, Set
+
+from core.aws import get_client
+from core.config import settings
+from services.document_processor import ingest_document, open_document
+from services.dynamodb_service import get_document_by_id, update_document_status
+from utils.utils import get_current_est_time
+
+logger = logging.getLogger(__name__)
+
+# Attempts per pipeline stage before the job is marked failed
+STAGE_MAX_ATTEMPTS = 3
+STAGE_RETRY_BASE_DELAY = 1.0
+# Running jobs record progress at each stage and after every embedded batch;
+# one silent for longer was lost, e.g. to a Lambda timeout, and can be retried
+HEARTBEAT_STALE_SECONDS = 300
+
+
+class IngestionQueue(ABC):
+    """Transport that hands ingestion jobs to a worker.
+
+    The in-process default runs jobs on the API's own event loop, which suits
+    local development. Deployments set INGESTION_QUEUE_URL to hand jobs to
+    SQS, or plug in another broker with set_ingestion_queue.
+    """
+
+    @abstractmethod
+    async def enqueue(self, job: dict):
+        ...
+
+
+class InProcessIngestionQueue(IngestionQueue):
+    def __init__(self):
+        self.tasks: Set[asyncio.Task] = set()
+
+    async def enqueue(self, job: dict):
+        task = asyncio.create_task(run_ingestion_job(job))
+        # Keep a reference so the task is not garbage collected mid-run
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+
+class SQSIngestionQueue(IngestionQueue):
+    def __init__(self, queue_url: str):
+        self.queue_url = queue_url
+        self.client = get_client("sqs")
+
+    async def enqueue(self, job: dict):
+        self.client.send_message(QueueUrl=self.queue_url, MessageBody=json.dumps(job))
+
+
+_queue: Optional[IngestionQueue] = None
+
+
+def get_ingestion_queue() -> IngestionQueue:
+    global _queue
+    if _queue is None:
+        if settings.INGESTION_QUEUE_URL:
+            _queue = SQSIngestionQueue(settings.INGESTION_QUEUE_URL)
+        else:
+            _queue = InProcessIngestionQueue()
+    return _queue
+
+
+def set_ingestion_queue(queue: IngestionQueue):
+    global _queue
+    _queue = queue
+
+
+async def _record(job: dict, status: str, stage: Optional[str] = None, **fields):
+    await update_document_status(
+        job["document_id"],
+        status,
+        job["s3_url"],
+        job["user_id"],
+        job_id=job["document_id"],
+        stage=stage,
+        attempt=job.get("attempt", 1),
+        stage_attempt=job.get("stage_attempt"),
+        chunks_indexed=job.get("start_chunk"),
+        updated_at=get_current_est_time().isoformat(),
+        **fields,
+    )
+
+
+async def _run_stage(job: dict, stage: str, func):
+    for attempt in range(1, STAGE_MAX_ATTEMPTS + 1):
+        job["stage_attempt"] = attempt
+        await _record(job, "processing", stage)
+        try:
+            return await func()
+        except Exception as e:
+            if attempt == STAGE_MAX_ATTEMPTS:
+                raise
+            logger.warning(
+                f"Ingestion of {job['document_id']} failed at {stage} "
+                f"(attempt {attempt}): {e}"
+            )
+            await asyncio.sleep(STAGE_RETRY_BASE_DELAY * 2 ** (attempt - 1))
+
+
+def is_stale(document: dict) -> bool:
+    if document.get("status") != "processing":
+        return False
+    updated_at = document.get("updated_at")
+    if not updated_at:
+        return True
+    age = get_current_est_time() - datetime.fromisoformat(updated_at)
+    return age.total_seconds() > HEARTBEAT_STALE_SECONDS
+
+
+async def run_ingestion_job(job: dict) -> bool:
+    """Runs the document pipeline, recording progress per stage.
+
+    Returns False when a stage exhausted its retries; the failure and stage
+    are stored on the document so it can be re-submitted.
+    """
+    stage = None
+    job.setdefault("start_chunk", 0)
+
+    document = await get_document_by_id(job["document_id"])
+    if document and document["status"] == "completed":
+        # Redelivery of a job that finished before its message was deleted
+        return True
+    if document and document["status"] == "processing":
+        # A redelivered message still carries its original start_chunk;
+        # resume after the batches the interrupted run indexed
+        job["start_chunk"] = max(
+            job["start_chunk"], int(document.get("chunks_indexed", 0))
+        )
+
+    async def on_progress(chunks_indexed: int):
+        # A retried attempt resumes after the last indexed batch
+        job["start_chunk"] = chunks_indexed
+        await _record(job, "processing", "ingest")
+
+    try:
+        stage = "download"
+        pdf_file = await _run_stage(job, stage, lambda: open_document(job["s3_url"]))
+        stage = "ingest"
+        chunk_count = await _run_stage(
+            job,
+            stage,
+            lambda: ingest_document(
+                pdf_file,
+                job["document_id"],
+                job["s3_url"],
+                job["user_id"],
+                start_chunk=job["start_chunk"],
+                on_progress=on_progress,
+            ),
+        )
+    except Exception as e:
+        logger.error(f"Ingestion of {job['document_id']} failed at {stage}: {e}")
+        await _record(job, "failed", stage, error=str(e))
+        return False
+
+    job.pop("stage_attempt", None)
+    await _record(job, "completed", chunk_count=chunk_count)
+    return True
+
+
+async def submit_ingestion_job(
+    document_id: str,
+    s3_url: str,
+    user_id: str,
+    attempt: int = 1,
+    start_chunk: int = 0,
+) -> dict:
+    job = {
+        "document_id": document_id,
+        "s3_url": s3_url,
+        "user_id": user_id,
+        "attempt": attempt,
+        "start_chunk": start_chunk,
+    }
+    await _record(job, "queued")
+    await get_ingestion_queue().enqueue(job)
+    return job
+
+
+def is_ingestion_event(event: dict) -> bool:
+    records = event.get("Records") if isinstance(event, dict) else None
+    return bool(records) and records[0].get("eventSource") == "aws:sqs"
+
+
+def handle_ingestion_event(event: dict) -> dict:
+    """Lambda entry point for SQS deliveries of ingestion jobs."""
+
+    async def run_all():
+        failures = []
+        for record in event["Records"]:
+            try:
+                await run_ingestion_job(json.loads(record["body"]))
+            except Exception as e:
+                # Only unexpected errors (e.g. status writes) go back to SQS;
+                # pipeline failures are already recorded on the document
+                logger.error(f"Ingestion message {record['messageId']} failed: {e}")
+                failures.append({"itemIdentifier": record["messageId"]})
+        return failures
+
+    # asyncio.run would close the loop and clear it from the thread, which
+    # breaks Mangum on the next HTTP invocation this container serves
+    loop = asyncio.get_event_loop()
+    return {"batchItemFailures": loop.run_until_complete(run_all())}
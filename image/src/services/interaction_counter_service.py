@@ -0,0 +1,130 @@
+import atexit
+import logging
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional
+
+from botocore.exceptions import ClientError
+from core.aws import get_dynamodb, is_retryable
+from core.config import settings
+
+dynamodb = get_dynamodb()
+users_table = dynamodb.Table(settings.DYNAMODB_TABLE_NAME_USERS)
+
+logger = logging.getLogger(__name__)
+
+# Pending increments are written at least this often...
+FLUSH_INTERVAL_SECONDS = 5
+# ...or as soon as this many users have pending increments
+FLUSH_THRESHOLD = 100
+# Per-user updates sent concurrently during a flush
+FLUSH_WORKERS = 16
+
+_pool = ThreadPoolExecutor(
+    max_workers=FLUSH_WORKERS, thread_name_prefix="interaction-counter"
+)
+
+
+def _write_increment(user_id: str, count: int):
+    dynamodb.meta.client.update_item(
+        TableName=users_table.name,
+        Key={"user_id": user_id},
+        UpdateExpression="ADD interaction_counter :inc",
+        ExpressionAttributeValues={":inc": count},
+    )
+
+
+class InteractionCounterBuffer:
+    """Coalesces interaction_counter increments in memory.
+
+    Reads record an increment and return immediately. A background thread
+    folds pending increments into one ADD update per user, sent in parallel,
+    every FLUSH_INTERVAL_SECONDS or once FLUSH_THRESHOLD users are pending,
+    and again at exit, so no request waits on these writes.
+
+    Lambda freezes the container between invocations and the thread resumes
+    on the next one. A container reclaimed while frozen loses what was
+    pending: at most the increments recorded in its last
+    FLUSH_INTERVAL_SECONDS of running time. Interaction counts are a ranking
+    signal, so that loss is accepted in exchange for writes staying off
+    every read.
+    """
+
+    def __init__(self):
+        self.pending: Counter = Counter()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    def add(self, user_id: str, count: int = 1):
+        self.add_many([user_id], count)
+
+    def add_many(self, user_ids: Iterable[str], count: int = 1):
+        with self._lock:
+            for user_id in user_ids:
+                self.pending[user_id] += count
+            full = len(self.pending) >= FLUSH_THRESHOLD
+        self._ensure_worker()
+        if full:
+            self._wakeup.set()
+
+    def pending_for(self, user_id: str) -> int:
+        with self._lock:
+            return self.pending.get(user_id, 0)
+
+    def discard(self, user_id: str):
+        # Flushing an increment for a deleted user would recreate its item
+        with self._lock:
+            self.pending.pop(user_id, None)
+
+    def flush(self):
+        with self._lock:
+            if not self.pending:
+                return
+            pending, self.pending = self.pending, Counter()
+        futures = {
+            user_id: (count, _pool.submit(_write_increment, user_id, count))
+            for user_id, count in pending.items()
+        }
+        retry = Counter()
+        for user_id, (count, future) in futures.items():
+            try:
+                future.result()
+            except ClientError as e:
+                # Anything not retryable (e.g. a ValidationException for a
+                # malformed key) would fail forever, so it is dropped
+                if is_retryable(e):
+                    retry[user_id] = count
+                else:
+                    logger.error(
+                        f"Dropping {count} interaction(s) for {user_id}: {e}"
+                    )
+            except Exception as e:
+                # Connection errors and timeouts are worth another attempt
+                logger.error(f"Failed to flush interaction counter: {e}")
+                retry[user_id] = count
+        if retry:
+            # Only the failed users go back; the next flush retries them
+            with self._lock:
+                self.pending.update(retry)
+
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="interaction-counter-flush", daemon=True
+                )
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(FLUSH_INTERVAL_SECONDS)
+            self._wakeup.clear()
+            self.flush()
+
+
+interaction_counter_buffer = InteractionCounterBuffer()
+atexit.register(interaction_counter_buffer.flush)
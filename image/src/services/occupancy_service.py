@@ -0,0 +1,176 @@
+import logging
+import random
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Tuple
+
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+from fastapi import HTTPException
+from core.aws import get_dynamodb, is_retryable
+from core.config import settings
+from services.availability_service import (
+    HOTEL_END_DATE_INDEX,
+    table as booking_table,
+)
+from utils.utils import get_current_est_time, from_epoch, parse_est_datetime, to_epoch
+
+dynamodb = get_dynamodb()
+# Partition key hotel_id, sort key night (YYYY-MM-DD), attribute rooms_occupied
+table = dynamodb.Table(settings.DYNAMODB_TABLE_NAME_OCCUPANCY)
+
+logger = logging.getLogger(__name__)
+
+# Per-night counter updates sent concurrently
+UPDATE_WORKERS = 16
+# Attempts per night before the update is logged and left to rebuild_calendar
+UPDATE_MAX_ATTEMPTS = 5
+# Base delay in seconds for jittered exponential backoff between attempts
+UPDATE_BASE_DELAY = 0.05
+
+_pool = ThreadPoolExecutor(max_workers=UPDATE_WORKERS, thread_name_prefix="occupancy")
+
+
+def _booking_dates(item: dict) -> Tuple[datetime, datetime]:
+    if "start_ts" in item and "end_ts" in item:
+        return from_epoch(item["start_ts"]), from_epoch(item["end_ts"])
+    start, end = item["start_date"], item["end_date"]
+    if isinstance(start, str):
+        start = parse_est_datetime(start)
+    if isinstance(end, str):
+        end = parse_est_datetime(end)
+    return start, end
+
+
+def booking_nights(item: dict) -> List[date]:
+    # A booking occupies the room every night from check-in up to, but not
+    # including, check-out day; same-day bookings still count as one night
+    start, end = _booking_dates(item)
+    first, last = start.date(), end.date()
+    nights = max((last - first).days, 1)
+    return [first + timedelta(days=offset) for offset in range(nights)]
+
+
+class OccupancyService:
+    @staticmethod
+    def _add_night(hotel_id: str, night: date, delta: int):
+        for attempt in range(UPDATE_MAX_ATTEMPTS):
+            try:
+                table.update_item(
+                    Key={"hotel_id": hotel_id, "night": night.isoformat()},
+                    UpdateExpression="ADD rooms_occupied :delta",
+                    ExpressionAttributeValues={":delta": delta},
+                )
+                return
+            except ClientError as e:
+                if not is_retryable(e) or attempt == UPDATE_MAX_ATTEMPTS - 1:
+                    raise
+            time.sleep(random.uniform(0, UPDATE_BASE_DELAY * 2**attempt))
+
+    @staticmethod
+    def apply_deltas(deltas: Dict[Tuple[str, date], int]):
+        # Each night is an independent ADD, so one contended or throttled night
+        # is retried on its own instead of rolling back every other night
+        futures = {
+            (hotel_id, night): _pool.submit(
+                OccupancyService._add_night, hotel_id, night, delta
+            )
+            for (hotel_id, night), delta in deltas.items()
+            if delta
+        }
+        for (hotel_id, night), future in futures.items():
+            try:
+                future.result()
+            except ClientError as e:
+                # The booking itself is already stored; a failed calendar update
+                # is logged and corrected by rebuild_calendar
+                logger.error(
+                    f"Failed to update occupancy for {hotel_id} on {night}: {e}"
+                )
+
+    @staticmethod
+    def booking_deltas(items: Iterable[dict], delta: int) -> Counter:
+        deltas = Counter()
+        for item in items:
+            for night in booking_nights(item):
+                deltas[(item["hotel_id"], night)] += delta
+        return deltas
+
+    @staticmethod
+    def record_booking(item: dict):
+        OccupancyService.apply_deltas(OccupancyService.booking_deltas([item], 1))
+
+    @staticmethod
+    def forget_booking(item: dict):
+        OccupancyService.apply_deltas(OccupancyService.booking_deltas([item], -1))
+
+    @staticmethod
+    def move_booking(old_item: dict, new_item: dict):
+        deltas = OccupancyService.booking_deltas([old_item], -1)
+        deltas.update(OccupancyService.booking_deltas([new_item], 1))
+        OccupancyService.apply_deltas(deltas)
+
+    @staticmethod
+    async def get_calendar(hotel_id: str, days: int = 90) -> dict:
+        first = get_current_est_time().date()
+        last = first + timedelta(days=days - 1)
+        occupancy = [0] * days
+        query_kwargs = {
+            "KeyConditionExpression": Key("hotel_id").eq(hotel_id)
+            & Key("night").between(first.isoformat(), last.isoformat())
+        }
+        try:
+            while True:
+                response = table.query(**query_kwargs)
+                for item in response.get("Items", []):
+                    offset = (date.fromisoformat(item["night"]) - first).days
+                    occupancy[offset] = max(int(item.get("rooms_occupied", 0)), 0)
+                if "LastEvaluatedKey" not in response:
+                    break
+                query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        except ClientError as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+        return {"hotel_id": hotel_id, "start_date": first, "occupancy": occupancy}
+
+    @staticmethod
+    async def rebuild_calendar(hotel_id: str, days: int = 90) -> dict:
+        # Recounts upcoming nights from the bookings table and overwrites the
+        # stored counters, repairing drift from failed incremental updates
+        first = get_current_est_time().date()
+        nights = [first + timedelta(days=offset) for offset in range(days)]
+        counts = Counter()
+        query_kwargs = {
+            "IndexName": HOTEL_END_DATE_INDEX,
+            "KeyConditionExpression": Key("hotel_id").eq(hotel_id)
+            & Key("end_ts").gte(to_epoch(get_current_est_time())),
+            "ProjectionExpression": "hotel_id, start_date, end_date, start_ts, end_ts",
+        }
+        try:
+            while True:
+                response = booking_table.query(**query_kwargs)
+                for item in response.get("Items", []):
+                    counts.update(booking_nights(item))
+                if "LastEvaluatedKey" not in response:
+                    break
+                query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+            with table.batch_writer() as batch:
+                for night in nights:
+                    batch.put_item(
+                        Item={
+                            "hotel_id": hotel_id,
+                            "night": night.isoformat(),
+                            "rooms_occupied": counts[night],
+                        }
+                    )
+        except ClientError as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+        return {
+            "hotel_id": hotel_id,
+            "start_date": first,
+            "occupancy": [counts[night] for night in nights],
+        }
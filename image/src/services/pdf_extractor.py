@@ -0,0 +1,168 @@
+import io
+import logging
+import multiprocessing
+import os
+from multiprocessing.connection import Connection
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+from pypdf import PdfReader
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Pages per unit of work; small shards spread slow pages (tables, scans)
+# across workers instead of leaving one worker with a whole slow section
+SHARD_PAGES = 16
+# Smaller documents are not worth starting worker processes for
+PARALLEL_MIN_PAGES = 64
+# Shards in flight per worker; bounds text extracted ahead of the consumer
+SHARDS_IN_FLIGHT_PER_WORKER = 2
+
+# How a worker reopens the document: ("bytes", data) for in-memory files, or
+# ("s3", bucket, key, size) for range-read ones, which each worker then reads
+# through its own bounded block cache
+Source = Tuple
+
+
+def _document_source(pdf_file: BinaryIO) -> Optional[Source]:
+    # Imported here so workers for in-memory documents, which import this
+    # module on start, skip loading boto3 and FastAPI
+    from services.s3_service import S3RangeReader
+
+    if isinstance(pdf_file, io.BytesIO):
+        return ("bytes", pdf_file.getvalue())
+    raw = getattr(pdf_file, "raw", None)
+    if isinstance(raw, S3RangeReader):
+        return ("s3", raw.bucket_name, raw.key, raw.size)
+    return None
+
+
+def _open_source(source: Source) -> BinaryIO:
+    if source[0] == "bytes":
+        return io.BytesIO(source[1])
+    from services.s3_service import S3RangeReader
+
+    _, bucket_name, key, size = source
+    return io.BufferedReader(
+        S3RangeReader(bucket_name, key, size), buffer_size=64 * 1024
+    )
+
+
+def _serve(connection: Connection, source: Source):
+    # Worker loop: opens the document once, then answers page-range requests
+    # in the order they arrive until the parent sends None
+    reader = PdfReader(_open_source(source))
+    while True:
+        page_range = connection.recv()
+        if page_range is None:
+            break
+        start, stop = page_range
+        try:
+            texts = [
+                reader.pages[number].extract_text() or ""
+                for number in range(start, stop)
+            ]
+        except Exception as e:
+            connection.send(("error", f"{type(e).__name__}: {e}"))
+        else:
+            connection.send(("ok", texts))
+    connection.close()
+
+
+class _Worker:
+    """A spawned extraction process talking over a pipe.
+
+    Plain pipes are used instead of ProcessPoolExecutor because its queues
+    need POSIX semaphores, which Lambda cannot create without /dev/shm.
+    Workers are spawned rather than forked, so locks held by the parent's
+    threads (boto3 pools, logging, the counter flusher) are never inherited.
+    """
+
+    def __init__(self, context, source: Source):
+        self.connection, child = context.Pipe()
+        self.process = context.Process(
+            target=_serve, args=(child, source), daemon=True
+        )
+        self.process.start()
+        child.close()
+
+    def stop(self):
+        try:
+            self.connection.send(None)
+        except OSError:
+            pass
+        self.connection.close()
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+
+
+def extract_workers() -> int:
+    workers = settings.PDF_EXTRACT_WORKERS
+    if workers is None:
+        workers = os.cpu_count() or 1
+    return max(workers, 1)
+
+
+def _iter_serial(reader: PdfReader, start: int = 0) -> Iterator[str]:
+    for number in range(start, len(reader.pages)):
+        yield reader.pages[number].extract_text() or ""
+
+
+def _iter_parallel(reader: PdfReader, source: Source, workers: int) -> Iterator[str]:
+    page_count = len(reader.pages)
+    shards: List[Tuple[int, int]] = [
+        (start, min(start + SHARD_PAGES, page_count))
+        for start in range(0, page_count, SHARD_PAGES)
+    ]
+    context = multiprocessing.get_context("spawn")
+    pool = []
+    try:
+        try:
+            for _ in range(min(workers, len(shards))):
+                pool.append(_Worker(context, source))
+        except (OSError, RuntimeError) as e:
+            logger.warning(f"Parallel PDF extraction unavailable: {e}")
+            yield from _iter_serial(reader)
+            return
+
+        # Shard i always goes to worker i % len(pool) and each pipe is FIFO,
+        # so results are read back in document order
+        submitted = 0
+        for position in range(len(shards)):
+            limit = position + len(pool) * SHARDS_IN_FLIGHT_PER_WORKER
+            while submitted < min(limit, len(shards)):
+                pool[submitted % len(pool)].connection.send(shards[submitted])
+                submitted += 1
+            try:
+                status, payload = pool[position % len(pool)].connection.recv()
+            except (EOFError, OSError) as e:
+                status, payload = "error", f"worker exited: {e}"
+            if status != "ok":
+                # Finish in this process from the first page not yet yielded
+                logger.warning(f"Parallel PDF extraction failed: {payload}")
+                yield from _iter_serial(reader, shards[position][0])
+                return
+            yield from payload
+    finally:
+        for worker in pool:
+            worker.stop()
+
+
+def iter_page_texts(pdf_file: BinaryIO, workers: Optional[int] = None) -> Iterator[str]:
+    """Yields each page's text in order.
+
+    Documents of PARALLEL_MIN_PAGES or more are split into page-range shards
+    and extracted by spawned worker processes. In-memory documents are
+    handed to workers as bytes; range-read ones are reopened by each worker,
+    so memory stays bounded by the block caches. If workers cannot start or
+    fail, the remaining pages are extracted serially.
+    """
+    workers = extract_workers() if workers is None else max(workers, 1)
+    reader = PdfReader(pdf_file)
+    if workers > 1 and len(reader.pages) >= PARALLEL_MIN_PAGES:
+        source = _document_source(pdf_file)
+        if source is not None:
+            yield from _iter_parallel(reader, source, workers)
+            return
+    yield from _iter_serial(reader)
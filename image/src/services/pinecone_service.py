@@ -14,9 +14,12 @@ async def store_embeddings(
     embeddings: List[List[float]],
     metadata: Dict[str, str],
     texts: List[str],  # Add this parameter to receive the actual text chunks
+    start_index: int = 0,
 ):
+    # Vector ids are the chunk's position in the document, so batches can be
+    # upserted as they are produced and re-ingestion overwrites in place
     vectors = []
-    for i, (embedding, text) in enumerate(zip(embeddings, texts)):
+    for i, (embedding, text) in enumerate(zip(embeddings, texts), start_index):
         vector_metadata = metadata.copy()
         vector_metadata["text"] = text  # Store the actual text content
         vectors.append((f"{document_id}_{i}", embedding, vector_metadata))
@@ -1,12 +1,12 @@
-import boto3
 from botocore.exceptions import ClientError
 from fastapi import HTTPException
+from core.aws import get_dynamodb
 from core.config import settings
 from schemas.rag_interaction import RagInteraction, RagInteractionCreate
 from typing import List
 from datetime import datetime
 
-dynamodb = boto3.resource("dynamodb", region_name=settings.PRIVATE_AWS_REGION)
+dynamodb = get_dynamodb()
 table = dynamodb.Table(settings.DYNAMODB_TABLE_NAME_RAG_INTERACTIONS)
 
 
@@ -1,10 +1,9 @@
 import json
-import boto3
 import os
 from typing import List
 from services.pinecone_service import query_embeddings
 from botocore.exceptions import ClientError
-from langchain.prompts import ChatPromptTemplate
+from langchain_core.prompts import ChatPromptTemplate
 from langchain_aws import ChatBedrock
 import logging
 from tenacity import (
@@ -14,6 +13,7 @@ from tenacity import (
     retry_if_exception_type,
 )
 from fastapi import HTTPException
+from core.aws import get_client
 from core.config import settings
 
 
@@ -26,7 +26,7 @@ class RAGService:
         """
         Initializes the RAGService with AWS credentials and model IDs.
         """
-        self.bedrock_runtime = boto3.client(
+        self.bedrock_runtime = get_client(
             "bedrock-runtime",
             region_name=os.getenv(
                 settings.PRIVATE_AWS_REGION, "us-west-1"
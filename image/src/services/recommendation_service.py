@@ -0,0 +1,205 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from botocore.exceptions import ClientError
+from fastapi import HTTPException
+from schemas.hotel import Amenities, Hotel
+from schemas.user import DietaryRestriction, Preferences
+from services.hotel_service import HotelService, catalog_cache
+from services.user_service import UserService, users_table
+
+logger = logging.getLogger(__name__)
+
+AMENITY_NAMES = list(Amenities.model_fields)
+ECO_LEVELS = 11  # eco_rating and econ_rating both range over 0..10
+
+# Feature layout shared by hotel rows and user weight rows:
+#   [amenity flags..., one-hot eco_rating (11), eco_rating / 10]
+AMENITY_OFFSET = 0
+ECO_ONEHOT_OFFSET = len(AMENITY_NAMES)
+ECO_SCALED_OFFSET = ECO_ONEHOT_OFFSET + ECO_LEVELS
+FEATURE_DIM = ECO_SCALED_OFFSET + 1
+
+# Every guest values amenities a little; preferences add to these
+BASE_AMENITY_WEIGHTS = {
+    "breakfast": 0.1,
+    "bar": 0.1,
+    "room_service": 0.1,
+    "pet_friendly": 0.1,
+    "front_desk_24_7": 0.2,
+    "parking": 0.1,
+}
+# Score lost per eco point a hotel falls short of the guest's econ_rating
+ECO_SHORTFALL_WEIGHT = 0.2
+
+DEFAULT_TOP_K = 10
+# Users scored per matrix multiply in batch jobs; bounds the score block to
+# USER_BATCH_SIZE x hotels float32 values
+USER_BATCH_SIZE = 2048
+WRITE_WORKERS = 16
+
+
+def _amenity_index(name: str) -> int:
+    return AMENITY_OFFSET + AMENITY_NAMES.index(name)
+
+
+def encode_hotels(hotels: List[Hotel]) -> Tuple[List[str], np.ndarray]:
+    matrix = np.zeros((len(hotels), FEATURE_DIM), dtype=np.float32)
+    for row, hotel in enumerate(hotels):
+        for column, name in enumerate(AMENITY_NAMES):
+            matrix[row, AMENITY_OFFSET + column] = getattr(hotel.amenities, name)
+        matrix[row, ECO_ONEHOT_OFFSET + hotel.eco_rating] = 1.0
+        matrix[row, ECO_SCALED_OFFSET] = hotel.eco_rating / 10
+    return [hotel.hotel_id for hotel in hotels], matrix
+
+
+# Row i holds the shortfall penalty for a guest with econ_rating i against
+# every hotel eco level, so the penalty folds into the matrix multiply
+_ECO_PENALTIES = -ECO_SHORTFALL_WEIGHT * np.maximum(
+    np.arange(ECO_LEVELS)[:, None] - np.arange(ECO_LEVELS)[None, :], 0
+).astype(np.float32)
+
+
+def encode_preferences(preferences: Iterable[Preferences]) -> np.ndarray:
+    preferences = list(preferences)
+    matrix = np.zeros((len(preferences), FEATURE_DIM), dtype=np.float32)
+    for name, weight in BASE_AMENITY_WEIGHTS.items():
+        matrix[:, _amenity_index(name)] = weight
+
+    for row, prefs in enumerate(preferences):
+        if prefs.dietary_restrictions in (
+            DietaryRestriction.VEGAN,
+            DietaryRestriction.VEGETARIAN,
+        ):
+            matrix[row, _amenity_index("breakfast")] += 1.0
+            matrix[row, _amenity_index("room_service")] += 0.5
+        elif prefs.dietary_restrictions_other:
+            matrix[row, _amenity_index("breakfast")] += 0.5
+        if prefs.quiet_room:
+            matrix[row, _amenity_index("bar")] -= 0.5
+            matrix[row, _amenity_index("pet_friendly")] -= 0.25
+        # Room view and bedding are room-level choices the hotel schema does
+        # not describe, so they do not influence which hotel is suggested
+        econ = prefs.econ_rating
+        matrix[row, ECO_ONEHOT_OFFSET:ECO_SCALED_OFFSET] = _ECO_PENALTIES[econ]
+        matrix[row, ECO_SCALED_OFFSET] = econ / 10
+    return matrix
+
+
+def score(user_matrix: np.ndarray, hotel_matrix: np.ndarray) -> np.ndarray:
+    """Scores every (user, hotel) pair with one matrix multiply."""
+    return user_matrix @ hotel_matrix.T
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Column indices of each row's k best scores, best first."""
+    k = min(k, scores.shape[1])
+    if k == 0:
+        return np.empty((scores.shape[0], 0), dtype=np.intp)
+    candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(
+        -np.take_along_axis(scores, candidates, axis=1), axis=1, kind="stable"
+    )
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+class HotelMatrixCache:
+    """Encoded hotel catalog, rebuilt whenever the catalog cache changes."""
+
+    def __init__(self):
+        self.key: Optional[Tuple[int, Optional[float]]] = None
+        self.hotel_ids: List[str] = []
+        self.matrix = np.zeros((0, FEATURE_DIM), dtype=np.float32)
+
+    async def get(self) -> Tuple[List[str], np.ndarray]:
+        hotels = await HotelService.get_all_hotels()
+        key = (catalog_cache.version, catalog_cache.loaded_at)
+        if key != self.key or len(self.hotel_ids) != len(hotels):
+            self.hotel_ids, self.matrix = encode_hotels(hotels)
+            self.key = key
+        return self.hotel_ids, self.matrix
+
+
+hotel_matrix_cache = HotelMatrixCache()
+
+
+def _iter_user_preferences(
+    batch_size: int,
+) -> Iterator[List[Tuple[str, Preferences]]]:
+    scan_kwargs = {"ProjectionExpression": "user_id, preferences"}
+    batch = []
+    while True:
+        response = users_table.scan(**scan_kwargs)
+        for item in response.get("Items", []):
+            preferences = Preferences(**(item.get("preferences") or {}))
+            batch.append((item["user_id"], preferences))
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if "LastEvaluatedKey" not in response:
+            break
+        scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+    if batch:
+        yield batch
+
+
+class RecommendationService:
+    @staticmethod
+    async def recommend(
+        preferences: List[Preferences], k: int = DEFAULT_TOP_K
+    ) -> List[List[str]]:
+        hotel_ids, hotel_matrix = await hotel_matrix_cache.get()
+        best = top_k(score(encode_preferences(preferences), hotel_matrix), k)
+        return [[hotel_ids[column] for column in row] for row in best]
+
+    @staticmethod
+    async def refresh_user(user_id: str, k: int = DEFAULT_TOP_K) -> List[str]:
+        user = await UserService.get_user(user_id)
+        [recommendations] = await RecommendationService.recommend(
+            [user.preferences], k
+        )
+        return await UserService.update_recommendations(user_id, recommendations)
+
+    @staticmethod
+    async def refresh_all(
+        k: int = DEFAULT_TOP_K, batch_size: int = USER_BATCH_SIZE
+    ) -> Dict[str, int]:
+        # Offline job: scores users in blocks against the whole catalog and
+        # writes each block back on a thread pool while the next is scored.
+        # Only one block's writes are outstanding at a time, so memory stays
+        # bounded however many users there are
+        hotel_ids, hotel_matrix = await hotel_matrix_cache.get()
+        written = failed = 0
+
+        def drain(futures):
+            nonlocal written, failed
+            for future in futures:
+                try:
+                    future.result()
+                    written += 1
+                except Exception as e:
+                    failed += 1
+                    logger.error(f"Failed to store recommendations: {e}")
+
+        with ThreadPoolExecutor(max_workers=WRITE_WORKERS) as pool:
+            pending = []
+            try:
+                for batch in _iter_user_preferences(batch_size):
+                    user_matrix = encode_preferences(prefs for _, prefs in batch)
+                    best = top_k(score(user_matrix, hotel_matrix), k)
+                    drain(pending)
+                    pending = [
+                        pool.submit(
+                            UserService.store_recommendations,
+                            user_id,
+                            [hotel_ids[column] for column in row],
+                        )
+                        for (user_id, _), row in zip(batch, best)
+                    ]
+            except ClientError as e:
+                raise HTTPException(status_code=500, detail=str(e))
+            finally:
+                drain(pending)
+        return {"users": written, "failed": failed, "hotels": len(hotel_ids)}
@@ -0,0 +1,143 @@
+import asyncio
+import json
+import logging
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Set
+import redis.asyncio as redis
+from core.config import settings
+from schemas.request import RequestResponse
+
+logger = logging.getLogger(__name__)
+
+# Events buffered per subscriber before the slowest consoles start dropping them
+SUBSCRIBER_QUEUE_SIZE = 100
+KEEPALIVE_SECONDS = 15
+
+
+def hotel_channel(hotel_id: str, department: Optional[str] = None) -> str:
+    if department:
+        return f"requests:{hotel_id}:{department}"
+    return f"requests:{hotel_id}"
+
+
+class PubSubBackend(ABC):
+    """Fan-out transport for request events.
+
+    The in-process default only reaches consoles connected to the same
+    instance. Setting REDIS_URL shares events through Redis, so requests
+    changed on any instance, Lambda included, reach consoles streaming from
+    a long-running host.
+    """
+
+    @abstractmethod
+    async def publish(self, channel: str, message: dict):
+        ...
+
+    @abstractmethod
+    def subscribe(self, channel: str):
+        """Async context manager yielding an asyncio.Queue of messages."""
+
+
+class InProcessPubSub(PubSubBackend):
+    def __init__(self):
+        self.subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    async def publish(self, channel: str, message: dict):
+        for queue in list(self.subscribers.get(channel, ())):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                logger.warning(f"Dropping event on {channel}: subscriber too slow")
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str):
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.subscribers.setdefault(channel, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self.subscribers.get(channel)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self.subscribers[channel]
+
+
+class RedisPubSub(PubSubBackend):
+    def __init__(self, client: "redis.Redis"):
+        self.client = client
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisPubSub":
+        return cls(redis.from_url(url))
+
+    async def publish(self, channel: str, message: dict):
+        await self.client.publish(channel, json.dumps(message))
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str):
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(channel)
+
+        async def forward():
+            async for raw in pubsub.listen():
+                try:
+                    queue.put_nowait(json.loads(raw["data"]))
+                except asyncio.QueueFull:
+                    logger.warning(f"Dropping event on {channel}: subscriber too slow")
+
+        reader = asyncio.create_task(forward())
+        try:
+            yield queue
+        finally:
+            reader.cancel()
+            await pubsub.unsubscribe(channel)
+            await pubsub.aclose()
+
+
+_backend: Optional[PubSubBackend] = None
+
+
+def get_pubsub_backend() -> PubSubBackend:
+    global _backend
+    if _backend is None:
+        if settings.REDIS_URL:
+            _backend = RedisPubSub.from_url(settings.REDIS_URL)
+        else:
+            _backend = InProcessPubSub()
+    return _backend
+
+
+def set_pubsub_backend(backend: PubSubBackend):
+    global _backend
+    _backend = backend
+
+
+async def publish_request_event(event: str, request: RequestResponse):
+    message = {"event": event, "request": json.loads(request.model_dump_json())}
+    department = request.department.value
+    backend = get_pubsub_backend()
+    try:
+        await backend.publish(hotel_channel(request.hotel_id), message)
+        await backend.publish(hotel_channel(request.hotel_id, department), message)
+    except Exception as e:
+        # Pushing to consoles is best effort; the request itself is stored
+        logger.error(f"Failed to publish request event: {e}")
+
+
+async def stream_request_events(
+    hotel_id: str, department: Optional[str] = None
+) -> AsyncIterator[str]:
+    channel = hotel_channel(hotel_id, department)
+    async with get_pubsub_backend().subscribe(channel) as queue:
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                # SSE comment line keeps proxies from closing an idle stream
+                yield ": keepalive\n\n"
+                continue
+            data = json.dumps(message["request"])
+            yield f"event: {message['event']}\ndata: {data}\n\n"
@@ -1,7 +1,10 @@
-import boto3
-from boto3.dynamodb.conditions import Key
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from boto3.dynamodb.conditions import Key, Attr
 from datetime import datetime
 from uuid import uuid4
+from core.aws import get_dynamodb
 from core.config import settings
 from schemas.request import (
     Request,
@@ -9,18 +12,110 @@ from schemas.request import (
     RequestUpdate,
     RequestStatus,
     RequestResponse,
+    Department,
 )
-from utils.utils import get_current_est_time
-import json
-from typing import List, Optional
+from services.request_event_service import publish_request_event
+from services.dispatch_service import DispatchService
+from botocore.exceptions import ClientError
+from fastapi import HTTPException
+from utils.utils import (
+    get_current_est_time,
+    parse_est_datetime,
+    encode_cursor,
+    decode_cursor,
+)
+from utils.ddsketch import DDSketch
+from decimal import Decimal
+from typing import Dict, Iterator, List, Optional
+
+# GSIs on the requests table: partition key hotel_id / user_id, sort key time_issued
+HOTEL_TIME_ISSUED_INDEX = "hotel_id-time_issued-index"
+USER_TIME_ISSUED_INDEX = "user_id-time_issued-index"
+# Items read per query when filtering by status; filters apply after Limit,
+# so a page of matches usually takes more reads than the page size
+FILTERED_READ_LIMIT = 200
+# Reads spent filling one status-filtered page; a rare status returns a short
+# page with a cursor rather than reading a whole hotel's history at once
+FILTERED_MAX_READS = 10
+
+# Key of the per-hotel aggregate item in the request stats table; its
+# attributes are "<department>#<status>" counters
+COUNTERS_STAT = "counters"
+# Export pages buffered between scan workers and the response stream
+EXPORT_QUEUE_PAGES = 32
+_EXPORT_DONE = object()
+
+# Sort-key prefix of the per-department completion latency sketches
+SLA_STAT_PREFIX = "sla#"
+SLA_QUANTILES = (0.5, 0.9, 0.99)
+# Retries when a concurrent write changes a request's status mid-update
+STATUS_UPDATE_ATTEMPTS = 3
+
+
+def _is_condition_failure(error: ClientError) -> bool:
+    code = error.response["Error"]["Code"]
+    if code == "ConditionalCheckFailedException":
+        return True
+    if code == "TransactionCanceledException":
+        return any(
+            reason.get("Code") == "ConditionalCheckFailed"
+            for reason in error.response.get("CancellationReasons", [])
+        )
+    return False
 
 
 class RequestService:
     def __init__(self):
-        self.dynamodb = boto3.resource(
-            "dynamodb", region_name=settings.PRIVATE_AWS_REGION
-        )
+        self.dynamodb = get_dynamodb()
         self.table = self.dynamodb.Table(settings.DYNAMODB_TABLE_NAME_REQUESTS)
+        self.stats_table = self.dynamodb.Table(
+            settings.DYNAMODB_TABLE_NAME_REQUEST_STATS
+        )
+
+    def _counter_update(
+        self, hotel_id: str, department: str, deltas: Dict[str, int]
+    ) -> dict:
+        names = {}
+        values = {}
+        clauses = []
+        for position, (status, delta) in enumerate(deltas.items()):
+            names[f"#c{position}"] = f"{department}#{status}"
+            values[f":d{position}"] = delta
+            clauses.append(f"#c{position} :d{position}")
+        return {
+            "Update": {
+                "TableName": self.stats_table.name,
+                "Key": {"hotel_id": hotel_id, "stat": COUNTERS_STAT},
+                "UpdateExpression": "ADD " + ", ".join(clauses),
+                "ExpressionAttributeNames": names,
+                "ExpressionAttributeValues": values,
+            }
+        }
+
+    def _sla_sketch_update(
+        self, hotel_id: str, department: str, latency_seconds: float
+    ) -> dict:
+        # Sketch buckets are top-level counters ("b<key>"), so concurrent
+        # completions from any container merge through atomic ADDs
+        key = DDSketch().key(latency_seconds)
+        return {
+            "Update": {
+                "TableName": self.stats_table.name,
+                "Key": {"hotel_id": hotel_id, "stat": SLA_STAT_PREFIX + department},
+                "UpdateExpression": "ADD #bucket :one, sketch_count :one, "
+                "sketch_sum :latency",
+                "ExpressionAttributeNames": {
+                    "#bucket": "zero" if key is None else f"b{key}"
+                },
+                "ExpressionAttributeValues": {
+                    ":one": 1,
+                    ":latency": Decimal(str(round(latency_seconds, 3))),
+                },
+            }
+        }
+
+    def _transact(self, actions: List[dict]):
+        self.dynamodb.meta.client.transact_write_items(TransactItems=actions)
 
     async def create_request(self, request: RequestCreate) -> RequestResponse:
         request_id = str(uuid4())
@@ -34,8 +129,24 @@ class RequestService:
             "time_issued": now.isoformat(),
             "status": RequestStatus.PENDING.value,
         }
-        self.table.put_item(Item=item)
-        return RequestResponse(**item)
+        try:
+            # The request and its hotel counter are written atomically
+            self._transact(
+                [
+                    {"Put": {"TableName": self.table.name, "Item": item}},
+                    self._counter_update(
+                        item["hotel_id"],
+                        item["department"],
+                        {RequestStatus.PENDING.value: 1},
+                    ),
+                ]
+            )
+        except ClientError as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        await DispatchService.enqueue(item)
+        response = RequestResponse(**item)
+        await publish_request_event("created", response)
+        return response
 
     async def get_request(self, request_id: str) -> RequestResponse:
         response = self.table.get_item(Key={"request_id": request_id})
@@ -47,77 +158,385 @@ class RequestService:
     async def update_request(
         self, request_id: str, update: RequestUpdate
     ) -> RequestResponse:
-        update_expression = "SET #status = :status"
-        expression_attribute_names = {"#status": "status"}
-        expression_attribute_values = {":status": update.status.value}
-
-        if update.status == RequestStatus.COMPLETED:
-            update_expression += ", time_completed = :time_completed"
-            expression_attribute_values[":time_completed"] = (
-                get_current_est_time().isoformat()
-            )
+        for _ in range(STATUS_UPDATE_ATTEMPTS):
+            current = self.table.get_item(
+                Key={"request_id": request_id}, ConsistentRead=True
+            ).get("Item")
+            if not current:
+                return None
 
-        response = self.table.update_item(
-            Key={"request_id": request_id},
-            UpdateExpression=update_expression,
-            ExpressionAttributeNames=expression_attribute_names,
-            ExpressionAttributeValues=expression_attribute_values,
-            ReturnValues="ALL_NEW",
-        )
-        return RequestResponse(**response["Attributes"])
+            old_status = current["status"]
+            update_expression = "SET #status = :status"
+            expression_attribute_names = {"#status": "status"}
+            expression_attribute_values = {
+                ":status": update.status.value,
+                ":old_status": old_status,
+            }
+            attributes = {**current, "status": update.status.value}
 
-    async def get_requests_by_hotel(
-        self, hotel_id: str, status: RequestStatus = None
-    ) -> list[RequestResponse]:
-        key_condition = Key("hotel_id").eq(hotel_id)
-        if status:
-            key_condition &= Key("status").eq(status.value)
+            if update.status == RequestStatus.COMPLETED:
+                update_expression += ", time_completed = :time_completed"
+                attributes["time_completed"] = get_current_est_time().isoformat()
+                expression_attribute_values[":time_completed"] = attributes[
+                    "time_completed"
+                ]
 
-        query_params = {
-            "IndexName": "hotel_id-status-index",
-            "KeyConditionExpression": key_condition,
+            actions = [
+                {
+                    "Update": {
+                        "TableName": self.table.name,
+                        "Key": {"request_id": request_id},
+                        "UpdateExpression": update_expression,
+                        # Counters move from old_status, so it must not change
+                        # underneath us
+                        "ConditionExpression": "#status = :old_status",
+                        "ExpressionAttributeNames": expression_attribute_names,
+                        "ExpressionAttributeValues": expression_attribute_values,
+                    }
+                }
+            ]
+            if old_status != update.status.value:
+                actions.append(
+                    self._counter_update(
+                        current["hotel_id"],
+                        current["department"],
+                        {old_status: -1, update.status.value: 1},
+                    )
+                )
+                if update.status == RequestStatus.COMPLETED:
+                    latency = (
+                        parse_est_datetime(attributes["time_completed"])
+                        - parse_est_datetime(current["time_issued"])
+                    ).total_seconds()
+                    actions.append(
+                        self._sla_sketch_update(
+                            current["hotel_id"], current["department"], latency
+                        )
+                    )
+            try:
+                self._transact(actions)
+                break
+            except ClientError as e:
+                if not _is_condition_failure(e):
+                    raise HTTPException(status_code=500, detail=str(e))
+        else:
+            raise HTTPException(
+                status_code=409, detail="Request was modified concurrently, retry"
+            )
+
+        if "hotel_id" in attributes:
+            if update.status == RequestStatus.PENDING:
+                await DispatchService.enqueue(attributes)
+            else:
+                DispatchService.dequeue(
+                    attributes["hotel_id"], attributes["department"], request_id
+                )
+        updated = RequestResponse(**attributes)
+        await publish_request_event("updated", updated)
+        return updated
+
+    def _load_pending_requests(self, hotel_id: str, department: Department):
+        query_kwargs = {
+            "IndexName": HOTEL_TIME_ISSUED_INDEX,
+            "KeyConditionExpression": Key("hotel_id").eq(hotel_id),
+            "FilterExpression": Attr("status").eq(RequestStatus.PENDING.value)
+            & Attr("department").eq(department.value),
+            "ProjectionExpression": "request_id, user_id, department, time_issued",
         }
+        items = []
+        try:
+            while True:
+                response = self.table.query(**query_kwargs)
+                items.extend(response.get("Items", []))
+                if "LastEvaluatedKey" not in response:
+                    break
+                query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        except ClientError as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        return items
 
-        response = self.table.query(**query_params)
-        return [RequestResponse(**item) for item in response["Items"]]
+    async def claim_next_request(
+        self, hotel_id: str, department: Department, staff_id: str
+    ) -> Optional[RequestResponse]:
+        queue = await DispatchService.get_queue(
+            hotel_id, department, self._load_pending_requests
+        )
+        while True:
+            request_id = queue.pop()
+            if request_id is None:
+                return None
+            try:
+                # The condition makes the pending -> in_progress transition
+                # atomic, so two staff members can never claim the same task
+                self._transact(
+                    [
+                        {
+                            "Update": {
+                                "TableName": self.table.name,
+                                "Key": {"request_id": request_id},
+                                "UpdateExpression": "SET #status = :in_progress, "
+                                "assigned_to = :staff_id, time_claimed = :time_claimed",
+                                "ConditionExpression": "#status = :pending",
+                                "ExpressionAttributeNames": {"#status": "status"},
+                                "ExpressionAttributeValues": {
+                                    ":in_progress": RequestStatus.IN_PROGRESS.value,
+                                    ":pending": RequestStatus.PENDING.value,
+                                    ":staff_id": staff_id,
+                                    ":time_claimed": get_current_est_time().isoformat(),
+                                },
+                            }
+                        },
+                        self._counter_update(
+                            hotel_id,
+                            department.value,
+                            {
+                                RequestStatus.PENDING.value: -1,
+                                RequestStatus.IN_PROGRESS.value: 1,
+                            },
+                        ),
+                    ]
+                )
+            except ClientError as e:
+                if _is_condition_failure(e):
+                    # Claimed or closed elsewhere; try the next one
+                    continue
+                raise HTTPException(status_code=500, detail=str(e))
 
-    async def get_requests_by_user(
-        self, user_id: str, status: RequestStatus = None
-    ) -> list[RequestResponse]:
-        key_condition = Key("user_id").eq(user_id)
-        if status:
-            key_condition &= Key("status").eq(status.value)
+            response = self.table.get_item(
+                Key={"request_id": request_id}, ConsistentRead=True
+            )
+            claimed = RequestResponse(**response["Item"])
+            await publish_request_event("updated", claimed)
+            return claimed
 
+    def _read_page(
+        self, read, params: dict, key_names: List[str], limit: int, cursor
+    ) -> dict:
+        filtered = "FilterExpression" in params
+        params["Limit"] = max(limit, FILTERED_READ_LIMIT) if filtered else limit
+        exclusive_start_key = decode_cursor(cursor)
+        items = []
+        for _ in range(FILTERED_MAX_READS if filtered else 1):
+            if exclusive_start_key:
+                params["ExclusiveStartKey"] = exclusive_start_key
+            response = read(**params)
+            items.extend(response.get("Items", []))
+            exclusive_start_key = response.get("LastEvaluatedKey")
+            if len(items) >= limit or not exclusive_start_key:
+                break
+        if len(items) > limit:
+            # Resume right after the last item returned
+            items = items[:limit]
+            exclusive_start_key = {name: items[-1][name] for name in key_names}
+        return {
+            "requests": [RequestResponse(**item) for item in items],
+            "next_cursor": encode_cursor(exclusive_start_key),
+        }
+
+    def _query_page(
+        self,
+        index_name: str,
+        partition_key: str,
+        partition_value: str,
+        status: Optional[RequestStatus] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> dict:
         query_params = {
-            "IndexName": "user_id-status-index",
-            "KeyConditionExpression": key_condition,
+            "IndexName": index_name,
+            "KeyConditionExpression": Key(partition_key).eq(partition_value),
+            # Newest requests first
+            "ScanIndexForward": False,
         }
+        if status:
+            query_params["FilterExpression"] = Attr("status").eq(status.value)
+        # A position in the index is its key plus the table key
+        key_names = ["request_id", partition_key, "time_issued"]
+        return self._read_page(self.table.query, query_params, key_names, limit, cursor)
+
+    async def get_requests_by_hotel(
+        self,
+        hotel_id: str,
+        status: RequestStatus = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> dict:
+        return self._query_page(
+            HOTEL_TIME_ISSUED_INDEX, "hotel_id", hotel_id, status, limit, cursor
+        )
 
-        response = self.table.query(**query_params)
-        return [RequestResponse(**item) for item in response["Items"]]
+    async def get_requests_by_user(
+        self,
+        user_id: str,
+        status: RequestStatus = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> dict:
+        return self._query_page(
+            USER_TIME_ISSUED_INDEX, "user_id", user_id, status, limit, cursor
+        )
 
     async def get_all_requests(
         self,
         status: Optional[RequestStatus] = None,
         limit: int = 50,
-        last_evaluated_key: Optional[str] = None,
+        cursor: Optional[str] = None,
     ) -> dict:
-        scan_kwargs = {"Limit": limit}
-
+        scan_kwargs = {}
         if status:
-            scan_kwargs["FilterExpression"] = Key("status").eq(status.value)
+            scan_kwargs["FilterExpression"] = Attr("status").eq(status.value)
+        return self._read_page(
+            self.table.scan, scan_kwargs, ["request_id"], limit, cursor
+        )
+
+    async def get_request_summary(self, hotel_id: str) -> dict:
+        try:
+            response = self.stats_table.get_item(
+                Key={"hotel_id": hotel_id, "stat": COUNTERS_STAT}
+            )
+        except ClientError as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        counters = response.get("Item", {})
+        return {
+            "hotel_id": hotel_id,
+            "departments": {
+                department.value: {
+                    status.value: max(
+                        int(counters.get(f"{department.value}#{status.value}", 0)), 0
+                    )
+                    for status in RequestStatus
+                }
+                for department in Department
+            },
+        }
 
-        if last_evaluated_key:
-            scan_kwargs["ExclusiveStartKey"] = json.loads(last_evaluated_key)
+    def rebuild_counters(self) -> Dict[str, Dict[str, int]]:
+        # Reconciliation: recount every request and overwrite the aggregate
+        # items. Writes racing with the scan can still leave small drift, which
+        # the next run corrects.
+        counts: Dict[str, Dict[str, int]] = {}
+        scan_kwargs = {
+            "ProjectionExpression": "hotel_id, department, #status",
+            "ExpressionAttributeNames": {"#status": "status"},
+        }
+        while True:
+            response = self.table.scan(**scan_kwargs)
+            for item in response.get("Items", []):
+                hotel_counts = counts.setdefault(item["hotel_id"], {})
+                counter = f"{item['department']}#{item['status']}"
+                hotel_counts[counter] = hotel_counts.get(counter, 0) + 1
+            if "LastEvaluatedKey" not in response:
+                break
+            scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
 
-        response = self.table.scan(**scan_kwargs)
+        with self.stats_table.batch_writer() as batch:
+            for hotel_id, hotel_counts in counts.items():
+                batch.put_item(
+                    Item={"hotel_id": hotel_id, "stat": COUNTERS_STAT, **hotel_counts}
+                )
+        return counts
 
-        items = response.get("Items", [])
-        last_key = response.get("LastEvaluatedKey")
+    async def get_sla_percentiles(
+        self, hotel_id: str, department: Optional[Department] = None
+    ) -> dict:
+        prefix = SLA_STAT_PREFIX + (department.value if department else "")
+        try:
+            response = self.stats_table.query(
+                KeyConditionExpression=Key("hotel_id").eq(hotel_id)
+                & Key("stat").begins_with(prefix)
+            )
+        except ClientError as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
-        requests = [RequestResponse(**item) for item in items]
+        departments = {}
+        for item in response.get("Items", []):
+            sketch = DDSketch()
+            for name, value in item.items():
+                if name == "zero":
+                    sketch.zero_count = int(value)
+                elif name.startswith("b") and name[1:].lstrip("-").isdigit():
+                    sketch.bins[int(name[1:])] = int(value)
+            sketch.count = int(item.get("sketch_count", 0))
+            sketch.sum = float(item.get("sketch_sum", 0))
+            quantiles = sketch.quantiles(SLA_QUANTILES)
+            departments[item["stat"][len(SLA_STAT_PREFIX) :]] = {
+                "count": sketch.count,
+                "mean_seconds": sketch.sum / sketch.count if sketch.count else None,
+                "p50_seconds": quantiles[0.5],
+                "p90_seconds": quantiles[0.9],
+                "p99_seconds": quantiles[0.99],
+            }
+        return {"hotel_id": hotel_id, "departments": departments}
 
-        return {
-            "requests": requests,
-            "last_evaluated_key": json.dumps(last_key) if last_key else None,
+    def _export_by_status_index(self, status: RequestStatus) -> Iterator[dict]:
+        query_kwargs = {
+            "IndexName": settings.REQUESTS_STATUS_INDEX,
+            "KeyConditionExpression": Key("status").eq(status.value),
         }
+        while True:
+            response = self.table.query(**query_kwargs)
+            yield from response.get("Items", [])
+            if "LastEvaluatedKey" not in response:
+                break
+            query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    def _export_parallel_scan(
+        self, status: Optional[RequestStatus], segments: int
+    ) -> Iterator[dict]:
+        client = self.dynamodb.meta.client
+        pages: queue.Queue = queue.Queue(maxsize=EXPORT_QUEUE_PAGES)
+        stop = threading.Event()
+
+        def scan_segment(segment: int):
+            scan_kwargs = {
+                "TableName": self.table.name,
+                "Segment": segment,
+                "TotalSegments": segments,
+            }
+            if status:
+                scan_kwargs["FilterExpression"] = "#status = :status"
+                scan_kwargs["ExpressionAttributeNames"] = {"#status": "status"}
+                scan_kwargs["ExpressionAttributeValues"] = {":status": status.value}
+            try:
+                while not stop.is_set():
+                    response = client.scan(**scan_kwargs)
+                    if response.get("Items"):
+                        pages.put(response["Items"])
+                    if "LastEvaluatedKey" not in response:
+                        break
+                    scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+            except ClientError as e:
+                pages.put(e)
+            finally:
+                pages.put(_EXPORT_DONE)
+
+        executor = ThreadPoolExecutor(max_workers=segments)
+        for segment in range(segments):
+            executor.submit(scan_segment, segment)
+        try:
+            remaining = segments
+            while remaining:
+                page = pages.get()
+                if page is _EXPORT_DONE:
+                    remaining -= 1
+                elif isinstance(page, ClientError):
+                    raise page
+                else:
+                    yield from page
+        finally:
+            # Client went away or a segment failed: stop the other workers
+            stop.set()
+            while not pages.empty():
+                pages.get_nowait()
+            executor.shutdown(wait=False)
+
+    def export_requests(
+        self, status: Optional[RequestStatus] = None, segments: int = 4
+    ) -> Iterator[str]:
+        # A status-keyed index turns the filter into a key condition; without
+        # one, segments of the table are scanned in parallel and merged
+        if status and settings.REQUESTS_STATUS_INDEX:
+            items = self._export_by_status_index(status)
+        else:
+            items = self._export_parallel_scan(status, segments)
+        return (RequestResponse(**item).model_dump_json() + "\n" for item in items)
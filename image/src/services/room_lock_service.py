@@ -0,0 +1,98 @@
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, List, Set
+
+from botocore.exceptions import ClientError
+from fastapi import HTTPException
+from core.aws import get_dynamodb
+from core.config import settings
+from services.occupancy_service import booking_nights
+from utils.utils import est_tz, to_epoch
+
+dynamodb = get_dynamodb()
+# Partition key lock_id ("<hotel_id>#<room_number>#<night>"), attributes
+# booking_id and expires_at (TTL). One item per booked room-night, written in
+# the same transaction as the booking, so two bookings can never hold the
+# same night even when a container's availability index is stale
+table = dynamodb.Table(settings.DYNAMODB_TABLE_NAME_ROOM_LOCKS)
+
+# transact_write_items accepts at most 100 actions; one is the booking itself
+MAX_LOCK_ACTIONS = 99
+# Days a lock outlives its night before TTL removes it
+LOCK_TTL_GRACE_DAYS = 2
+
+
+def room_night_locks(item: dict) -> Set[str]:
+    prefix = f"{item['hotel_id']}#{item['room_number']}#"
+    return {prefix + night.isoformat() for night in booking_nights(item)}
+
+
+def _expires_at(lock_id: str) -> int:
+    night = date.fromisoformat(lock_id.rsplit("#", 1)[1])
+    expiry = night + timedelta(days=LOCK_TTL_GRACE_DAYS)
+    return to_epoch(est_tz.localize(datetime.combine(expiry, time.min)))
+
+
+def lock_actions(
+    item: dict, acquire: Iterable[str], release: Iterable[str] = ()
+) -> List[dict]:
+    """Transaction actions taking and freeing room-nights for a booking.
+
+    A lock may be taken when it is free or already held by this booking, and
+    released only by its holder. Locks missing for bookings made before they
+    existed are treated as free.
+    """
+    booking_id = item["booking_id"]
+    condition = {
+        "TableName": table.name,
+        "ConditionExpression": "attribute_not_exists(lock_id) OR booking_id = :id",
+        "ExpressionAttributeValues": {":id": booking_id},
+    }
+    actions = [
+        {
+            "Put": {
+                "Item": {
+                    "lock_id": lock_id,
+                    "booking_id": booking_id,
+                    "expires_at": _expires_at(lock_id),
+                },
+                **condition,
+            }
+        }
+        for lock_id in sorted(acquire)
+    ]
+    actions += [
+        {"Delete": {"Key": {"lock_id": lock_id}, **condition}}
+        for lock_id in sorted(release)
+    ]
+    if len(actions) > MAX_LOCK_ACTIONS:
+        raise too_many_nights_error()
+    return actions
+
+
+def too_many_nights_error() -> HTTPException:
+    return HTTPException(
+        status_code=400,
+        detail=f"A booking change can cover at most {MAX_LOCK_ACTIONS} nights",
+    )
+
+
+def ensure_lockable(item: dict):
+    # Checked while validating imports, so a long stay is reported per row
+    # instead of failing its transaction after earlier rows were written
+    if len(booking_nights(item)) > MAX_LOCK_ACTIONS:
+        raise too_many_nights_error()
+
+
+def is_lock_conflict(error: ClientError) -> bool:
+    if error.response["Error"]["Code"] != "TransactionCanceledException":
+        return False
+    # The first action is the booking; the rest are locks
+    reasons = error.response.get("CancellationReasons", [])[1:]
+    return any(reason.get("Code") == "ConditionalCheckFailed" for reason in reasons)
+
+
+def conflict_error(room_number: str) -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail=f"Room {room_number} is already booked for this period",
+    )
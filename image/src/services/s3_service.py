@@ -1,15 +1,23 @@
-import boto3
-from fastapi import UploadFile
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from botocore.exceptions import ClientError
+from fastapi import HTTPException, UploadFile
+from core.aws import get_client
 from core.config import settings
+from typing import BinaryIO, Iterable, Tuple
 import io
 
-s3_client = boto3.client(
+s3_client = get_client(
     "s3",
     aws_access_key_id=settings.PRIVATE_AWS_ACCESS_KEY_ID,
     aws_secret_access_key=settings.PRIVATE_AWS_SECRET_ACCESS_KEY,
-    region_name=settings.PRIVATE_AWS_REGION,
 )
 
+logger = logging.getLogger(__name__)
+
 
 async def upload_file_to_s3(file: UploadFile, chain_id: str, hotel_id: str = None):
     if hotel_id:
@@ -30,9 +38,185 @@ async def upload_file_to_s3(file: UploadFile, chain_id: str, hotel_id: str = Non
         return {"error": str(e)}
 
 
-async def get_file_from_s3(s3_url: str):
+# Objects up to this size are read into memory in one GET; larger ones are
+# read through ranged GETs so memory stays bounded by the block cache
+IN_MEMORY_MAX_BYTES = 16 * 1024 * 1024
+RANGE_BLOCK_SIZE = 1024 * 1024
+RANGE_CACHE_BLOCKS = 8
+
+
+def _parse_s3_url(s3_url: str) -> Tuple[str, str]:
     bucket_name = s3_url.split("//")[1].split(".")[0]
     key = "/".join(s3_url.split("/")[3:])
+    return bucket_name, key
+
+
+class S3RangeReader(io.RawIOBase):
+    """Seekable read-only view of an S3 object backed by ranged GETs.
+
+    Fetched blocks are kept in a small LRU cache because PDF parsers jump
+    between the cross-reference table at the end and objects throughout.
+    """
+
+    def __init__(self, bucket_name: str, key: str, size: int):
+        self.bucket_name = bucket_name
+        self.key = key
+        self.size = size
+        self.position = 0
+        self.blocks: "OrderedDict[int, bytes]" = OrderedDict()
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self.position = max(offset, 0)
+        return self.position
+
+    def _block(self, index: int) -> bytes:
+        block = self.blocks.get(index)
+        if block is None:
+            start = index * RANGE_BLOCK_SIZE
+            end = min(start + RANGE_BLOCK_SIZE, self.size) - 1
+            response = s3_client.get_object(
+                Bucket=self.bucket_name, Key=self.key, Range=f"bytes={start}-{end}"
+            )
+            block = response["Body"].read()
+            self.blocks[index] = block
+            if len(self.blocks) > RANGE_CACHE_BLOCKS:
+                self.blocks.popitem(last=False)
+        else:
+            self.blocks.move_to_end(index)
+        return block
+
+    def readinto(self, buffer) -> int:
+        view = memoryview(buffer).cast("B")
+        written = 0
+        while written < len(view) and self.position < self.size:
+            index, offset = divmod(self.position, RANGE_BLOCK_SIZE)
+            block = self._block(index)
+            count = min(len(view) - written, len(block) - offset)
+            view[written : written + count] = block[offset : offset + count]
+            written += count
+            self.position += count
+        return written
+
+
+def _open_s3_object(bucket_name: str, key: str) -> BinaryIO:
+    size = s3_client.head_object(Bucket=bucket_name, Key=key)["ContentLength"]
+    if size <= IN_MEMORY_MAX_BYTES:
+        response = s3_client.get_object(Bucket=bucket_name, Key=key)
+        return io.BytesIO(response["Body"].read())
+    return io.BufferedReader(
+        S3RangeReader(bucket_name, key, size), buffer_size=64 * 1024
+    )
 
-    response = s3_client.get_object(Bucket=bucket_name, Key=key)
-    return io.BytesIO(response["Body"].read())
+
+async def open_s3_file(s3_url: str) -> BinaryIO:
+    """Seekable binary file over an S3 object without copying it to disk."""
+    # The download blocks, so it runs off the event loop
+    return await asyncio.to_thread(_open_s3_object, *_parse_s3_url(s3_url))
+
+
+# Exports are uploaded in parts of this size, so only one part is held in
+# memory; S3 requires at least 5 MB for every part but the last
+EXPORT_PART_SIZE = 8 * 1024 * 1024
+EXPORT_PREFIX = "exports/"
+EXPORT_URL_EXPIRES_SECONDS = 3600
+# Exports are deleted once their download URL can no longer be used; the margin
+# covers the gap between the upload finishing and the URL being signed
+EXPORT_RETENTION_SECONDS = EXPORT_URL_EXPIRES_SECONDS + 300
+# delete_objects accepts at most 1000 keys per call
+DELETE_BATCH_SIZE = 1000
+
+
+def delete_expired_exports():
+    """Deletes exports whose presigned URLs have expired."""
+    bucket_name = settings.S3_BUCKET_NAME
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=EXPORT_RETENTION_SECONDS)
+    expired = []
+    paginator = s3_client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket_name, Prefix=EXPORT_PREFIX):
+        expired.extend(
+            {"Key": item["Key"]}
+            for item in page.get("Contents", [])
+            if item["LastModified"] < cutoff
+        )
+    for start in range(0, len(expired), DELETE_BATCH_SIZE):
+        batch = expired[start : start + DELETE_BATCH_SIZE]
+        s3_client.delete_objects(
+            Bucket=bucket_name, Delete={"Objects": batch, "Quiet": True}
+        )
+
+
+def upload_export(chunks: Iterable[str], filename: str, content_type: str) -> str:
+    """Uploads a streamed export to S3 and returns a presigned download URL.
+
+    Used where responses cannot be streamed, such as behind Lambda, whose
+    buffered responses are capped at 6 MB. Blocks, so call it off the loop.
+    Earlier exports past their retention are deleted first.
+    """
+    try:
+        delete_expired_exports()
+    except ClientError as e:
+        # Left for the next export to retry; never worth failing this one
+        logger.warning(f"Failed to delete expired exports: {e}")
+
+    bucket_name = settings.S3_BUCKET_NAME
+    key = f"{EXPORT_PREFIX}{uuid.uuid4().hex}/{filename}"
+    upload_id = s3_client.create_multipart_upload(
+        Bucket=bucket_name,
+        Key=key,
+        ContentType=content_type,
+        ContentDisposition=f'attachment; filename="{filename}"',
+    )["UploadId"]
+    parts = []
+    buffer = io.BytesIO()
+
+    def upload_part():
+        number = len(parts) + 1
+        response = s3_client.upload_part(
+            Bucket=bucket_name,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=number,
+            Body=buffer.getvalue(),
+        )
+        parts.append({"ETag": response["ETag"], "PartNumber": number})
+        buffer.seek(0)
+        buffer.truncate()
+
+    try:
+        for chunk in chunks:
+            buffer.write(chunk.encode())
+            if buffer.tell() >= EXPORT_PART_SIZE:
+                upload_part()
+        if buffer.tell() or not parts:
+            upload_part()
+        s3_client.complete_multipart_upload(
+            Bucket=bucket_name,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": parts},
+        )
+    except Exception as e:
+        s3_client.abort_multipart_upload(
+            Bucket=bucket_name, Key=key, UploadId=upload_id
+        )
+        if isinstance(e, ClientError):
+            raise HTTPException(status_code=500, detail=str(e))
+        raise
+    return s3_client.generate_presigned_url(
+        "get_object",
+        Params={"Bucket": bucket_name, "Key": key},
+        ExpiresIn=EXPORT_URL_EXPIRES_SECONDS,
+    )
@@ -1,8 +1,8 @@
 # services/top_user_recommendations_service.py
 
-import boto3
 from typing import List
 import json
+from core.aws import get_client
 from .rag_interaction_service import RAGInteractionService
 from ..utils.utils import preprocess_text
 from sklearn.feature_extraction.text import TfidfVectorizer
@@ -12,7 +12,7 @@ from sklearn.decomposition import LatentDirichletAllocation
 class TopUserRecommendationsService:
     def __init__(self):
         self.rag_service = RAGInteractionService()
-        self.bedrock_runtime = boto3.client("bedrock-runtime")
+        self.bedrock_runtime = get_client("bedrock-runtime")
         self.tfidf_vectorizer = TfidfVectorizer(max_features=1000, stop_words="english")
         self.lda_model = LatentDirichletAllocation(n_components=5, random_state=42)
 
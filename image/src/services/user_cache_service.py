@@ -0,0 +1,70 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from schemas.user import User
+
+# Profiles change rarely; other containers pick up edits within this window
+USER_TTL_SECONDS = 300
+# Unknown ids are re-checked sooner so a fresh sign-up is seen quickly
+MISSING_USER_TTL_SECONDS = 30
+USER_CACHE_SIZE = 10_000
+
+# Stored for ids that have no user item
+MISSING = object()
+
+
+class UserProfileCache:
+    """Size-bounded LRU of resolved users for the auth path.
+
+    Entries expire after a TTL, and ids without a user item are cached as
+    MISSING. UserService drops entries when it writes a user. Each
+    invalidation bumps a version so a lookup that started before the write
+    cannot store what it read.
+    """
+
+    def __init__(self, max_size: int = USER_CACHE_SIZE):
+        self.max_size = max_size
+        self.version = 0
+        self.entries: "OrderedDict[str, Tuple[float, object]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str) -> Optional[object]:
+        """Returns the cached User, MISSING, or None on a miss."""
+        with self._lock:
+            entry = self.entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                del self.entries[user_id]
+                return None
+            self.entries.move_to_end(user_id)
+            return value
+
+    def put(self, user_id: str, user: Optional[User], version: int):
+        if user is None:
+            value, ttl = MISSING, MISSING_USER_TTL_SECONDS
+        else:
+            value, ttl = user, USER_TTL_SECONDS
+        with self._lock:
+            if version != self.version:
+                return
+            self.entries[user_id] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, user_id: str):
+        with self._lock:
+            self.version += 1
+            self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self.version += 1
+            self.entries.clear()
+
+
+user_profile_cache = UserProfileCache()
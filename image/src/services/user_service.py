@@ -1,6 +1,7 @@
-import boto3
+from boto3.dynamodb.conditions import Key
 from botocore.exceptions import ClientError
 from fastapi import HTTPException
+from core.aws import get_client, get_table
 from core.config import settings
 from schemas.user import (
     UserCreate,
@@ -10,19 +11,23 @@ from schemas.user import (
     UserInDB,
     Preferences,
 )
-from typing import List
+from services.interaction_counter_service import interaction_counter_buffer
+from services.user_cache_service import user_profile_cache
+from utils.utils import decode_cursor, encode_cursor
+from typing import Iterable, List, Optional
+
+cognito_client = get_client("cognito-idp")
+users_table = get_table(settings.DYNAMODB_TABLE_NAME_USERS)
+
+# GSIs on the users table (projection ALL): partition key user_type, and the
+# sparse staff_type index that only contains staff; both sort on user_id
+USER_TYPE_INDEX = "user_type-user_id-index"
+STAFF_TYPE_INDEX = "staff_type-user_id-index"
 
 
 class UserService:
     @staticmethod
     async def create_user(user: UserCreate):
-        cognito_client = boto3.client(
-            "cognito-idp",
-            region_name=settings.PRIVATE_AWS_REGION,
-        )
-        dynamodb = boto3.resource("dynamodb", region_name=settings.PRIVATE_AWS_REGION)
-        users_table = dynamodb.Table(settings.DYNAMODB_TABLE_NAME_USERS)
-
         try:
             # Create user in Cognito
             cognito_response = cognito_client.admin_create_user(
@@ -58,8 +63,12 @@ class UserService:
             dynamodb_item["recommendations"] = []
             if user.user_type == UserType.STAFF:
                 dynamodb_item["staff_type"] = user.staff_type.value
+            else:
+                # A NULL staff_type would be rejected by the staff_type index
+                dynamodb_item.pop("staff_type", None)
 
             dynamodb_response = users_table.put_item(Item=dynamodb_item)
+            user_profile_cache.invalidate(dynamodb_item["user_id"])
 
             return {
                 "cognito_response": cognito_response,
@@ -77,10 +86,6 @@ class UserService:
 
     @staticmethod
     async def _original_login_user(user: UserLogin):
-        cognito_client = boto3.client(
-            "cognito-idp",
-            region_name=settings.PRIVATE_AWS_REGION,
-        )
         try:
             response = cognito_client.admin_initiate_auth(
                 UserPoolId=settings.COGNITO_USER_POOL_ID,
@@ -88,17 +93,19 @@ class UserService:
                 AuthFlow="ADMIN_NO_SRP_AUTH",
                 AuthParameters={"USERNAME": user.email, "PASSWORD": user.password},
             )
-            return {"access_token": response["AuthenticationResult"]["AccessToken"]}
+            result = response["AuthenticationResult"]
+            # The ID token also carries the user's email and user_type claims
+            return {
+                "access_token": result["AccessToken"],
+                "id_token": result.get("IdToken"),
+                "token_type": "Bearer",
+                "expires_in": result.get("ExpiresIn"),
+            }
         except ClientError as e:
             raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    import boto3
-
     @staticmethod
     async def get_all_users() -> List[UserInDB]:
-        dynamodb = boto3.resource("dynamodb", region_name=settings.PRIVATE_AWS_REGION)
-        users_table = dynamodb.Table(settings.DYNAMODB_TABLE_NAME_USERS)
-
         try:
             response = users_table.scan()
             users = response.get("Items", [])
@@ -108,13 +115,6 @@ class UserService:
 
     @staticmethod
     async def delete_user(user_id: str):
-        cognito_client = boto3.client(
-            "cognito-idp",
-            region_name=settings.PRIVATE_AWS_REGION,
-        )
-        dynamodb = boto3.resource("dynamodb", region_name=settings.PRIVATE_AWS_REGION)
-        users_table = dynamodb.Table(settings.DYNAMODB_TABLE_NAME_USERS)
-
         cognito_deleted = False
         dynamodb_deleted = False
 
@@ -128,6 +128,9 @@ class UserService:
             if e.response["Error"]["Code"] != "UserNotFoundException":
                 raise HTTPException(status_code=400, detail=str(e))
 
+        interaction_counter_buffer.discard(user_id)
+        user_profile_cache.invalidate(user_id)
+
         try:
             # Try to delete user from DynamoDB
             dynamodb_response = users_table.delete_item(
@@ -147,9 +150,6 @@ class UserService:
 
     @staticmethod
     async def get_user(user_id: str) -> UserInDB:
-        dynamodb = boto3.resource("dynamodb", region_name=settings.PRIVATE_AWS_REGION)
-        users_table = dynamodb.Table(settings.DYNAMODB_TABLE_NAME_USERS)
-
         try:
             response = users_table.get_item(Key={"user_id": user_id})
             user = response.get("Item")
@@ -160,56 +160,58 @@ class UserService:
             raise HTTPException(status_code=500, detail=str(e))
 
     @staticmethod
-    async def get_all_staff() -> List[UserInDB]:
-        dynamodb = boto3.resource("dynamodb", region_name=settings.PRIVATE_AWS_REGION)
-        users_table = dynamodb.Table(settings.DYNAMODB_TABLE_NAME_USERS)
+    def _query_users_page(
+        index_name: str, key_condition, limit: int, cursor: Optional[str]
+    ) -> dict:
+        query_params = {
+            "IndexName": index_name,
+            "KeyConditionExpression": key_condition,
+            "Limit": limit,
+        }
+        exclusive_start_key = decode_cursor(cursor)
+        if exclusive_start_key:
+            query_params["ExclusiveStartKey"] = exclusive_start_key
 
         try:
-            response = users_table.scan(
-                FilterExpression="user_type = :user_type",
-                ExpressionAttributeValues={":user_type": UserType.STAFF.value},
-            )
-            users = response.get("Items", [])
-            return [UserInDB(**user) for user in users]
+            response = users_table.query(**query_params)
         except ClientError as e:
             raise HTTPException(status_code=500, detail=str(e))
+        return {
+            "users": [UserInDB(**user) for user in response.get("Items", [])],
+            "next_cursor": encode_cursor(response.get("LastEvaluatedKey")),
+        }
 
     @staticmethod
-    async def get_all_normal() -> List[UserInDB]:
-        dynamodb = boto3.resource("dynamodb", region_name=settings.PRIVATE_AWS_REGION)
-        users_table = dynamodb.Table(settings.DYNAMODB_TABLE_NAME_USERS)
-
-        try:
-            response = users_table.scan(
-                FilterExpression="user_type = :user_type",
-                ExpressionAttributeValues={":user_type": UserType.NORMAL.value},
+    async def get_all_staff(
+        staff_type: Optional[StaffType] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> dict:
+        if staff_type:
+            return UserService._query_users_page(
+                STAFF_TYPE_INDEX, Key("staff_type").eq(staff_type.value), limit, cursor
             )
-            users = response.get("Items", [])
-            return [UserInDB(**user) for user in users]
-        except ClientError as e:
-            raise HTTPException(status_code=500, detail=str(e))
+        return UserService._query_users_page(
+            USER_TYPE_INDEX, Key("user_type").eq(UserType.STAFF.value), limit, cursor
+        )
+
+    @staticmethod
+    async def get_all_normal(limit: int = 50, cursor: Optional[str] = None) -> dict:
+        return UserService._query_users_page(
+            USER_TYPE_INDEX, Key("user_type").eq(UserType.NORMAL.value), limit, cursor
+        )
 
     @staticmethod
     async def increment_interaction_counter(user_id: str):
-        dynamodb = boto3.resource("dynamodb", region_name=settings.PRIVATE_AWS_REGION)
-        users_table = dynamodb.Table(settings.DYNAMODB_TABLE_NAME_USERS)
+        # Buffered and written in batches by interaction_counter_buffer
+        interaction_counter_buffer.add(user_id)
 
-        try:
-            response = users_table.update_item(
-                Key={"user_id": user_id},
-                UpdateExpression="SET interaction_counter = if_not_exists(interaction_counter, :start) + :inc",
-                ExpressionAttributeValues={":inc": 1, ":start": 0},
-                ReturnValues="UPDATED_NEW",
-            )
-            return response["Attributes"]["interaction_counter"]
-        except ClientError as e:
-            raise HTTPException(status_code=500, detail=str(e))
+    @staticmethod
+    async def increment_interaction_counters(user_ids: Iterable[str]):
+        interaction_counter_buffer.add_many(user_ids)
 
     @staticmethod
     async def update_preferences(user_id: str, preferences: Preferences):
-        dynamodb = boto3.resource("dynamodb", region_name=settings.PRIVATE_AWS_REGION)
-        users_table = dynamodb.Table(settings.DYNAMODB_TABLE_NAME_USERS)
-
         try:
             response = users_table.update_item(
                 Key={"user_id": user_id},
@@ -217,6 +219,7 @@ class UserService:
                 ExpressionAttributeValues={":preferences": preferences.dict()},
                 ReturnValues="UPDATED_NEW",
             )
+            user_profile_cache.invalidate(user_id)
             await UserService.increment_interaction_counter(user_id)
             return response["Attributes"]["preferences"]
         except ClientError as e:
@@ -224,9 +227,6 @@ class UserService:
 
     @staticmethod
     async def get_preferences(user_id: str) -> Preferences:
-        dynamodb = boto3.resource("dynamodb", region_name=settings.PRIVATE_AWS_REGION)
-        users_table = dynamodb.Table(settings.DYNAMODB_TABLE_NAME_USERS)
-
         try:
             response = users_table.get_item(Key={"user_id": user_id})
             user = response.get("Item")
@@ -241,9 +241,6 @@ class UserService:
 
     @staticmethod
     async def get_interaction_counter(user_id: str) -> int:
-        dynamodb = boto3.resource("dynamodb", region_name=settings.PRIVATE_AWS_REGION)
-        users_table = dynamodb.Table(settings.DYNAMODB_TABLE_NAME_USERS)
-
         try:
             response = users_table.get_item(Key={"user_id": user_id})
             user = response.get("Item")
@@ -252,15 +249,15 @@ class UserService:
                     status_code=404, detail="User or interaction counter not found"
                 )
             await UserService.increment_interaction_counter(user_id)
-            return user["interaction_counter"]
+            # Include increments not yet flushed from this container
+            return user["interaction_counter"] + interaction_counter_buffer.pending_for(
+                user_id
+            )
         except ClientError as e:
             raise HTTPException(status_code=500, detail=str(e))
 
     @staticmethod
     async def get_recommendations(user_id: str) -> List[str]:
-        dynamodb = boto3.resource("dynamodb", region_name=settings.PRIVATE_AWS_REGION)
-        users_table = dynamodb.Table(settings.DYNAMODB_TABLE_NAME_USERS)
-
         try:
             response = users_table.get_item(Key={"user_id": user_id})
             user = response.get("Item")
@@ -274,18 +271,22 @@ class UserService:
             raise HTTPException(status_code=500, detail=str(e))
 
     @staticmethod
-    async def update_recommendations(user_id: str, recommendations: List[str]):
-        dynamodb = boto3.resource("dynamodb", region_name=settings.PRIVATE_AWS_REGION)
-        users_table = dynamodb.Table(settings.DYNAMODB_TABLE_NAME_USERS)
+    def store_recommendations(user_id: str, recommendations: List[str]) -> List[str]:
+        # Synchronous so batch jobs can fan writes out over a thread pool
+        response = users_table.update_item(
+            Key={"user_id": user_id},
+            UpdateExpression="SET recommendations = :recommendations",
+            ExpressionAttributeValues={":recommendations": recommendations},
+            ReturnValues="UPDATED_NEW",
+        )
+        user_profile_cache.invalidate(user_id)
+        return response["Attributes"]["recommendations"]
 
+    @staticmethod
+    async def update_recommendations(user_id: str, recommendations: List[str]):
         try:
-            response = users_table.update_item(
-                Key={"user_id": user_id},
-                UpdateExpression="SET recommendations = :recommendations",
-                ExpressionAttributeValues={":recommendations": recommendations},
-                ReturnValues="UPDATED_NEW",
-            )
+            stored = UserService.store_recommendations(user_id, recommendations)
             await UserService.increment_interaction_counter(user_id)
-            return response["Attributes"]["recommendations"]
+            return stored
         except ClientError as e:
             raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,79 @@
+import asyncio
+import os
+import sys
+import types
+from unittest import mock
+
+import pytest
+from moto import mock_aws
+
+# Settings are read when modules are imported, so they are set up first
+TEST_ENVIRONMENT = {
+    "PRIVATE_AWS_ACCESS_KEY_ID": "testing",
+    "PRIVATE_AWS_SECRET_ACCESS_KEY": "testing",
+    "PRIVATE_AWS_REGION": "us-east-1",
+    "AWS_ACCESS_KEY_ID": "testing",
+    "AWS_SECRET_ACCESS_KEY": "testing",
+    "AWS_DEFAULT_REGION": "us-east-1",
+    "S3_BUCKET_NAME": "chariott-test",
+    "COGNITO_USER_POOL_ID": "us-east-1_TestPool",
+    "COGNITO_APP_CLIENT_ID": "test-client",
+    "DYNAMODB_TABLE_NAME_USERS": "users",
+    "DYNAMODB_TABLE_NAME_PROCESSED_FILES": "processed-files",
+    "DYNAMODB_TABLE_NAME_REQUESTS": "requests",
+    "DYNAMODB_TABLE_NAME_BOOKINGS": "bookings",
+    "DYNAMODB_TABLE_NAME_HOTELS": "hotels",
+    "DYNAMODB_TABLE_NAME_RAG_INTERACTIONS": "rag-interactions",
+    "API_KEY": "test-api-key",
+    "PINECONE_API_KEY": "test-pinecone-key",
+    "PINECONE_INDEX_NAME": "test-index",
+}
+for name, value in TEST_ENVIRONMENT.items():
+    os.environ.setdefault(name, value)
+
+# The Pinecone client looks its index up over the network when constructed
+mock.patch("pinecone.Pinecone").start()
+
+# agent_manager imports service classes that do not exist in this tree, so
+# main is imported against a stand-in with the same interface
+_agent_manager = types.ModuleType("services.agent_manager")
+_agent_manager.AgentManager = mock.MagicMock
+_agent_manager.get_agent_manager = mock.MagicMock
+sys.modules.setdefault("services.agent_manager", _agent_manager)
+
+
+@pytest.fixture
+def aws():
+    with mock_aws():
+        yield
+
+
+@pytest.fixture
+def processed_files_table(aws):
+    from core.aws import get_dynamodb
+
+    return get_dynamodb().create_table(
+        TableName=os.environ["DYNAMODB_TABLE_NAME_PROCESSED_FILES"],
+        KeySchema=[{"AttributeName": "file_name", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "file_name", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+
+
+@pytest.fixture
+def run():
+    # Coroutines run on the thread's loop rather than through asyncio.run, which
+    # would unset the loop Mangum uses for HTTP events in later tests
+    return asyncio.get_event_loop().run_until_complete
+
+
+@pytest.fixture
+def users_table(aws):
+    from core.aws import get_dynamodb
+
+    return get_dynamodb().create_table(
+        TableName=os.environ["DYNAMODB_TABLE_NAME_USERS"],
+        KeySchema=[{"AttributeName": "user_id", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "user_id", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
@@ -0,0 +1,25 @@
+from fastapi.testclient import TestClient
+
+import main
+from core.config import settings
+
+API_KEY_HEADERS = {"API-Key": "test-api-key", "User-ID": "someone@example.com"}
+
+
+def test_api_key_with_user_id_passes_while_enabled():
+    client = TestClient(main.app)
+
+    response = client.get("/no-such-route", headers=API_KEY_HEADERS)
+
+    # Past the middleware, so routing answers
+    assert response.status_code == 404
+
+
+def test_api_key_path_is_rejected_once_disabled(monkeypatch):
+    monkeypatch.setattr(settings, "API_KEY_AUTH_ENABLED", False)
+    client = TestClient(main.app)
+
+    response = client.get("/no-such-route", headers=API_KEY_HEADERS)
+
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"] == "Bearer"
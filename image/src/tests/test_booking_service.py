@@ -0,0 +1,169 @@
+import os
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from core.aws import get_dynamodb
+from schemas.booking import BookingCreate, BookingUpdate
+from services import availability_service, booking_service
+from services.availability_service import HOTEL_END_DATE_INDEX
+from services.booking_service import BookingService
+from services.room_lock_service import table as locks_table
+from utils.utils import est_tz
+
+
+def _table(table_name, keys, indexes=()):
+    attributes = {name for name, _ in keys}
+    for _, index_keys in indexes:
+        attributes.update(name for name, _ in index_keys)
+    definition = {
+        "TableName": table_name,
+        "KeySchema": [{"AttributeName": n, "KeyType": t} for n, t in keys],
+        "AttributeDefinitions": [
+            {"AttributeName": n, "AttributeType": "N" if n.endswith("_ts") else "S"}
+            for n in attributes
+        ],
+        "BillingMode": "PAY_PER_REQUEST",
+    }
+    if indexes:
+        definition["GlobalSecondaryIndexes"] = [
+            {
+                "IndexName": index_name,
+                "KeySchema": [{"AttributeName": n, "KeyType": t} for n, t in keys],
+                "Projection": {"ProjectionType": "ALL"},
+            }
+            for index_name, keys in indexes
+        ]
+    return get_dynamodb().create_table(**definition)
+
+
+@pytest.fixture
+def booking_tables(aws, monkeypatch):
+    monkeypatch.setattr(availability_service, "_hotel_indexes", {})
+    _table(
+        os.environ["DYNAMODB_TABLE_NAME_BOOKINGS"],
+        [("booking_id", "HASH")],
+        [(HOTEL_END_DATE_INDEX, [("hotel_id", "HASH"), ("end_ts", "RANGE")])],
+    )
+    _table("chariott-occupancy", [("hotel_id", "HASH"), ("night", "RANGE")])
+    _table("chariott-room-locks", [("lock_id", "HASH")])
+
+
+def _booking(start, end, room="101"):
+    return BookingCreate(
+        user_id="guest@example.com",
+        hotel_id="hotel-1",
+        room_number=room,
+        start_date=f"{start}T15:00:00-05:00",
+        end_date=f"{end}T11:00:00-05:00",
+        hotel_name="Chariott",
+        room_info={"beds": 1, "bathrooms": 1, "size": "king"},
+    )
+
+
+def _locks():
+    return {
+        item["lock_id"]: item["booking_id"] for item in locks_table.scan()["Items"]
+    }
+
+
+def test_locks_reject_double_booking_behind_stale_index(booking_tables, run):
+    first = run(BookingService.create_booking(_booking("2030-01-10", "2030-01-13")))
+    assert _locks() == {
+        f"hotel-1#101#2030-01-{day}": first["booking_id"] for day in (10, 11, 12)
+    }
+
+    # Another container's index has not seen the first booking yet
+    availability_service.AvailabilityService.forget_booking(
+        "hotel-1", first["booking_id"]
+    )
+    with pytest.raises(HTTPException) as error:
+        run(BookingService.create_booking(_booking("2030-01-12", "2030-01-14")))
+    assert error.value.status_code == 409
+    assert len(_locks()) == 3
+
+
+def test_update_and_delete_move_and_free_locks(booking_tables, run):
+    booking = run(BookingService.create_booking(_booking("2030-01-10", "2030-01-12")))
+    booking_id = booking["booking_id"]
+
+    run(
+        BookingService.update_booking(
+            booking_id, BookingUpdate(end_date="2030-01-14T11:00:00-05:00")
+        )
+    )
+    assert sorted(_locks()) == [
+        f"hotel-1#101#2030-01-{day}" for day in (10, 11, 12, 13)
+    ]
+
+    run(BookingService.delete_booking(booking_id))
+    assert _locks() == {}
+    # The freed nights can be booked again
+    run(BookingService.create_booking(_booking("2030-01-10", "2030-01-14")))
+
+
+def test_import_rejects_long_stay_row_and_keeps_the_rest(booking_tables, run):
+    rows = [
+        _booking("2030-02-01", "2030-02-03").dict(),
+        _booking("2030-03-01", "2030-07-01", room="102").dict(),
+        _booking("2030-02-05", "2030-02-06", room="103").dict(),
+    ]
+
+    report = run(BookingService.import_bookings(rows))
+
+    assert [result["status"] for result in report["results"]] == [
+        "created",
+        "rejected",
+        "created",
+    ]
+    assert "at most 99 nights" in report["results"][1]["error"]
+    occupancy = get_dynamodb().Table("chariott-occupancy").scan()["Items"]
+    assert sorted(item["night"] for item in occupancy) == [
+        "2030-02-01",
+        "2030-02-02",
+        "2030-02-05",
+    ]
+    # The rejected row never reached the availability index
+    index = availability_service._hotel_indexes["hotel-1"]
+    assert {room for room, _ in index.bookings.values()} == {"101", "103"}
+
+
+def test_import_caps_rows_per_request(monkeypatch, run):
+    monkeypatch.setattr(booking_service, "BULK_IMPORT_MAX_ROWS", 2)
+    with pytest.raises(HTTPException) as error:
+        run(BookingService.import_bookings([{}, {}, {}]))
+    assert error.value.status_code == 413
+
+
+def test_manifest_cache_expires_after_ttl_and_at_midnight(monkeypatch, run):
+    calls = []
+
+    async def daily_manifest(hotel_id, day):
+        calls.append(day)
+        return {"day": day}
+
+    clock = [datetime(2030, 1, 10, 12, 0)]
+    monkeypatch.setattr(BookingService, "get_daily_manifest", daily_manifest)
+    monkeypatch.setattr(
+        booking_service, "get_current_est_time", lambda: est_tz.localize(clock[0])
+    )
+    monkeypatch.setattr(booking_service, "_manifest_cache", {})
+    ttl = booking_service.MANIFEST_CACHE_TTL_SECONDS
+
+    run(BookingService.get_hotel_manifest("hotel-1"))
+    clock[0] += timedelta(seconds=ttl - 1)
+    run(BookingService.get_hotel_manifest("hotel-1"))
+    assert len(calls) == 2
+
+    clock[0] += timedelta(seconds=1)
+    run(BookingService.get_hotel_manifest("hotel-1"))
+    assert len(calls) == 4
+
+    # Close to midnight the entry expires with the day, not after the full TTL
+    clock[0] = datetime(2030, 1, 10, 23, 59, 59)
+    run(BookingService.get_hotel_manifest("hotel-1"))
+    clock[0] += timedelta(seconds=1)
+    manifest = run(BookingService.get_hotel_manifest("hotel-1"))
+    assert len(calls) == 8
+    assert manifest["today"]["day"] == date(2030, 1, 11)
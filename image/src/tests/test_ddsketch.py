@@ -0,0 +1,58 @@
+import math
+import random
+
+import pytest
+
+from utils.ddsketch import DDSketch
+
+QUANTILES = (0.0, 0.1, 0.5, 0.9, 0.99, 1.0)
+
+
+def _exact(values, q):
+    # The sketch reports the value at rank q * (n - 1), rounded down
+    ordered = sorted(values)
+    return ordered[math.floor(q * (len(ordered) - 1))]
+
+
+@pytest.mark.parametrize("accuracy", [0.01, 0.05])
+def test_quantiles_stay_within_relative_accuracy(accuracy):
+    rng = random.Random(3)
+    values = [rng.lognormvariate(4, 1.5) for _ in range(5000)]
+    sketch = DDSketch(accuracy)
+    for value in values:
+        sketch.add(value)
+
+    for q in QUANTILES:
+        exact = _exact(values, q)
+        assert abs(sketch.quantile(q) - exact) <= accuracy * exact
+
+
+def test_merged_sketches_match_a_single_sketch():
+    rng = random.Random(5)
+    values = [rng.expovariate(1 / 600) for _ in range(2000)]
+    whole, left, right = DDSketch(), DDSketch(), DDSketch()
+    for position, value in enumerate(values):
+        whole.add(value)
+        (left if position % 2 else right).add(value)
+
+    left.merge(right)
+
+    assert left.bins == whole.bins
+    assert left.count == whole.count
+    assert left.quantiles(QUANTILES) == whole.quantiles(QUANTILES)
+
+
+def test_tiny_values_fall_in_the_zero_bucket():
+    sketch = DDSketch()
+    for value in (0, 0.0005, 0, 120):
+        sketch.add(value)
+
+    assert sketch.zero_count == 3
+    assert sketch.quantile(0.5) == 0.0
+    assert sketch.quantile(1.0) == pytest.approx(120, rel=0.01)
+    assert DDSketch().quantile(0.5) is None
+
+
+def test_merge_rejects_different_accuracy():
+    with pytest.raises(ValueError):
+        DDSketch(0.01).merge(DDSketch(0.02))
@@ -0,0 +1,82 @@
+import pytest
+from fastapi import HTTPException
+
+from core import aws
+from core.aws import BATCH_GET_MAX_ATTEMPTS
+from schemas.request import Department
+from schemas.user import LoyaltyProgram
+from services import dispatch_service
+from services.dispatch_service import DispatchService
+
+
+class ThrottledDynamoDB:
+    """Returns every key as unprocessed for the first `throttled` calls."""
+
+    def __init__(self, throttled: int):
+        self.throttled = throttled
+        self.calls = 0
+
+    def batch_get_item(self, RequestItems):
+        self.calls += 1
+        if self.calls <= self.throttled:
+            return {"UnprocessedKeys": RequestItems}
+        [(table, request)] = RequestItems.items()
+        users = [{**key, "loyalty_program": "gold"} for key in request["Keys"]]
+        return {"Responses": {table: users}}
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(aws.asyncio, "sleep", sleep)
+    return delays
+
+
+def test_retries_unprocessed_keys_with_backoff(monkeypatch, no_sleep, run):
+    fake = ThrottledDynamoDB(throttled=2)
+    monkeypatch.setattr(dispatch_service, "dynamodb", fake)
+
+    loyalty = run(DispatchService._get_loyalty(["a", "b", "a"]))
+
+    assert loyalty == {"a": LoyaltyProgram.GOLD, "b": LoyaltyProgram.GOLD}
+    assert fake.calls == 3
+    assert len(no_sleep) == 2
+
+
+def test_gives_up_with_503(monkeypatch, no_sleep, run):
+    fake = ThrottledDynamoDB(throttled=BATCH_GET_MAX_ATTEMPTS)
+    monkeypatch.setattr(dispatch_service, "dynamodb", fake)
+
+    with pytest.raises(HTTPException) as error:
+        run(DispatchService._get_loyalty(["a"]))
+    assert error.value.status_code == 503
+    assert fake.calls == BATCH_GET_MAX_ATTEMPTS
+
+
+def test_enqueue_reuses_tiers_from_the_loaded_queue(monkeypatch, no_sleep, run):
+    fake = ThrottledDynamoDB(throttled=0)
+    monkeypatch.setattr(dispatch_service, "dynamodb", fake)
+    monkeypatch.setattr(dispatch_service, "_queues", {})
+    pending = [
+        {
+            "request_id": "r1",
+            "user_id": "a",
+            "department": "reception",
+            "time_issued": "2030-01-01T10:00:00-05:00",
+        }
+    ]
+    run(DispatchService.get_queue("hotel-1", Department.RECEPTION, lambda *_: pending))
+    assert fake.calls == 1
+
+    request = {**pending[0], "hotel_id": "hotel-1"}
+    run(DispatchService.enqueue({**request, "request_id": "r2"}))
+    run(DispatchService.enqueue({**request, "request_id": "r3", "user_id": "b"}))
+
+    assert fake.calls == 2
+    queue = dispatch_service._queues[("hotel-1", "reception")]
+    assert queue.loyalty == {"a": LoyaltyProgram.GOLD, "b": LoyaltyProgram.GOLD}
+    assert len(queue) == 3
@@ -0,0 +1,48 @@
+import io
+
+import pytest
+from fpdf import FPDF
+
+from services import document_processor
+
+
+def _pdf(pages: int) -> io.BytesIO:
+    pdf = FPDF()
+    pdf.set_font("Helvetica", size=10)
+    for number in range(pages):
+        pdf.add_page()
+        pdf.multi_cell(0, 5, f"Page {number}. " + "Guest services and amenities. " * 60)
+    return io.BytesIO(bytes(pdf.output()))
+
+
+@pytest.fixture
+def indexed(monkeypatch):
+    batches = []
+
+    async def index_batch(document_id, s3_url, user_id, texts, start_index):
+        batches.append((start_index, list(texts)))
+
+    monkeypatch.setattr(document_processor, "_index_batch", index_batch)
+    return batches
+
+
+def _ingest(run, pdf_file, start_chunk=0):
+    return run(
+        document_processor.ingest_document(
+            pdf_file, "doc-1", "s3://doc-1", "guest", start_chunk=start_chunk
+        )
+    )
+
+
+def test_resume_indexes_only_remaining_chunks(run, indexed):
+    total = _ingest(run, _pdf(24))
+    chunks = [text for _, batch in indexed for text in batch]
+    assert total == len(chunks) > document_processor.EMBED_BATCH_SIZE
+    assert [start for start, _ in indexed] == list(
+        range(0, total, document_processor.EMBED_BATCH_SIZE)
+    )
+
+    indexed.clear()
+    assert _ingest(run, _pdf(24), start_chunk=60) == total
+    assert indexed[0][0] == 60
+    assert [text for _, batch in indexed for text in batch] == chunks[60:]
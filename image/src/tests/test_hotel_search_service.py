@@ -0,0 +1,125 @@
+import random
+
+import pytest
+
+from schemas.hotel import Amenities, Hotel, Location
+from services.hotel_search_service import HotelSearchIndex
+
+CITIES = [("Austin", "TX"), ("Dallas", "TX"), ("Denver", "CO")]
+
+
+def _hotel(hotel_id, city="Austin", state="TX", eco_rating=5, amenities=()):
+    return Hotel(
+        hotel_id=hotel_id,
+        name=f"Hotel {hotel_id}",
+        eco_rating=eco_rating,
+        location=Location(city=city, state=state, country="US"),
+        amenities=Amenities(
+            **{name: name in amenities for name in Amenities.model_fields}
+        ),
+    )
+
+
+def _catalog(count=200, seed=7):
+    rng = random.Random(seed)
+    hotels = []
+    for n in range(count):
+        city, state = rng.choice(CITIES)
+        amenities = [name for name in Amenities.model_fields if rng.random() < 0.5]
+        hotels.append(
+            _hotel(f"h{n:03}", city, state, rng.randint(0, 10), amenities)
+        )
+    return hotels
+
+
+def _brute_force(hotels, city=None, state=None, amenities=(), low=0, high=10):
+    matches = [
+        hotel
+        for hotel in hotels
+        if (city is None or hotel.location.city.lower() == city.lower())
+        and (state is None or hotel.location.state.lower() == state.lower())
+        and all(getattr(hotel.amenities, name) for name in amenities)
+        and low <= hotel.eco_rating <= high
+    ]
+    matches.sort(key=lambda hotel: (hotel.eco_rating, hotel.hotel_id), reverse=True)
+    return [hotel.hotel_id for hotel in matches]
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {},
+        {"city": "austin"},
+        {"state": "TX", "amenities": ["bar", "parking"]},
+        {"city": "Denver", "low": 4, "high": 7},
+        {"state": "tx", "city": "Dallas", "amenities": ["breakfast"], "low": 8},
+        {"city": "Denver", "state": "TX"},
+    ],
+)
+def test_combined_filters_match_brute_force(filters):
+    hotels = _catalog()
+    index = HotelSearchIndex()
+    index.rebuild(hotels)
+
+    results, total = index.search(
+        city=filters.get("city"),
+        state=filters.get("state"),
+        amenities=filters.get("amenities", ()),
+        min_eco_rating=filters.get("low", 0),
+        max_eco_rating=filters.get("high", 10),
+        limit=len(hotels),
+    )
+
+    expected = _brute_force(hotels, **filters)
+    assert [hotel.hotel_id for hotel in results] == expected
+    assert total == len(expected)
+
+
+def test_pages_cover_every_match_and_report_the_full_total():
+    hotels = _catalog()
+    index = HotelSearchIndex()
+    index.rebuild(hotels)
+    expected = _brute_force(hotels, state="TX", amenities=["bar"])
+
+    seen = []
+    for offset in range(0, len(expected) + 10, 10):
+        page, total = index.search(
+            state="TX", amenities=["bar"], offset=offset, limit=10
+        )
+        assert total == len(expected)
+        seen.extend(hotel.hotel_id for hotel in page)
+
+    assert seen == expected
+
+
+def test_upsert_and_remove_keep_eco_entries_sorted():
+    hotels = _catalog(count=50)
+    index = HotelSearchIndex()
+    index.rebuild(hotels)
+    rng = random.Random(11)
+
+    for n in range(100):
+        hotel_id = f"h{rng.randrange(60):03}"
+        if rng.random() < 0.3:
+            index.remove(hotel_id)
+        else:
+            city, state = rng.choice(CITIES)
+            index.upsert(_hotel(hotel_id, city, state, rng.randint(0, 10)))
+
+        assert index.eco_entries == sorted(index.eco_entries)
+        assert index.eco_entries == sorted(
+            (hotel.eco_rating, hotel_id) for hotel_id, hotel in index.hotels.items()
+        )
+
+
+def test_upsert_moves_hotel_between_facets():
+    index = HotelSearchIndex()
+    index.rebuild([_hotel("a", "Austin", "TX", 3)])
+
+    index.upsert(_hotel("a", "Denver", "CO", 9))
+
+    assert index.search(city="Austin") == ([], 0)
+    results, total = index.search(city="Denver", min_eco_rating=9)
+    assert [hotel.hotel_id for hotel in results] == ["a"]
+    assert total == 1
+    assert "austin" not in index.locations["city"]
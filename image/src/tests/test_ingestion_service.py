@@ -0,0 +1,80 @@
+from datetime import timedelta
+
+import pytest
+
+from services import ingestion_service
+from services.dynamodb_service import get_document_by_id
+from utils.utils import get_current_est_time
+
+S3_URL = "https://chariott-test.s3.amazonaws.com/chain/doc-1.pdf"
+
+
+@pytest.fixture
+def ingested(monkeypatch):
+    calls = []
+
+    async def open_document(s3_url):
+        return None
+
+    async def ingest_document(pdf_file, document_id, s3_url, user_id, **kwargs):
+        calls.append(kwargs["start_chunk"])
+        return 120
+
+    monkeypatch.setattr(ingestion_service, "open_document", open_document)
+    monkeypatch.setattr(ingestion_service, "ingest_document", ingest_document)
+    return calls
+
+
+def _job(start_chunk=0):
+    return {
+        "document_id": "doc-1",
+        "s3_url": S3_URL,
+        "user_id": "guest@example.com",
+        "attempt": 1,
+        "start_chunk": start_chunk,
+    }
+
+
+def test_redelivery_resumes_from_persisted_progress(
+    processed_files_table, ingested, run
+):
+    processed_files_table.put_item(
+        Item={
+            "file_name": "doc-1",
+            "status": "processing",
+            "s3_url": S3_URL,
+            "user_id": "guest@example.com",
+            "chunks_indexed": 100,
+        }
+    )
+
+    assert run(ingestion_service.run_ingestion_job(_job()))
+    assert ingested == [100]
+    document = run(get_document_by_id("doc-1"))
+    assert document["status"] == "completed"
+    assert document["chunk_count"] == 120
+
+
+def test_redelivery_of_completed_job_is_skipped(
+    processed_files_table, ingested, run
+):
+    processed_files_table.put_item(
+        Item={"file_name": "doc-1", "status": "completed", "s3_url": S3_URL}
+    )
+
+    assert run(ingestion_service.run_ingestion_job(_job()))
+    assert ingested == []
+
+
+def test_is_stale():
+    now = get_current_est_time()
+    stale = now - timedelta(seconds=ingestion_service.HEARTBEAT_STALE_SECONDS + 1)
+    assert ingestion_service.is_stale(
+        {"status": "processing", "updated_at": stale.isoformat()}
+    )
+    assert not ingestion_service.is_stale(
+        {"status": "processing", "updated_at": now.isoformat()}
+    )
+    assert not ingestion_service.is_stale(
+        {"status": "failed", "updated_at": stale.isoformat()}
+    )
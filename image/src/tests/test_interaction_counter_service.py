@@ -0,0 +1,65 @@
+import time
+
+import pytest
+from botocore.exceptions import ClientError
+
+from services import interaction_counter_service
+from services.interaction_counter_service import InteractionCounterBuffer
+
+
+def _counter(users_table, user_id):
+    item = users_table.get_item(Key={"user_id": user_id}).get("Item", {})
+    return item.get("interaction_counter")
+
+
+def test_flush_adds_pending_increments(users_table):
+    buffer = InteractionCounterBuffer()
+    users_table.put_item(Item={"user_id": "a", "interaction_counter": 5})
+    buffer.add("a")
+    buffer.add_many(["a", "b"])
+
+    buffer.flush()
+
+    assert _counter(users_table, "a") == 7
+    assert _counter(users_table, "b") == 1
+    assert not buffer.pending
+
+
+@pytest.mark.parametrize(
+    "code, requeued",
+    [("ProvisionedThroughputExceededException", True), ("ValidationException", False)],
+)
+def test_only_retryable_failures_are_requeued(users_table, monkeypatch, code, requeued):
+    write_increment = interaction_counter_service._write_increment
+
+    def failing_write(user_id, count):
+        if user_id == "bad":
+            raise ClientError({"Error": {"Code": code}}, "UpdateItem")
+        write_increment(user_id, count)
+
+    monkeypatch.setattr(interaction_counter_service, "_write_increment", failing_write)
+    buffer = InteractionCounterBuffer()
+    buffer.add_many(["good", "bad", "bad"])
+
+    buffer.flush()
+
+    assert _counter(users_table, "good") == 1
+    assert buffer.pending_for("bad") == (2 if requeued else 0)
+    assert buffer.pending_for("good") == 0
+    # Keep the buffer's timer from retrying after moto is torn down
+    buffer.discard("bad")
+
+
+def test_threshold_flush_runs_off_the_request(users_table, monkeypatch):
+    monkeypatch.setattr(interaction_counter_service, "FLUSH_THRESHOLD", 2)
+    buffer = InteractionCounterBuffer()
+
+    buffer.add_many(["a", "b"])
+
+    # The caller only records increments; the worker thread writes them
+    deadline = time.monotonic() + 5
+    counters = None
+    while counters != [1, 1] and time.monotonic() < deadline:
+        time.sleep(0.01)
+        counters = [_counter(users_table, user_id) for user_id in ("a", "b")]
+    assert counters == [1, 1]
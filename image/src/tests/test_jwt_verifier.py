@@ -0,0 +1,115 @@
+import json
+import threading
+import time
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from middleware.jwt_verifier import (
+    CognitoJWTVerifier,
+    InvalidTokenError,
+    JWKSUnavailableError,
+)
+
+ISSUER = "https://cognito-idp.us-east-1.amazonaws.com/us-east-1_TestPool"
+CLIENT_ID = "test-client"
+
+
+def _key_pair(kid: str):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update({"kid": kid, "alg": "RS256", "use": "sig"})
+    return private_key, jwk
+
+
+@pytest.fixture(scope="module")
+def signing_key():
+    return _key_pair("key-1")
+
+
+@pytest.fixture
+def fetches(signing_key):
+    calls = []
+
+    def fetch_jwks():
+        calls.append(time.monotonic())
+        return {"keys": [signing_key[1]]}
+
+    fetch_jwks.calls = calls
+    return fetch_jwks
+
+
+def _token(private_key, kid="key-1", **overrides):
+    claims = {
+        "sub": "user-1",
+        "iss": ISSUER,
+        "exp": int(time.time()) + 300,
+        "token_use": "access",
+        "client_id": CLIENT_ID,
+        "username": "guest@example.com",
+        **overrides,
+    }
+    return jwt.encode(claims, private_key, algorithm="RS256", headers={"kid": kid})
+
+
+def test_verifies_access_and_id_tokens(signing_key, fetches):
+    verifier = CognitoJWTVerifier(ISSUER, CLIENT_ID, fetches)
+    private_key = signing_key[0]
+
+    assert verifier.verify(_token(private_key))["username"] == "guest@example.com"
+    id_token = _token(private_key, token_use="id", aud=CLIENT_ID, client_id=None)
+    assert verifier.verify(id_token)["token_use"] == "id"
+    # Keys are fetched once and then served from the cache
+    assert len(fetches.calls) == 1
+
+
+@pytest.mark.parametrize(
+    "overrides, message",
+    [
+        ({"exp": int(time.time()) - 120}, "expired"),
+        ({"iss": "https://issuer.example.com"}, "issuer"),
+        ({"client_id": "other-client"}, "another client"),
+        ({"token_use": "refresh"}, "token_use"),
+    ],
+)
+def test_rejects_invalid_claims(signing_key, fetches, overrides, message):
+    verifier = CognitoJWTVerifier(ISSUER, CLIENT_ID, fetches)
+    with pytest.raises(InvalidTokenError, match=message):
+        verifier.verify(_token(signing_key[0], **overrides))
+
+
+def test_rejects_foreign_signature_and_unknown_kid(signing_key, fetches):
+    verifier = CognitoJWTVerifier(ISSUER, CLIENT_ID, fetches)
+    other_key, _ = _key_pair("key-2")
+
+    with pytest.raises(InvalidTokenError, match="Signature"):
+        verifier.verify(_token(other_key))
+    with pytest.raises(InvalidTokenError, match="Unknown signing key"):
+        verifier.verify(_token(other_key, kid="key-2"))
+    # The unknown kid does not trigger a refetch inside the minimum window
+    assert len(fetches.calls) == 1
+    with pytest.raises(InvalidTokenError):
+        verifier.verify("not-a-jwt")
+
+
+def test_unavailable_jwks(signing_key):
+    def unreachable():
+        raise OSError("connection refused")
+
+    verifier = CognitoJWTVerifier(ISSUER, CLIENT_ID, unreachable)
+    with pytest.raises(JWKSUnavailableError):
+        verifier.verify(_token(signing_key[0]))
+
+
+def test_verify_async_fetches_off_the_event_loop(signing_key, run):
+    fetch_threads = []
+
+    def fetch_jwks():
+        fetch_threads.append(threading.current_thread().name)
+        return {"keys": [signing_key[1]]}
+
+    verifier = CognitoJWTVerifier(ISSUER, CLIENT_ID, fetch_jwks)
+    claims = run(verifier.verify_async(_token(signing_key[0])))
+    assert claims["sub"] == "user-1"
+    assert fetch_threads and fetch_threads[0] != "MainThread"
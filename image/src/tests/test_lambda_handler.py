@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+import main
+from services import ingestion_service
+
+
+def _sqs_event(job: dict) -> dict:
+    return {
+        "Records": [
+            {
+                "messageId": "message-1",
+                "eventSource": "aws:sqs",
+                "body": json.dumps(job),
+            }
+        ]
+    }
+
+
+def _http_event(path: str) -> dict:
+    return {
+        "resource": path,
+        "path": path,
+        "httpMethod": "GET",
+        "headers": {"API-Key": "test-api-key", "Host": "api.example.com"},
+        "multiValueHeaders": {},
+        "queryStringParameters": None,
+        "multiValueQueryStringParameters": None,
+        "pathParameters": None,
+        "requestContext": {
+            "resourcePath": path,
+            "httpMethod": "GET",
+            "path": path,
+            "stage": "prod",
+            "identity": {"sourceIp": "127.0.0.1"},
+        },
+        "body": None,
+        "isBase64Encoded": False,
+    }
+
+
+@pytest.fixture
+def fake_pipeline(monkeypatch):
+    async def open_document(s3_url):
+        return None
+
+    async def ingest_document(pdf_file, document_id, s3_url, user_id, **kwargs):
+        return 3
+
+    monkeypatch.setattr(ingestion_service, "open_document", open_document)
+    monkeypatch.setattr(ingestion_service, "ingest_document", ingest_document)
+
+
+def test_http_event_after_sqs_event(processed_files_table, fake_pipeline):
+    job = {
+        "document_id": "doc-1",
+        "s3_url": "https://chariott-test.s3.amazonaws.com/chain/doc-1.pdf",
+        "user_id": "guest@example.com",
+    }
+
+    result = main.handler(_sqs_event(job), None)
+    assert result == {"batchItemFailures": []}
+    item = processed_files_table.get_item(Key={"file_name": "doc-1"})["Item"]
+    assert item["status"] == "completed"
+    assert item["chunk_count"] == 3
+
+    # The same container then serves HTTP through Mangum on the same thread
+    response = main.handler(_http_event("/test"), None)
+    assert response["statusCode"] == 200
+    assert json.loads(response["body"]) == {"message": "DHRUV Rocks!!"}
@@ -0,0 +1,78 @@
+from datetime import date
+
+import pytest
+from botocore.exceptions import ClientError
+
+from core.aws import get_dynamodb
+from services import occupancy_service
+from services.occupancy_service import OccupancyService
+
+
+class FlakyTable:
+    def __init__(self, table, failures):
+        self.table = table
+        self.failures = failures
+
+    def update_item(self, **kwargs):
+        night = kwargs["Key"]["night"]
+        if self.failures.get(night):
+            code = self.failures[night].pop(0)
+            raise ClientError({"Error": {"Code": code}}, "UpdateItem")
+        return self.table.update_item(**kwargs)
+
+
+@pytest.fixture
+def occupancy_table(aws, monkeypatch):
+    monkeypatch.setattr(occupancy_service, "UPDATE_BASE_DELAY", 0)
+    return get_dynamodb().create_table(
+        TableName="chariott-occupancy",
+        KeySchema=[
+            {"AttributeName": "hotel_id", "KeyType": "HASH"},
+            {"AttributeName": "night", "KeyType": "RANGE"},
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "hotel_id", "AttributeType": "S"},
+            {"AttributeName": "night", "AttributeType": "S"},
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+
+
+def _occupied(table):
+    return {
+        item["night"]: int(item["rooms_occupied"]) for item in table.scan()["Items"]
+    }
+
+
+def test_conflicting_night_is_retried_without_dropping_others(
+    occupancy_table, monkeypatch
+):
+    flaky = FlakyTable(
+        occupancy_table,
+        {"2030-03-02": ["TransactionConflictException", "ThrottlingException"]},
+    )
+    monkeypatch.setattr(occupancy_service, "table", flaky)
+
+    OccupancyService.apply_deltas(
+        {
+            ("hotel-1", date(2030, 3, 1)): 2,
+            ("hotel-1", date(2030, 3, 2)): 1,
+            ("hotel-1", date(2030, 3, 3)): 0,
+        }
+    )
+
+    assert _occupied(occupancy_table) == {"2030-03-01": 2, "2030-03-02": 1}
+
+
+def test_non_retryable_night_is_logged_and_others_applied(
+    occupancy_table, monkeypatch, caplog
+):
+    flaky = FlakyTable(occupancy_table, {"2030-03-02": ["ValidationException"]})
+    monkeypatch.setattr(occupancy_service, "table", flaky)
+
+    OccupancyService.apply_deltas(
+        {("hotel-1", date(2030, 3, 1)): 1, ("hotel-1", date(2030, 3, 2)): 1}
+    )
+
+    assert _occupied(occupancy_table) == {"2030-03-01": 1}
+    assert "hotel-1 on 2030-03-02" in caplog.text
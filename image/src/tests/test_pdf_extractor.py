@@ -0,0 +1,32 @@
+import io
+
+from fpdf import FPDF
+
+from services import pdf_extractor
+from services.pdf_extractor import iter_page_texts
+
+
+def _pdf(pages: int) -> io.BytesIO:
+    pdf = FPDF()
+    pdf.set_font("Helvetica", size=10)
+    for number in range(pages):
+        pdf.add_page()
+        pdf.multi_cell(0, 5, f"Page {number}. " + "Room service menu. " * 20)
+    return io.BytesIO(bytes(pdf.output()))
+
+
+def _exit_without_serving(connection, source):
+    connection.close()
+
+
+def test_parallel_extraction_matches_serial_order():
+    serial = list(iter_page_texts(_pdf(80), workers=1))
+    parallel = list(iter_page_texts(_pdf(80), workers=3))
+    assert len(serial) == 80
+    assert parallel == serial
+
+
+def test_failed_worker_falls_back_to_serial(monkeypatch):
+    monkeypatch.setattr(pdf_extractor, "_serve", _exit_without_serving)
+    serial = list(iter_page_texts(_pdf(70), workers=1))
+    assert list(iter_page_texts(_pdf(70), workers=2)) == serial
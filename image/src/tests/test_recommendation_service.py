@@ -0,0 +1,51 @@
+import threading
+import time
+
+import numpy as np
+
+from schemas.user import Preferences
+from services import recommendation_service
+from services.recommendation_service import RecommendationService
+from services.user_service import UserService
+
+BATCH_SIZE = 3
+BATCHES = 4
+
+
+def test_refresh_all_keeps_one_batch_of_writes_outstanding(monkeypatch, run):
+    stored = []
+    lock = threading.Lock()
+    outstanding_when_scoring = []
+
+    def store_recommendations(user_id, recommendations):
+        # Slow enough that undrained writes would still be running
+        time.sleep(0.05)
+        with lock:
+            stored.append((user_id, recommendations))
+        return recommendations
+
+    def iter_user_preferences(batch_size):
+        for number in range(BATCHES):
+            # Every batch before the previous one must be written by now
+            outstanding_when_scoring.append(number * batch_size - len(stored))
+            yield [
+                (f"user-{number}-{index}", Preferences(econ_rating=index))
+                for index in range(batch_size)
+            ]
+
+    async def hotel_matrix():
+        matrix = np.zeros((2, recommendation_service.FEATURE_DIM), np.float32)
+        matrix[0, recommendation_service.ECO_SCALED_OFFSET] = 1.0
+        return ["eco", "plain"], matrix
+
+    monkeypatch.setattr(UserService, "store_recommendations", store_recommendations)
+    monkeypatch.setattr(
+        recommendation_service, "_iter_user_preferences", iter_user_preferences
+    )
+    monkeypatch.setattr(recommendation_service.hotel_matrix_cache, "get", hotel_matrix)
+
+    result = run(RecommendationService.refresh_all(k=1, batch_size=BATCH_SIZE))
+
+    assert result == {"users": BATCH_SIZE * BATCHES, "failed": 0, "hotels": 2}
+    assert max(outstanding_when_scoring) <= BATCH_SIZE
+    assert dict(stored)["user-3-2"] == ["eco"]
@@ -0,0 +1,39 @@
+import asyncio
+
+from fakeredis import FakeAsyncRedis
+
+from services.request_event_service import (
+    InProcessPubSub,
+    RedisPubSub,
+    hotel_channel,
+)
+from utils.utils import streaming_supported
+
+
+async def _round_trip(backend):
+    channel = hotel_channel("hotel-1", "housekeeping")
+    async with backend.subscribe(channel) as queue:
+        # Redis delivers through a reader task; give it a turn to start
+        await asyncio.sleep(0)
+        await backend.publish(channel, {"event": "created", "request": {"id": 1}})
+        await backend.publish(hotel_channel("hotel-2"), {"event": "other"})
+        message = await asyncio.wait_for(queue.get(), 1)
+        assert queue.empty()
+    return message
+
+
+def test_in_process_round_trip(run):
+    message = run(_round_trip(InProcessPubSub()))
+    assert message == {"event": "created", "request": {"id": 1}}
+
+
+def test_redis_round_trip(run):
+    message = run(_round_trip(RedisPubSub(FakeAsyncRedis())))
+    assert message == {"event": "created", "request": {"id": 1}}
+
+
+def test_streaming_not_served_from_lambda(monkeypatch):
+    monkeypatch.delenv("AWS_LAMBDA_FUNCTION_NAME", raising=False)
+    assert streaming_supported()
+    monkeypatch.setenv("AWS_LAMBDA_FUNCTION_NAME", "ApiFunction")
+    assert not streaming_supported()
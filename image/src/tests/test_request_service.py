@@ -0,0 +1,119 @@
+import os
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.aws import get_dynamodb
+from core.config import settings
+from schemas.request import Department, RequestStatus
+from services import request_service
+from services.request_service import HOTEL_TIME_ISSUED_INDEX, RequestService
+from utils.ddsketch import DDSketch
+
+
+@pytest.fixture
+def requests_table(aws):
+    return get_dynamodb().create_table(
+        TableName=os.environ["DYNAMODB_TABLE_NAME_REQUESTS"],
+        KeySchema=[{"AttributeName": "request_id", "KeyType": "HASH"}],
+        AttributeDefinitions=[
+            {"AttributeName": "request_id", "AttributeType": "S"},
+            {"AttributeName": "hotel_id", "AttributeType": "S"},
+            {"AttributeName": "time_issued", "AttributeType": "S"},
+        ],
+        GlobalSecondaryIndexes=[
+            {
+                "IndexName": HOTEL_TIME_ISSUED_INDEX,
+                "KeySchema": [
+                    {"AttributeName": "hotel_id", "KeyType": "HASH"},
+                    {"AttributeName": "time_issued", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            }
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+
+
+@pytest.fixture
+def stats_table(aws):
+    return get_dynamodb().create_table(
+        TableName=settings.DYNAMODB_TABLE_NAME_REQUEST_STATS,
+        KeySchema=[
+            {"AttributeName": "hotel_id", "KeyType": "HASH"},
+            {"AttributeName": "stat", "KeyType": "RANGE"},
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "hotel_id", "AttributeType": "S"},
+            {"AttributeName": "stat", "AttributeType": "S"},
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+
+
+def test_persisted_sla_sketch_reads_back(stats_table, run):
+    service = RequestService()
+    rng = random.Random(9)
+    # 0.5 s lands in a negative bucket key ("b-34"), 0 in the zero bucket
+    latencies = [0.0, 0.5] + [rng.uniform(30, 7200) for _ in range(300)]
+    sketch = DDSketch()
+    for latency in latencies:
+        sketch.add(latency)
+        service._transact(
+            [service._sla_sketch_update("hotel-1", "housekeeping", latency)]
+        )
+    service._transact([service._sla_sketch_update("hotel-1", "reception", 60.0)])
+
+    result = run(service.get_sla_percentiles("hotel-1", Department.HOUSEKEEPING))
+
+    assert list(result["departments"]) == ["housekeeping"]
+    stats = result["departments"]["housekeeping"]
+    assert stats["count"] == len(latencies)
+    assert stats["mean_seconds"] == pytest.approx(
+        sum(latencies) / len(latencies), abs=0.001
+    )
+    assert stats["p50_seconds"] == sketch.quantile(0.5)
+    assert stats["p90_seconds"] == sketch.quantile(0.9)
+    assert stats["p99_seconds"] == sketch.quantile(0.99)
+    exact = sorted(latencies)[int(0.9 * (len(latencies) - 1))]
+    assert abs(stats["p90_seconds"] - exact) <= 0.01 * exact
+
+    everything = run(service.get_sla_percentiles("hotel-1"))
+    assert set(everything["departments"]) == {"housekeeping", "reception"}
+
+
+def test_status_filtered_pages_are_full(requests_table, monkeypatch, run):
+    # Small reads so one page needs several queries to fill
+    monkeypatch.setattr(request_service, "FILTERED_READ_LIMIT", 4)
+    issued = datetime(2024, 1, 1)
+    for number in range(40):
+        requests_table.put_item(
+            Item={
+                "request_id": f"r{number:02d}",
+                "user_id": "guest",
+                "hotel_id": "hotel-1",
+                "department": "housekeeping",
+                "task": "Towels",
+                "time_issued": (issued + timedelta(minutes=number)).isoformat(),
+                # One request in four is pending
+                "status": "pending" if number % 4 == 0 else "completed",
+            }
+        )
+
+    service = RequestService()
+    seen, cursor = [], None
+    while True:
+        page = run(
+            service.get_requests_by_hotel(
+                "hotel-1", RequestStatus.PENDING, limit=3, cursor=cursor
+            )
+        )
+        seen.append([request.request_id for request in page["requests"]])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert all(len(page) == 3 for page in seen[:-1])
+    expected = [f"r{number:02d}" for number in range(36, -1, -4)]
+    assert [request_id for page in seen for request_id in page] == expected
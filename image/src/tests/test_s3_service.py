@@ -0,0 +1,73 @@
+import json
+import os
+from urllib.parse import urlparse
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from core.aws import get_dynamodb
+from services import s3_service
+from services.s3_service import s3_client, upload_export
+
+BUCKET = os.environ["S3_BUCKET_NAME"]
+
+
+@pytest.fixture
+def bucket(aws):
+    s3_client.create_bucket(Bucket=BUCKET)
+
+
+def _read(url: str) -> bytes:
+    # Virtual-hosted URL: the bucket is in the host name, the key is the path
+    key = urlparse(url).path.lstrip("/")
+    return s3_client.get_object(Bucket=BUCKET, Key=key)["Body"].read()
+
+
+def test_upload_export_returns_presigned_url(bucket):
+    url = upload_export(iter(["[", "1", ",2", "]"]), "numbers.json", "application/json")
+
+    assert "Signature=" in url
+    assert json.loads(_read(url)) == [1, 2]
+
+
+def test_upload_export_aborts_on_failure(bucket):
+    def chunks():
+        yield "{}\n"
+        raise RuntimeError("scan failed")
+
+    with pytest.raises(RuntimeError):
+        upload_export(chunks(), "broken.ndjson", "application/x-ndjson")
+    assert not s3_client.list_multipart_uploads(Bucket=BUCKET).get("Uploads")
+
+
+def test_expired_exports_are_deleted_by_the_next_export(bucket, monkeypatch):
+    old_url = upload_export(iter(["old"]), "old.txt", "text/plain")
+    # Retention in the past: everything already uploaded counts as expired
+    monkeypatch.setattr(s3_service, "EXPORT_RETENTION_SECONDS", -60)
+
+    new_url = upload_export(iter(["new"]), "new.txt", "text/plain")
+
+    keys = [item["Key"] for item in s3_client.list_objects_v2(Bucket=BUCKET)["Contents"]]
+    assert keys == [urlparse(new_url).path.lstrip("/")]
+    assert urlparse(old_url).path.lstrip("/") not in keys
+
+
+def test_booking_export_redirects_to_s3_in_lambda(bucket, monkeypatch):
+    monkeypatch.setenv("AWS_LAMBDA_FUNCTION_NAME", "ApiFunction")
+    get_dynamodb().create_table(
+        TableName=os.environ["DYNAMODB_TABLE_NAME_BOOKINGS"],
+        KeySchema=[{"AttributeName": "booking_id", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "booking_id", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    client = TestClient(main.app)
+
+    response = client.get(
+        "/api/bookings/bookings",
+        headers={"API-Key": "test-api-key"},
+        follow_redirects=False,
+    )
+
+    assert response.status_code == 303
+    assert json.loads(_read(response.headers["location"])) == []
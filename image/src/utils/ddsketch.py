@@ -0,0 +1,65 @@
+import math
+from typing import Dict, Iterable, Optional
+
+# Quantiles are reported within 1% of their true value
+DEFAULT_RELATIVE_ACCURACY = 0.01
+# Values at or below this are counted in the zero bucket
+MIN_INDEXABLE_VALUE = 1e-3
+
+
+class DDSketch:
+    """Mergeable quantile sketch with relative-error guarantees.
+
+    Positive values fall into logarithmic buckets, so two sketches built with
+    the same accuracy merge by adding bucket counts. That is what lets every
+    Lambda container contribute to one persisted sketch through atomic ADDs.
+    """
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+
+    def key(self, value: float) -> Optional[int]:
+        if value <= MIN_INDEXABLE_VALUE:
+            return None
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def add(self, value: float, weight: int = 1):
+        key = self.key(value)
+        if key is None:
+            self.zero_count += weight
+        else:
+            self.bins[key] = self.bins.get(key, 0) + weight
+        self.count += weight
+        self.sum += value * weight
+
+    def merge(self, other: "DDSketch"):
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        for key, weight in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + weight
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if rank < seen:
+                # Midpoint of the bucket (gamma^(key-1), gamma^key]
+                return 2 * self.gamma**key / (1 + self.gamma)
+        return 2 * self.gamma ** max(self.bins) / (1 + self.gamma)
+
+    def quantiles(self, qs: Iterable[float]) -> Dict[float, Optional[float]]:
+        return {q: self.quantile(q) for q in qs}
@@ -1,13 +1,32 @@
-from datetime import datetime
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from functools import lru_cache
+from typing import Optional, Tuple
+from fastapi import HTTPException
+import base64
+import json
+import os
 import pytz
+import zlib
 
 est_tz = pytz.timezone("America/New_York")
 
 
+def streaming_supported() -> bool:
+    # Mangum buffers the whole response before Lambda returns it, so nothing
+    # streams: an endless event stream never reaches the client and holds the
+    # invocation until it times out, and a long export hits Lambda's 6 MB
+    # response limit
+    return "AWS_LAMBDA_FUNCTION_NAME" not in os.environ
+
+
 def get_current_est_time():
     return datetime.now(est_tz)
 
 
+# Booking dates repeat heavily across items, so parsed values are memoized;
+# datetimes are immutable, which makes sharing them safe
+@lru_cache(maxsize=8192)
 def parse_est_datetime(dt_string: str) -> datetime:
     try:
         # Try parsing as ISO format with timezone info
@@ -32,3 +51,49 @@ def format_est_datetime(dt: datetime) -> str:
 
     # Format to ISO 8601 format with timezone info
     return est_dt.isoformat()
+
+
+def to_epoch(dt: datetime) -> int:
+    return int(dt.timestamp())
+
+
+@lru_cache(maxsize=8192)
+def from_epoch(epoch) -> datetime:
+    # Stored epochs come back from DynamoDB as Decimal
+    return datetime.fromtimestamp(int(epoch), est_tz)
+
+
+def est_day_bounds(day: date) -> Tuple[int, int]:
+    # Epoch range [midnight, next midnight) of an EST calendar day
+    start = est_tz.localize(datetime.combine(day, time.min))
+    end = est_tz.localize(datetime.combine(day + timedelta(days=1), time.min))
+    return to_epoch(start), to_epoch(end)
+
+
+def _encode_key_value(value):
+    # DynamoDB returns numbers as Decimal, which json can't serialize natively
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode_cursor(last_evaluated_key: Optional[dict]) -> Optional[str]:
+    # Opaque page token: compact JSON, zlib-compressed, unpadded urlsafe base64
+    if not last_evaluated_key:
+        return None
+    payload = json.dumps(
+        last_evaluated_key, default=_encode_key_value, separators=(",", ":")
+    )
+    token = base64.urlsafe_b64encode(zlib.compress(payload.encode(), 9))
+    return token.rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[dict]:
+    if not cursor:
+        return None
+    try:
+        token = cursor.encode() + b"=" * (-len(cursor) % 4)
+        payload = zlib.decompress(base64.urlsafe_b64decode(token))
+        return json.loads(payload, parse_float=Decimal)
+    except (ValueError, TypeError, zlib.error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")